@@ -9,7 +9,10 @@ from contextlib import asynccontextmanager
 
 from src.config import settings
 from src.utils.logger import get_logger
-from src.api.routes import router
+from src.api.routes import router, shutdown_services
+from src.api.metrics import install_metrics
+from src.api.profiling import install_profiler
+from src.utils.loop_monitor import start_loop_monitor
 from src import __version__
 
 logger = get_logger()
@@ -23,11 +26,14 @@ async def lifespan(app: FastAPI):
     logger.info(f"Environment: {settings.env}")
     logger.info(f"Debug mode: {settings.debug}")
     logger.info("Services will be initialized on first request (lazy loading)")
+    if settings.loop_monitor_enabled:
+        start_loop_monitor(settings.loop_monitor_interval, settings.loop_block_threshold)
 
     yield
 
     # Shutdown
     logger.info("Shutting down Videogames Chatbot API")
+    await shutdown_services()
 
 
 # Create FastAPI app
@@ -51,6 +57,12 @@ app.add_middleware(
 # Include routers
 app.include_router(router, prefix="/api/v1")
 
+# Prometheus-style metrics (/metrics)
+install_metrics(app)
+
+# Opt-in request profiling (PROFILE_SECRET / PROFILE_SAMPLE_RATE)
+install_profiler(app)
+
 
 @app.get("/")
 async def root():
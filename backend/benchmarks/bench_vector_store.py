@@ -0,0 +1,188 @@
+"""
+Vector store benchmark: NumPy backend configurations vs ChromaDB.
+
+Builds a synthetic game-description corpus, embeds it once with the local
+HashingEmbedder and loads the same vectors into every backend, so the numbers
+compare index and storage behaviour rather than embedders. Recall@k is
+measured against exact float32 search.
+
+Usage (from backend/):
+    python -m benchmarks.bench_vector_store --docs 20000 --queries 200 --k 10
+    python -m benchmarks.bench_vector_store --json results.json
+"""
+
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+from typing import Dict, Any, List
+
+import numpy as np
+
+from src.services.vector_store import NumpyVectorStore, HashingEmbedder
+
+_GENRES = [
+    "action", "adventure", "rpg", "strategy", "simulation", "horror", "puzzle", "racing",
+    "roguelike", "metroidvania", "platformer", "shooter", "survival", "sandbox", "indie",
+]
+_WORDS = [
+    "dungeon", "dragon", "space", "city", "farm", "zombie", "knight", "pixel", "open", "world",
+    "crafting", "multiplayer", "co-op", "story", "boss", "procedural", "tactical", "turn-based",
+    "physics", "stealth", "magic", "sword", "pirate", "robot", "cozy", "dark", "fantasy", "sci-fi",
+    "retro", "anime", "deckbuilder", "card", "base", "building", "exploration", "narrative",
+    "choices", "mystery", "detective", "soulslike", "difficult", "relaxing", "colony", "trading",
+]
+
+
+def make_corpus(n_docs: int, seed: int = 0) -> List[str]:
+    """Generate game-like descriptions."""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n_docs):
+        genres = rng.sample(_GENRES, 2)
+        words = rng.choices(_WORDS, k=rng.randint(8, 30))
+        docs.append(
+            f"Game: Title {i}\nGenres: {', '.join(genres)}\nDescription: {' '.join(words)}"
+        )
+    return docs
+
+
+def make_queries(corpus: List[str], n_queries: int, seed: int = 1) -> List[str]:
+    """Generate queries as noisy fragments of corpus documents."""
+    rng = random.Random(seed)
+    queries = []
+    for doc in rng.sample(corpus, n_queries):
+        words = doc.replace("\n", " ").split()[4:]
+        fragment = rng.sample(words, min(len(words), 6))
+        queries.append(" ".join(fragment + rng.choices(_WORDS, k=2)))
+    return queries
+
+
+def exact_neighbours(vectors: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    """Ground-truth top-k by brute force."""
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set(row.tolist()) for row in top]
+
+
+def measure(name: str, search, queries: np.ndarray, truth: List[set], k: int) -> Dict[str, Any]:
+    """Run every query, collecting latency and recall@k."""
+    latencies = []
+    recall = 0.0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = search(query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recall += len(set(int(i) for i in found) & expected) / k
+
+    latencies_arr = np.asarray(latencies)
+    return {
+        "backend": name,
+        "p50_ms": round(float(np.percentile(latencies_arr, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_arr, 95)), 3),
+        "recall_at_k": round(recall / len(queries), 4),
+    }
+
+
+def bench_numpy(
+    workdir: str, name: str, quantization: str, index: str, nprobe: int,
+    ids: List[str], vectors: np.ndarray, queries: np.ndarray, truth: List[set], k: int,
+) -> Dict[str, Any]:
+    """Benchmark one NumpyVectorStore configuration."""
+    store = NumpyVectorStore(
+        path=f"{workdir}/{name}", name="bench", quantization=quantization, index=index, nprobe=nprobe
+    )
+    start = time.perf_counter()
+    for i in range(0, len(ids), 1000):
+        chunk = ids[i : i + 1000]
+        store.upsert(ids=chunk, embeddings=vectors[i : i + 1000], metadatas=[{}] * len(chunk))
+    insert_s = time.perf_counter() - start
+    if index == "ivf":
+        store.build_ivf()
+
+    def search(query, n):
+        return store.query(query_embeddings=[query], n_results=n, include=[])["ids"][0]
+
+    result = measure(name, search, queries, truth, k)
+    result["insert_s"] = round(insert_s, 2)
+    return result
+
+
+def bench_chroma(
+    workdir: str, ids: List[str], vectors: np.ndarray, queries: np.ndarray, truth: List[set], k: int
+) -> Dict[str, Any]:
+    """Benchmark ChromaDB (HNSW, cosine) with the same vectors."""
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+
+    client = chromadb.PersistentClient(
+        path=f"{workdir}/chroma", settings=ChromaSettings(anonymized_telemetry=False)
+    )
+    collection = client.create_collection(name="bench", metadata={"hnsw:space": "cosine"})
+    start = time.perf_counter()
+    for i in range(0, len(ids), 1000):
+        collection.add(ids=ids[i : i + 1000], embeddings=vectors[i : i + 1000].tolist())
+    insert_s = time.perf_counter() - start
+
+    def search(query, n):
+        return collection.query(query_embeddings=[query.tolist()], n_results=n, include=[])["ids"][0]
+
+    result = measure("chroma-hnsw", search, queries, truth, k)
+    result["insert_s"] = round(insert_s, 2)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark vector store backends")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    embedder = HashingEmbedder(args.dim)
+    corpus = make_corpus(args.docs)
+    start = time.perf_counter()
+    vectors = embedder(corpus)
+    embed_s = time.perf_counter() - start
+    queries = embedder(make_queries(corpus, args.queries))
+    truth = exact_neighbours(vectors, queries, args.k)
+    ids = [str(i) for i in range(args.docs)]
+    print(f"Embedded {args.docs} docs in {embed_s:.2f}s ({args.docs / embed_s:.0f} docs/sec)")
+
+    workdir = tempfile.mkdtemp(prefix="bench_vector_store_")
+    results = []
+    try:
+        for name, quantization, index in (
+            ("numpy-f32-exact", "float32", "exact"),
+            ("numpy-int8-exact", "int8", "exact"),
+            ("numpy-f32-ivf", "float32", "ivf"),
+            ("numpy-int8-ivf", "int8", "ivf"),
+        ):
+            results.append(
+                bench_numpy(
+                    workdir, name, quantization, index, args.nprobe, ids, vectors, queries, truth, args.k
+                )
+            )
+        try:
+            results.append(bench_chroma(workdir, ids, vectors, queries, truth, args.k))
+        except ImportError:
+            print("chromadb not installed, skipping Chroma")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'backend':<18}{'p50 ms':>10}{'p95 ms':>10}{'recall@' + str(args.k):>12}{'insert s':>10}")
+    for r in results:
+        print(f"{r['backend']:<18}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['recall_at_k']:>12}{r['insert_s']:>10}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "embed_s": round(embed_s, 2), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Offline retrieval evaluation: vector vs BM25 vs hybrid.
+
+Ingests the recorded Steam fixture (plus optional synthetic distractor games)
+into a throwaway knowledge base and runs labelled queries derived from the
+games themselves: exact titles, studio names and description fragments.
+Reports recall@k (per query type and overall) and latency for each mode.
+
+Usage (from backend/):
+    python -m benchmarks.eval_retrieval
+    python -m benchmarks.eval_retrieval --distractors 2000 --k 5 --backend numpy
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, Any, List, Set, Tuple
+
+import httpx
+import numpy as np
+
+from src.cli.backfill import load_app_ids
+from src.config import settings
+from src.services.steam_service import SteamService
+from src.utils.steam_fixture import SteamFixture
+
+MODES = ("vector", "bm25", "hybrid")
+
+_SYLLABLES = ["ka", "ro", "mi", "zen", "tor", "vel", "lun", "dra", "xis", "mor", "pha", "qui"]
+_WORDS = [
+    "action", "adventure", "dungeon", "space", "farm", "knight", "pixel", "world", "crafting",
+    "story", "boss", "procedural", "tactical", "stealth", "magic", "sword", "robot", "cozy",
+    "dark", "fantasy", "retro", "card", "building", "exploration", "mystery", "difficult",
+]
+
+
+async def load_fixture_games(fixture_path: str, catalogue: str) -> List[Dict[str, Any]]:
+    """Fetch enriched game data from a recorded fixture (offline)."""
+    fixture = SteamFixture(fixture_path)
+    settings.game_store_path = None  # Never touch the real local store
+    steam = SteamService(client=httpx.AsyncClient(transport=fixture.replay_transport()))
+    try:
+        results = await asyncio.gather(
+            *(steam.get_enriched_game_data(app_id) for app_id in load_app_ids([], catalogue))
+        )
+    finally:
+        await steam.close()
+    return [game for game in results if game]
+
+
+def make_distractors(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate synthetic games that share vocabulary with the real ones."""
+    rng = random.Random(seed)
+    games = []
+    for i in range(n):
+        name = " ".join(
+            "".join(rng.choices(_SYLLABLES, k=rng.randint(2, 3))).title() for _ in range(2)
+        )
+        studio = "".join(rng.choices(_SYLLABLES, k=3)).title() + " Games"
+        games.append(
+            {
+                "app_id": 9_000_000 + i,
+                "name": name,
+                "type": "game",
+                "short_description": " ".join(rng.choices(_WORDS, k=20)),
+                "developers": [studio],
+                "publishers": [studio],
+                "genres": rng.sample(["Action", "Indie", "RPG", "Strategy", "Adventure"], 2),
+            }
+        )
+    return games
+
+
+def make_queries(games: List[Dict[str, Any]]) -> List[Tuple[str, str, Set[str]]]:
+    """Build (query_type, query, relevant_app_ids) triples from the real games."""
+    by_developer: Dict[str, Set[str]] = defaultdict(set)
+    for game in games:
+        for developer in game.get("developers") or []:
+            by_developer[developer].add(str(game["app_id"]))
+
+    queries = []
+    for game in games:
+        app_id = str(game["app_id"])
+        queries.append(("title", game["name"], {app_id}))
+        description = (game.get("short_description") or "").split()
+        if len(description) >= 8:
+            queries.append(("description", " ".join(description[2:12]), {app_id}))
+    for developer, app_ids in by_developer.items():
+        queries.append(("studio", f"games by {developer}", app_ids))
+    return queries
+
+
+def evaluate(rag_service, queries, k: int, mode: str) -> Dict[str, Any]:
+    """Run every query in one mode."""
+    recalls: Dict[str, List[float]] = defaultdict(list)
+    latencies = []
+    for query_type, query, relevant in queries:
+        start = time.perf_counter()
+        results = rag_service.search_similar_games(query, n_results=k * 4, mode=mode)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        # Rank games by their best-ranked document
+        ranked: List[str] = []
+        for result in results:
+            app_id = result["metadata"].get("app_id")
+            if app_id not in ranked:
+                ranked.append(app_id)
+        found = len(set(ranked[:k]) & relevant)
+        recalls[query_type].append(found / min(len(relevant), k))
+
+    report = {
+        f"recall@{k}_{query_type}": round(float(np.mean(values)), 4)
+        for query_type, values in sorted(recalls.items())
+    }
+    report[f"recall@{k}"] = round(float(np.mean([v for vs in recalls.values() for v in vs])), 4)
+    report["p50_ms"] = round(float(np.percentile(latencies, 50)), 3)
+    report["p95_ms"] = round(float(np.percentile(latencies, 95)), 3)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluate knowledge base retrieval")
+    parser.add_argument("--fixture", default="fixtures/steam_sample.json")
+    parser.add_argument("--catalogue", default="fixtures/catalogue_sample.txt")
+    parser.add_argument("--distractors", type=int, default=500, help="Synthetic games added")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--backend", default="numpy", help="numpy, chroma or auto")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    games = asyncio.run(load_fixture_games(args.fixture, args.catalogue))
+    queries = make_queries(games)
+
+    workdir = tempfile.mkdtemp(prefix="eval_retrieval_")
+    settings.chroma_persist_dir = workdir
+    try:
+        from src.services.rag_service import RAGService
+
+        rag_service = RAGService(backend=args.backend)
+        items = [(game, [r["review"] for r in game.get("sample_reviews", [])]) for game in games]
+        items += [(game, None) for game in make_distractors(args.distractors)]
+        for start in range(0, len(items), 256):
+            rag_service.add_games_batch(items[start : start + 256])
+
+        results = {mode: evaluate(rag_service, queries, args.k, mode) for mode in MODES}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(
+        f"\n{len(games)} games + {args.distractors} distractors, "
+        f"{len(queries)} queries, backend={rag_service.backend}"
+    )
+    columns = list(results["hybrid"])
+    print(f"{'mode':<8}" + "".join(f"{c:>22}" for c in columns))
+    for mode, report in results.items():
+        print(f"{mode:<8}" + "".join(f"{report[c]:>22}" for c in columns))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,594 @@
+"""
+End-to-end load benchmark for the API with replayed upstreams.
+
+Starts the app under uvicorn with UPSTREAM_MODE=replay (recorded Claude
+sessions and Steam responses, injected latency, a throwaway knowledge base and
+game store, NumPy vector backend unless VECTOR_BACKEND is set), then drives it
+over HTTP with closed-loop virtual users at each concurrency level. Users pick scenarios from a weighted mix:
+
+    chat     a recorded session, turn by turn with its conversation history
+    search   POST /games/search with a recorded search term
+    details  POST /games/details for a recorded app id
+    analyze  POST /games/analyze for a game with a recorded analysis
+
+Reports throughput, latency percentiles per endpoint, RSS per worker and
+upstream calls per request (from /metrics), and saves the results as JSON
+tagged with the git commit, so runs can be compared across commits.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --concurrency 1,8,32 --duration 30
+    python -m benchmarks.load_test --mix chat=1 --llm-latency none --workers 2
+    python -m benchmarks.load_test --compare benchmarks/results/load_<commit>_<time>.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+import httpx
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+DEFAULT_MIX = "chat=6,search=2,details=2,analyze=1"
+
+_ANALYSIS_PROMPT = re.compile(r'^Analiza las siguientes reseñas del juego "(.+?)"')
+
+# Counters scraped from /metrics before and after each level
+_UPSTREAM_COUNTERS = ("llm_requests_total", "steam_requests_total", "tool_calls_total")
+
+
+# ----------------------------------------------------------------------------
+# Workload
+# ----------------------------------------------------------------------------
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse "chat=6,search=2" into scenario weights."""
+    mix = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r} (known: {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def load_workload(sessions_path: str, steam_fixture_path: str) -> Dict[str, Any]:
+    """
+    Derive requests from the recorded fixtures, so every one replays without misses.
+
+    Returns:
+        Dictionary with chat sessions (list of user messages), search terms,
+        detail app ids and analysis app ids
+    """
+    with open(steam_fixture_path, encoding="utf-8") as f:
+        responses = json.load(f)["responses"]
+
+    terms, app_ids, names = [], [], {}
+    for key, entry in responses.items():
+        url, _, query = key.partition("?")
+        params = dict(parse_qsl(query))
+        if url.endswith("/storesearch") and entry["body"].get("items"):
+            terms.append(params["term"])
+        elif url.endswith("/appdetails"):
+            for app_id, item in entry["body"].items():
+                if item.get("success"):
+                    app_ids.append(int(app_id))
+                    names[item["data"]["name"]] = int(app_id)
+
+    with open(sessions_path, encoding="utf-8") as f:
+        recorded = json.load(f)["sessions"]
+
+    sessions, analyze_ids = [], []
+    for session in recorded:
+        users = [turn["user"] for turn in session["turns"]]
+        match = _ANALYSIS_PROMPT.match(users[0])
+        if match:
+            if match.group(1) in names:
+                analyze_ids.append(names[match.group(1)])
+        else:
+            sessions.append(users)
+
+    return {"sessions": sessions, "terms": terms, "app_ids": app_ids, "analyze_ids": analyze_ids}
+
+
+async def _post(
+    client: httpx.AsyncClient, endpoint: str, path: str, body: Dict[str, Any], samples: List
+) -> Optional[Dict[str, Any]]:
+    """POST a request and record (endpoint, seconds, ok); returns the body if ok."""
+    start = time.perf_counter()
+    try:
+        response = await client.post(path, json=body)
+        data = response.json() if response.status_code == 200 else None
+    except (httpx.HTTPError, ValueError):
+        data = None
+    ok = data is not None and not (isinstance(data, dict) and data.get("success") is False)
+    samples.append((endpoint, time.perf_counter() - start, ok))
+    return data if ok else None
+
+
+async def run_chat(client, rng, workload, samples, chat_meta) -> None:
+    """Play one recorded session, turn by turn, with its conversation history."""
+    history: List[Dict[str, str]] = []
+    for message in rng.choice(workload["sessions"]):
+        data = await _post(
+            client,
+            "chat",
+            "/api/v1/chat",
+            {"message": message, "conversation_history": history},
+            samples,
+        )
+        if data is None:
+            return
+        metadata = data.get("metadata") or {}
+        chat_meta.append(
+            (metadata.get("llm_iterations", 0), metadata.get("steam_requests", 0))
+        )
+        history += [
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": data["response"]},
+        ]
+
+
+async def run_search(client, rng, workload, samples, chat_meta) -> None:
+    await _post(
+        client, "search", "/api/v1/games/search",
+        {"query": rng.choice(workload["terms"]), "limit": 10}, samples,
+    )
+
+
+async def run_details(client, rng, workload, samples, chat_meta) -> None:
+    await _post(
+        client, "details", "/api/v1/games/details",
+        {"app_id": rng.choice(workload["app_ids"])}, samples,
+    )
+
+
+async def run_analyze(client, rng, workload, samples, chat_meta) -> None:
+    await _post(
+        client, "analyze", "/api/v1/games/analyze",
+        {"app_id": rng.choice(workload["analyze_ids"])}, samples,
+    )
+
+
+SCENARIOS = {
+    "chat": run_chat,
+    "search": run_search,
+    "details": run_details,
+    "analyze": run_analyze,
+}
+
+
+# ----------------------------------------------------------------------------
+# Server and measurements
+# ----------------------------------------------------------------------------
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int, args, workdir: str) -> subprocess.Popen:
+    """Start uvicorn with replayed upstreams and throwaway storage."""
+    env = {
+        **os.environ,
+        "UPSTREAM_MODE": "replay",
+        "LLM_FIXTURE_PATH": args.sessions,
+        "STEAM_FIXTURE_PATH": args.steam_fixture,
+        "REPLAY_LLM_LATENCY": args.llm_latency,
+        "REPLAY_STEAM_LATENCY": args.steam_latency,
+        "CHROMA_PERSIST_DIR": f"{workdir}/kb",
+        "GAME_STORE_PATH": f"{workdir}/game_store.db",
+        # ChromaDB's default embedder downloads a model; the NumPy store runs offline
+        "VECTOR_BACKEND": os.environ.get("VECTOR_BACKEND", "numpy"),
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        "ENV": "development",
+    }
+    env.setdefault("ANTHROPIC_API_KEY", "replay")
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 120.0) -> None:
+    """Wait until the server answers /health."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError("Server did not become ready")
+
+
+def worker_pids(server_pid: int) -> List[int]:
+    """Worker processes of a uvicorn server (the server itself with one worker)."""
+    children = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+            cmdline = (stat.parent / "cmdline").read_bytes()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == server_pid and b"resource_tracker" not in cmdline:
+            children.append(int(stat.parent.name))
+    return sorted(children) or [server_pid]
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process in MB (Linux only)."""
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class MemorySampler:
+    """Samples the RSS of each worker in the background."""
+
+    def __init__(self, pids: List[int], interval: float = 0.5):
+        self.pids = pids
+        self.interval = interval
+        self.samples: Dict[int, List[float]] = {pid: [] for pid in pids}
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self) -> None:
+        for pid in self.pids:
+            value = rss_mb(pid)
+            if value is not None:
+                self.samples[pid].append(value)
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self.samples = {pid: [] for pid in self.pids}
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> List[Dict[str, Any]]:
+        """Stop sampling and summarize RSS per worker (start, peak, end in MB)."""
+        self._task.cancel()
+        self.sample()
+        return [
+            {
+                "pid": pid,
+                "rss_start_mb": round(values[0], 1),
+                "rss_peak_mb": round(max(values), 1),
+                "rss_end_mb": round(values[-1], 1),
+            }
+            for pid, values in self.samples.items()
+            if values
+        ]
+
+
+async def scrape_counters(client: httpx.AsyncClient) -> Dict[str, float]:
+    """Sum /metrics counters by name and first label (e.g. steam endpoint)."""
+    totals: Dict[str, float] = defaultdict(float)
+    try:
+        text = (await client.get("/metrics")).text
+    except httpx.HTTPError:
+        return totals
+    for line in text.splitlines():
+        match = re.match(r'^(\w+)\{(\w+)="([^"]*)"[^}]*\}\s+(\S+)$', line)
+        if match and match.group(1) in _UPSTREAM_COUNTERS + ("cache_requests_total",):
+            name, _, label, value = match.groups()
+            totals[name] += float(value)
+            totals[f"{name}:{label}"] += float(value)
+            if name == "cache_requests_total":
+                result = re.search(r'result="(\w+)"', line).group(1)
+                totals[f"{name}:{label}:{result}"] += float(value)
+    return totals
+
+
+# ----------------------------------------------------------------------------
+# Load levels
+# ----------------------------------------------------------------------------
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    ms = np.array(latencies) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p90_ms": round(float(np.percentile(ms, 90)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "max_ms": round(float(ms.max()), 1),
+    }
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    concurrency: int,
+    duration: float,
+    mix: Dict[str, float],
+    workload: Dict[str, Any],
+    seed: int,
+) -> Tuple[List, List, float]:
+    """Run closed-loop virtual users for a duration (scenarios in flight are finished)."""
+    samples: List[Tuple[str, float, bool]] = []
+    chat_meta: List[Tuple[int, int]] = []
+    names, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + duration
+
+    async def user(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            scenario = rng.choices(names, weights)[0]
+            await SCENARIOS[scenario](client, rng, workload, samples, chat_meta)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    return samples, chat_meta, time.perf_counter() - start
+
+
+async def run_level(
+    client, memory: MemorySampler, concurrency: int, args, mix, workload, track_upstream: bool
+) -> Dict[str, Any]:
+    """Warm up, then measure one concurrency level."""
+    if args.warmup > 0:
+        await drive(client, concurrency, args.warmup, mix, workload, args.seed + 1)
+
+    before = await scrape_counters(client) if track_upstream else None
+    memory.start()
+    samples, chat_meta, elapsed = await drive(
+        client, concurrency, args.duration, mix, workload, args.seed
+    )
+    workers = await memory.stop()
+    after = await scrape_counters(client) if track_upstream else None
+
+    by_endpoint: Dict[str, List] = defaultdict(list)
+    for endpoint, seconds, ok in samples:
+        by_endpoint[endpoint].append((seconds, ok))
+
+    endpoints = {}
+    for endpoint, items in sorted(by_endpoint.items()):
+        latencies = [seconds for seconds, ok in items if ok]
+        endpoints[endpoint] = {
+            "requests": len(items),
+            "errors": sum(1 for _, ok in items if not ok),
+            "rps": round(len(items) / elapsed, 2),
+            **(_percentiles(latencies) if latencies else {}),
+        }
+
+    ok_latencies = [seconds for _, seconds, ok in samples if ok]
+    result = {
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "requests": len(samples),
+        "errors": sum(1 for _, _, ok in samples if not ok),
+        "rps": round(len(samples) / elapsed, 2),
+        "rps_per_worker": round(len(samples) / elapsed / args.workers, 2),
+        **(_percentiles(ok_latencies) if ok_latencies else {}),
+        "endpoints": endpoints,
+        "workers": workers,
+    }
+
+    if chat_meta:
+        result["chat"] = {
+            "avg_llm_iterations": round(float(np.mean([m[0] for m in chat_meta])), 2),
+            "avg_steam_requests": round(float(np.mean([m[1] for m in chat_meta])), 2),
+        }
+
+    if track_upstream and samples:
+        delta = {key: after.get(key, 0.0) - before.get(key, 0.0) for key in after}
+        per_request = {
+            key: round(value / len(samples), 3)
+            for key, value in sorted(delta.items())
+            if value and not key.startswith("cache_requests_total")
+        }
+        hits = delta.get("cache_requests_total:response:hit", 0.0)
+        misses = delta.get("cache_requests_total:response:miss", 0.0)
+        result["upstream_per_request"] = per_request
+        result["response_cache_hit_rate"] = (
+            round(hits / (hits + misses), 3) if hits + misses else None
+        )
+    return result
+
+
+# ----------------------------------------------------------------------------
+# Reporting
+# ----------------------------------------------------------------------------
+
+
+def git_revision() -> Dict[str, Any]:
+    """Current commit and whether the tree has uncommitted changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND_DIR,
+                capture_output=True, text=True,
+            ).stdout.strip()
+        )
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": "unknown", "dirty": None}
+
+
+def print_level(level: Dict[str, Any]) -> None:
+    print(
+        f"\n== concurrency {level['concurrency']}: {level['rps']} req/s "
+        f"({level['rps_per_worker']} per worker), {level['errors']} errors"
+    )
+    print(f"{'endpoint':<10}{'reqs':>7}{'rps':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, e in level["endpoints"].items():
+        print(
+            f"{name:<10}{e['requests']:>7}{e['rps']:>9}{e.get('p50_ms', '-'):>10}"
+            f"{e.get('p90_ms', '-'):>10}{e.get('p99_ms', '-'):>10}{e['errors']:>8}"
+        )
+    for worker in level["workers"]:
+        print(
+            f"worker {worker['pid']}: RSS {worker['rss_start_mb']} -> {worker['rss_end_mb']} MB "
+            f"(peak {worker['rss_peak_mb']})"
+        )
+    if "chat" in level:
+        print(
+            f"chat: {level['chat']['avg_llm_iterations']} LLM iterations, "
+            f"{level['chat']['avg_steam_requests']} Steam requests per message"
+        )
+    if level.get("upstream_per_request"):
+        calls = ", ".join(f"{k}={v}" for k, v in level["upstream_per_request"].items() if ":" not in k)
+        print(f"upstream calls per request: {calls}; response cache hit rate {level['response_cache_hit_rate']}")
+
+
+def compare(previous_path: str, current: Dict[str, Any]) -> None:
+    """Print throughput and latency changes against a previous results file."""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+    old_levels = {level["concurrency"]: level for level in previous["levels"]}
+
+    def change(new, old):
+        if new is None or not old:
+            return "-"
+        return f"{(new - old) / old * 100:+.1f}%"
+
+    print(f"\n== vs {previous['meta']['commit']} ({previous_path})")
+    print(f"{'conc':<6}{'endpoint':<10}{'rps':>10}{'p50':>10}{'p99':>10}")
+    for level in current["levels"]:
+        old = old_levels.get(level["concurrency"])
+        if old is None:
+            continue
+        rows = [("all", level, old)] + [
+            (name, e, old["endpoints"].get(name, {})) for name, e in level["endpoints"].items()
+        ]
+        for name, new_row, old_row in rows:
+            print(
+                f"{level['concurrency']:<6}{name:<10}"
+                f"{change(new_row.get('rps'), old_row.get('rps')):>10}"
+                f"{change(new_row.get('p50_ms'), old_row.get('p50_ms')):>10}"
+                f"{change(new_row.get('p99_ms'), old_row.get('p99_ms')):>10}"
+            )
+
+
+async def run(args) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    workload = load_workload(args.sessions, args.steam_fixture)
+    for scenario, key in (("chat", "sessions"), ("search", "terms"), ("details", "app_ids"), ("analyze", "analyze_ids")):
+        if scenario in mix and not workload[key]:
+            raise ValueError(f"No recorded requests for scenario {scenario!r}")
+
+    if args.workers > 1 and os.environ.get("VECTOR_BACKEND", "numpy") == "numpy":
+        print(
+            "Warning: workers share one NumPy knowledge base, which supports a single "
+            "process; knowledge-first retrieval may fail (ingestion from other workers)"
+        )
+
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    port = _free_port()
+    server = start_server(port, args.workers, args, workdir)
+    levels = []
+    idle: Dict[int, float] = {}
+    try:
+        limits = httpx.Limits(max_connections=max(args.concurrency) + 4)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", timeout=args.timeout, limits=limits
+        ) as client:
+            await wait_ready(client, server)
+            pids = worker_pids(server.pid)
+            memory = MemorySampler(pids)
+            memory.sample()
+            idle = {pid: round(values[-1], 1) for pid, values in memory.samples.items() if values}
+            print(f"Server ready on port {port}: {len(pids)} worker(s), idle RSS (MB) {idle}")
+
+            for concurrency in args.concurrency:
+                level = await run_level(
+                    client, memory, concurrency, args, mix, workload,
+                    track_upstream=args.workers == 1,
+                )
+                print_level(level)
+                levels.append(level)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    params = {k: v for k, v in vars(args).items() if k not in ("out", "compare")}
+    return {
+        "meta": {
+            **git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "vector_backend": os.environ.get("VECTOR_BACKEND", "numpy"),
+        },
+        "params": params,
+        "idle_rss_mb": list(idle.values()),
+        "levels": levels,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the API with replayed upstreams")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated virtual user counts")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds per level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--llm-latency", default="recorded", help="Injected Claude latency spec")
+    parser.add_argument("--steam-latency", default="lognormal:120,0.5", help="Injected Steam latency spec")
+    parser.add_argument("--sessions", default="fixtures/sessions/chat_sessions.json")
+    parser.add_argument("--steam-fixture", default="fixtures/steam_sample.json")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Results file (default benchmarks/results/load_<commit>_<time>.json)")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    args = parser.parse_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+
+    results = asyncio.run(run(args))
+
+    out = args.out
+    if not out:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = RESULTS_DIR / f"load_{results['meta']['commit']}_{stamp}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {out}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Microbenchmarks for per-chat hot paths, with stored baselines.
+
+Payloads are real Steam responses replayed from the recorded fixture
+(details, reviews and enriched data of several games), run through:
+
+- cache keys: CacheManager._generate_key and the @cached key builder;
+- cache values: in-memory set/get and the JSON round trip of the Redis path;
+- tool output: json.dumps(indent=2) of details, reviews and multi-game payloads;
+- RAGService._create_game_document.
+
+Each case reports the best and median time per call over several repeats.
+--save-baseline runs the suite in several processes and stores the slowest
+median of each case; --check fails (exit 1) when a case's median is slower
+than its baseline by more than the case threshold. Cases over the threshold
+are re-measured (--retries) first, so a noisy moment on a shared machine
+does not fail the check on its own. Baselines are machine-specific: record
+them on the machine that runs the check.
+
+Usage (from backend/):
+    python -m benchmarks.microbench
+    python -m benchmarks.microbench --check
+    python -m benchmarks.microbench --save-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Tuple
+
+import httpx
+
+from src.services.rag_service import RAGService
+from src.services.steam_service import SteamService
+from src.utils.cache import CacheManager, cache_manager
+from src.utils.steam_fixture import SteamFixture
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "microbench.json"
+
+# Allowed slowdown of the median over the baseline before --check fails
+DEFAULT_THRESHOLD = 0.75
+
+# Wider thresholds for cases dominated by allocation and dict/str layout, which
+# move by up to ~1.8x between processes without any code change
+CASE_THRESHOLDS = {
+    "cache.memory_": 1.0,
+    "cache.redis_json.": 1.0,
+    "tool.json_indent.": 1.0,
+    "rag.create_game_document": 1.5,
+}
+
+DETAILS_APP_ID = 367520
+MULTI_APP_IDS = [367520, 1145360, 1245620, 292030, 1091500]
+
+
+async def load_payloads(fixture_path: str) -> Dict[str, Any]:
+    """Fetch realistic payloads from the recorded Steam fixture (offline)."""
+    fixture = SteamFixture(fixture_path)
+    steam = SteamService(client=httpx.AsyncClient(transport=fixture.replay_transport()))
+    try:
+        details = await steam.get_game_details(DETAILS_APP_ID)
+        reviews = await steam.get_game_reviews(DETAILS_APP_ID)
+        games = [await steam.get_enriched_game_data(app_id) for app_id in MULTI_APP_IDS]
+    finally:
+        await steam.close()
+    if not details or not reviews or not all(games):
+        raise RuntimeError(f"Fixture {fixture_path} is missing responses for the payload games")
+    return {"details": details, "reviews": reviews, "games": games}
+
+
+def build_cases(payloads: Dict[str, Any]) -> Dict[str, Callable[[], Any]]:
+    """Hot-path callables, each run with a fixed realistic payload."""
+    details, reviews, games = payloads["details"], payloads["reviews"], payloads["games"]
+    details_key = SteamService.get_game_details.cache_key
+    reviews_key = SteamService.get_game_reviews.cache_key
+
+    memory_cache = CacheManager()
+    memory_cache.redis_client = None  # Always the in-memory LRU, even with REDIS_URL set
+    cache_key = cache_manager._generate_key("steam_game_details", app_id=DETAILS_APP_ID)
+    memory_cache.set(cache_key, details, 3600)
+
+    details_json = json.dumps(details)
+    compare_payload = {"games": games, "comparison": {"price": {g["name"]: g.get("price") for g in games}}}
+
+    return {
+        "cache.generate_key": lambda: cache_manager._generate_key(
+            "steam_game_details", app_id=DETAILS_APP_ID
+        ),
+        "cache.cached_key.details": lambda: details_key((None, DETAILS_APP_ID), {}),
+        "cache.cached_key.reviews": lambda: reviews_key((None, DETAILS_APP_ID), {"num_reviews": 20}),
+        "cache.memory_get.details": lambda: memory_cache.get(cache_key),
+        "cache.memory_set.details": lambda: memory_cache.set(cache_key, details, 3600),
+        "cache.redis_json.dumps.details": lambda: json.dumps(details),
+        "cache.redis_json.loads.details": lambda: json.loads(details_json),
+        "tool.json_indent.details": lambda: json.dumps(details, ensure_ascii=False, indent=2),
+        "tool.json_indent.reviews": lambda: json.dumps(reviews, ensure_ascii=False, indent=2),
+        "tool.json_indent.multi_games": lambda: json.dumps(games, ensure_ascii=False, indent=2),
+        "tool.json_indent.compare": lambda: json.dumps(
+            compare_payload, ensure_ascii=False, indent=2
+        ),
+        "rag.create_game_document": lambda: RAGService._create_game_document(None, games[0]),
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Tuple[float, float]:
+    """
+    Time a callable.
+
+    Args:
+        func: Callable to time
+        repeat: Number of timed repeats
+        min_time: Minimum seconds per repeat (sets the loop count)
+
+    Returns:
+        (best, median) microseconds per call
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - start >= min_time / 4:
+            break
+        loops *= 2
+    loops *= 4
+
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        per_call.append((time.perf_counter() - start) / loops * 1e6)
+    return min(per_call), statistics.median(per_call)
+
+
+def run_cases(cases: Dict[str, Callable[[], Any]], repeat: int, min_time: float) -> Dict[str, Any]:
+    """Measure every case."""
+    results = {}
+    for name, func in cases.items():
+        best, median = measure(func, repeat, min_time)
+        results[name] = {"best_us": round(best, 3), "median_us": round(median, 3)}
+    return {"cases": results}
+
+
+def threshold_for(name: str, default: float = DEFAULT_THRESHOLD) -> float:
+    """Allowed slowdown for a case (wider for JSON and dict-heavy cases)."""
+    for prefix, threshold in CASE_THRESHOLDS.items():
+        if name.startswith(prefix):
+            return max(threshold, default)
+    return default
+
+
+def run_processes(args: argparse.Namespace, runs: int) -> List[Dict[str, Any]]:
+    """
+    Run the suite in separate processes.
+
+    Each process gets its own hash seed and memory layout, which move these
+    timings more than repeats within one process do.
+    """
+    all_results = []
+    for i in range(runs):
+        with tempfile.NamedTemporaryFile(suffix=".json") as out:
+            subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.microbench",
+                    "--fixture", args.fixture, "--repeat", str(args.repeat),
+                    "--min-time", str(args.min_time), "--filter", args.filter,
+                    "--baseline", os.devnull, "--json", out.name,
+                ],
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            with open(out.name, encoding="utf-8") as f:
+                all_results.append(json.load(f))
+        print(f"run {i + 1}/{runs} done")
+    return all_results
+
+
+def merge_baseline(all_results: List[Dict[str, Any]], default_threshold: float) -> Dict[str, Any]:
+    """Baseline from several runs: the slowest median of each case."""
+    cases = {}
+    for name in all_results[0]["cases"]:
+        medians = [r["cases"][name]["median_us"] for r in all_results]
+        cases[name] = {
+            "median_us": max(medians),
+            "runs_median_us": medians,
+            "threshold": threshold_for(name, default_threshold),
+        }
+    return {"cases": cases}
+
+
+def check(results: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Compare median times with a baseline.
+
+    Returns:
+        Description per case slower than allowed (empty when all pass)
+    """
+    failures = {}
+    for name, current in results["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            continue
+        threshold = base.get("threshold", threshold_for(name))
+        ratio = current["median_us"] / base["median_us"]
+        if ratio > 1 + threshold:
+            failures[name] = (
+                f"{ratio:.2f}x baseline (allowed {1 + threshold:.2f}x), "
+                f"median {current['median_us']} us vs {base['median_us']} us"
+            )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmark per-chat hot paths")
+    parser.add_argument("--fixture", default="fixtures/steam_sample.json")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per repeat")
+    parser.add_argument("--filter", default="", help="Only run cases containing this text")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--check", action="store_true", help="Fail on regressions over the baseline")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store the slowest median of --runs separate runs as the baseline")
+    parser.add_argument("--runs", type=int, default=5, help="Processes run by --save-baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum allowed slowdown stored with a new baseline")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="Re-measure cases over the threshold before failing --check")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    if args.save_baseline:
+        baseline = merge_baseline(run_processes(args, args.runs), args.threshold)
+        baseline["meta"] = {
+            "runs": args.runs,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        }
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    payloads = asyncio.run(load_payloads(args.fixture))
+    cases = {
+        name: func for name, func in build_cases(payloads).items() if args.filter in name
+    }
+    results = run_cases(cases, args.repeat, args.min_time)
+
+    baseline = None
+    if Path(args.baseline).is_file() and os.path.getsize(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.check and baseline is not None:
+        failures = check(results, baseline)
+        for _ in range(args.retries):
+            if not failures:
+                break
+            # Keep the faster median of both runs per case; a real regression stays slow
+            rerun = run_cases({name: cases[name] for name in failures}, args.repeat, args.min_time)
+            for name, r in rerun["cases"].items():
+                if r["median_us"] < results["cases"][name]["median_us"]:
+                    results["cases"][name] = r
+            failures = check(results, baseline)
+
+    print(f"{'case':<32}{'best us':>10}{'median us':>12}{'vs baseline':>13}")
+    for name, r in results["cases"].items():
+        base = (baseline or {}).get("cases", {}).get(name)
+        change = f"{(r['median_us'] / base['median_us'] - 1) * 100:+.1f}%" if base else "-"
+        print(f"{name:<32}{r['best_us']:>10}{r['median_us']:>12}{change:>13}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.check:
+        if baseline is None:
+            print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+            sys.exit(2)
+        if failures:
+            print("\nRegressions:")
+            for name, failure in failures.items():
+                print(f"  {name}: {failure}")
+            sys.exit(1)
+        print("\nAll cases within the baseline thresholds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+HTTP metrics middleware and the /metrics endpoint.
+"""
+
+import time
+
+from fastapi import FastAPI, Response
+
+from src.config import settings
+from src.utils.metrics import (
+    CONTENT_TYPE,
+    HTTP_IN_FLIGHT,
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    REGISTRY,
+)
+
+
+def _route_template(scope) -> str:
+    """
+    Get the full template of the route that handled a request.
+
+    Routes of included routers may only know their path relative to the
+    router prefix, so the prefix is recovered from the request path (it is
+    static, so cardinality stays bounded).
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    regex = getattr(route, "path_regex", None)
+    if template is None or regex is None:
+        return "unmatched"
+
+    path = scope["path"]
+    start = 0
+    while start != -1:
+        if regex.match(path[start:]):
+            return path[:start] + template
+        start = path.find("/", start + 1)
+    return template
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status and in-flight count of every HTTP request.
+
+    Plain ASGI middleware (no per-request task or body buffering). Requests
+    are labelled with the matched route template (e.g. /api/v1/knowledge/stats),
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            path = _route_template(scope)
+            method = scope["method"]
+            HTTP_LATENCY.labels(method, path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, path, status).inc()
+
+
+def install_metrics(app: FastAPI) -> None:
+    """
+    Add the metrics middleware and a GET /metrics endpoint (Prometheus text format).
+
+    Args:
+        app: FastAPI application
+    """
+    if not settings.metrics_enabled:
+        return
+
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        """Prometheus scrape endpoint."""
+        return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
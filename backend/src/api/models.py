@@ -11,6 +11,10 @@ class ChatRequest(BaseModel):
         default=None, description="Previous conversation messages"
     )
     use_tools: bool = Field(default=True, description="Whether to use tools/agents")
+    include_trace: bool = Field(
+        default=False,
+        description="Add a timing breakdown (LLM iterations, tool calls, Steam requests, cache) to metadata",
+    )
 
 
 class ChatResponse(BaseModel):
@@ -43,6 +47,16 @@ class GameAnalysisRequest(BaseModel):
     app_id: int = Field(..., gt=0, description="Steam application ID")
 
 
+class SimilarGamesRequest(BaseModel):
+    """Request model for similar-game recommendations."""
+
+    app_id: Optional[int] = Field(default=None, gt=0, description="Steam application ID")
+    name: Optional[str] = Field(
+        default=None, min_length=1, description="Game name (used when app_id is not given)"
+    )
+    limit: int = Field(default=5, ge=1, le=20, description="Maximum results")
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
 
@@ -56,6 +70,18 @@ class KnowledgeBaseStats(BaseModel):
     """Knowledge base statistics."""
 
     total_documents: int
-    estimated_games: int
-    estimated_reviews: int
+    estimated_games: int = Field(..., description="Games stored (exact; name kept for compatibility)")
+    estimated_reviews: int = Field(..., description="Reviews stored (exact; name kept for compatibility)")
     collection_name: str
+    documents_by_type: Optional[Dict[str, int]] = Field(
+        default=None, description="Exact document counts per type"
+    )
+    embedding_cache: Optional[Dict[str, Any]] = Field(
+        default=None, description="Embedding cache size, hit rate and embedding time saved"
+    )
+    executor: Optional[Dict[str, Any]] = Field(
+        default=None, description="RAG executor queue and latency metrics"
+    )
+    ingestion: Optional[Dict[str, Any]] = Field(
+        default=None, description="Write-behind ingestion queue metrics"
+    )
@@ -0,0 +1,110 @@
+"""
+Opt-in request profiling middleware and profile retrieval endpoints.
+
+A request is profiled when it carries the X-Profile header with the
+configured secret (PROFILE_SECRET), or when it is picked by the sampling
+rate (PROFILE_SAMPLE_RATE). The response then carries X-Profile-Id, and the
+speedscope file can be downloaded from /api/v1/profiles/{profile_id}.
+Nothing is installed when both options are off.
+"""
+
+import asyncio
+import hmac
+import random
+import uuid
+
+from fastapi import FastAPI, Header, HTTPException, status
+from fastapi.responses import FileResponse
+
+from src.config import settings
+from src.utils.logger import get_logger
+from src.utils.profiler import ProfileStore, start_profile, stop_profile
+
+logger = get_logger()
+
+PROFILE_HEADER = b"x-profile"
+
+
+def _secret_matches(value: str) -> bool:
+    """Compare a provided secret with PROFILE_SECRET in constant time."""
+    return bool(settings.profile_secret) and hmac.compare_digest(
+        value.encode("utf-8"), settings.profile_secret.encode("utf-8")
+    )
+
+
+class ProfilerMiddleware:
+    """Profile selected HTTP requests and store them as speedscope files."""
+
+    def __init__(self, app, store: ProfileStore):
+        self.app = app
+        self.store = store
+
+    def _wants_profile(self, scope) -> bool:
+        if scope["path"].startswith("/api/v1/profiles"):
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return _secret_matches(value.decode("latin-1"))
+        return random.random() < settings.profile_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        profile_header = (b"x-profile-id", profile_id.encode("ascii"))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [profile_header]
+            await send(message)
+
+        profile = start_profile(
+            profile_id, f"{scope['method']} {scope['path']}", settings.profile_interval
+        )
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stop_profile(profile)
+            path = await asyncio.to_thread(self.store.save, profile)
+            if path:
+                logger.info(f"Saved request profile {profile_id} ({scope['path']}) to {path}")
+
+
+def install_profiler(app: FastAPI) -> None:
+    """
+    Add the profiler middleware and profile endpoints when profiling is enabled.
+
+    Args:
+        app: FastAPI application
+    """
+    if not settings.profile_secret and settings.profile_sample_rate <= 0:
+        return
+
+    store = ProfileStore(settings.profile_dir, settings.profile_max_files)
+    app.add_middleware(ProfilerMiddleware, store=store)
+
+    def check_secret(secret: str) -> None:
+        if not _secret_matches(secret):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Invalid profile secret"
+            )
+
+    @app.get("/api/v1/profiles", include_in_schema=False)
+    async def list_profiles(x_profile: str = Header(default="")):
+        """List stored request profiles (requires the X-Profile secret)."""
+        check_secret(x_profile)
+        return store.list()
+
+    @app.get("/api/v1/profiles/{profile_id}", include_in_schema=False)
+    async def get_profile(profile_id: str, x_profile: str = Header(default="")):
+        """Download a speedscope profile (requires the X-Profile secret)."""
+        check_secret(x_profile)
+        if not store.exists(profile_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+        return FileResponse(
+            store.path(profile_id),
+            media_type="application/json",
+            filename=f"{profile_id}.speedscope.json",
+        )
@@ -8,11 +8,15 @@ from src.api.models import (
     GameSearchRequest,
     GameDetailsRequest,
     GameAnalysisRequest,
+    SimilarGamesRequest,
     HealthResponse,
     KnowledgeBaseStats,
 )
-from src.services import SteamService, ChatbotService
-from src.utils.logger import get_logger
+from src.services import SteamService, ChatbotService, RecommendationService, IngestionService
+from src.services.admission_controller import AdmissionRejected
+from src.config import settings
+from src.utils import loop_monitor
+from src.utils.logger import get_logger, flush_logs
 from src import __version__
 
 logger = get_logger()
@@ -24,6 +28,8 @@ router = APIRouter()
 steam_service: SteamService = None
 rag_service = None  # Optional - may not be available
 chatbot_service: ChatbotService = None
+recommendation_service: RecommendationService = None
+ingestion_service: IngestionService = None
 
 
 def get_steam_service():
@@ -42,22 +48,76 @@ def get_rag_service():
         try:
             logger.info("Initializing RAG service...")
             from src.services.rag_service import RAGService
-            rag_service = RAGService()
+            from src.services.async_rag_service import AsyncRAGService
+            rag_service = AsyncRAGService(RAGService())
         except Exception as e:
             logger.warning(f"RAG service not available: {e}")
             rag_service = False  # Mark as attempted but failed
+        else:
+            try:
+                rag_service.start_maintenance()
+            except RuntimeError:
+                pass  # No running event loop (e.g. scripts); compaction stays manual
     return rag_service if rag_service is not False else None
 
 
+def get_ingestion_service():
+    """Get or create the knowledge base ingestion queue. Returns None if RAG is not available."""
+    global ingestion_service
+    if ingestion_service is None:
+        rag = get_rag_service()
+        if rag is None:
+            return None
+        ingestion_service = IngestionService(rag)
+    return ingestion_service
+
+
+def get_recommendation_service():
+    """Get or create Recommendation service instance (lazy initialization)."""
+    global recommendation_service
+    if recommendation_service is None:
+        logger.info("Initializing Recommendation service...")
+        recommendation_service = RecommendationService(get_steam_service())
+    return recommendation_service
+
+
 def get_chatbot_service():
     """Get or create Chatbot service instance (lazy initialization)."""
     global chatbot_service
     if chatbot_service is None:
         logger.info("Initializing Chatbot service...")
-        chatbot_service = ChatbotService()
+        chatbot_service = ChatbotService(
+            steam_service=get_steam_service(),
+            recommendation_service=get_recommendation_service(),
+            rag_service=get_rag_service(),
+        )
     return chatbot_service
 
 
+def _overloaded(e: AdmissionRejected) -> HTTPException:
+    """429 response for a chat shed by LLM admission control."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Chat capacity exceeded, retry later",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+async def shutdown_services():
+    """Flush pending background work and close service connections."""
+    if ingestion_service:
+        await ingestion_service.stop(flush=True)
+    if chatbot_service:
+        await chatbot_service.close()
+    elif steam_service:
+        await steam_service.close()
+    if rag_service:
+        rag_service.shutdown()
+    if loop_monitor.loop_monitor:
+        loop_monitor.loop_monitor.stop()
+    await flush_logs()
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
@@ -81,6 +141,22 @@ async def health_check():
         )
 
 
+@router.get("/diagnostics/loop")
+async def get_loop_diagnostics() -> Dict[str, Any]:
+    """
+    Get event loop lag percentiles and recent blocking calls.
+
+    Each blocking event has the application code location that was running
+    when the loop stalled past the threshold, plus the surrounding stack.
+    """
+    if loop_monitor.loop_monitor is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event loop monitor is not running",
+        )
+    return loop_monitor.loop_monitor.get_stats()
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -94,7 +170,9 @@ async def chat(request: ChatRequest):
 
         if request.use_tools:
             result = await service.chat(
-                message=request.message, conversation_history=request.conversation_history
+                message=request.message,
+                conversation_history=request.conversation_history,
+                include_trace=request.include_trace,
             )
         else:
             response_text = await service.simple_chat(request.message)
@@ -106,6 +184,8 @@ async def chat(request: ChatRequest):
 
         return ChatResponse(**result, timestamp=datetime.now())
 
+    except AdmissionRejected as e:
+        raise _overloaded(e)
     except Exception as e:
         logger.error(f"Error in chat endpoint: {e}")
         raise HTTPException(
@@ -113,6 +193,17 @@ async def chat(request: ChatRequest):
         )
 
 
+@router.get("/chat/stats")
+async def get_chat_stats() -> Dict[str, Any]:
+    """
+    Get chat statistics since startup.
+
+    Returns average LLM iterations and tool calls per chat, and per-tool usage.
+    """
+    service = get_chatbot_service()
+    return service.get_chat_stats()
+
+
 @router.post("/games/search")
 async def search_games(request: GameSearchRequest) -> List[Dict[str, Any]]:
     """
@@ -149,13 +240,14 @@ async def get_game_details(request: GameDetailsRequest) -> Dict[str, Any]:
                 detail=f"Game with ID {request.app_id} not found",
             )
 
-        # Store in knowledge base
+        # Queue for the knowledge base (written in the background)
         try:
-            rag = get_rag_service()
-            reviews_text = [r["review"] for r in details.get("sample_reviews", [])]
-            rag.add_game_to_knowledge_base(details, reviews_text)
+            ingestion = get_ingestion_service()
+            if ingestion:
+                reviews_text = [r["review"] for r in details.get("sample_reviews", [])]
+                await ingestion.submit(details, reviews_text)
         except Exception as e:
-            logger.warning(f"Could not store in RAG: {e}")
+            logger.warning(f"Could not queue game for RAG: {e}")
 
         return details
 
@@ -168,6 +260,43 @@ async def get_game_details(request: GameDetailsRequest) -> Dict[str, Any]:
         )
 
 
+@router.post("/games/similar")
+async def get_similar_games(request: SimilarGamesRequest) -> Dict[str, Any]:
+    """
+    Get games similar to a given game.
+
+    Served from the precomputed similarity index without calling Steam
+    for games already in the local store.
+    """
+    if request.app_id is None and not request.name:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Either app_id or name is required",
+        )
+
+    try:
+        service = get_recommendation_service()
+        result = await service.similar_games(
+            app_id=request.app_id, name=request.name, limit=request.limit
+        )
+
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Game '{request.app_id or request.name}' not found",
+            )
+
+        return result
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting similar games: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
 @router.post("/games/analyze")
 async def analyze_game(request: GameAnalysisRequest) -> Dict[str, Any]:
     """
@@ -189,6 +318,8 @@ async def analyze_game(request: GameAnalysisRequest) -> Dict[str, Any]:
 
     except HTTPException:
         raise
+    except AdmissionRejected as e:
+        raise _overloaded(e)
     except Exception as e:
         logger.error(f"Error analyzing game: {e}")
         raise HTTPException(
@@ -205,8 +336,13 @@ async def get_knowledge_stats():
     """
     try:
         service = get_rag_service()
-        stats = service.get_collection_stats()
-        return KnowledgeBaseStats(**stats)
+        stats = await service.get_collection_stats()
+        ingestion = get_ingestion_service()
+        return KnowledgeBaseStats(
+            **stats,
+            executor=service.get_stats(),
+            ingestion=ingestion.get_stats() if ingestion else None,
+        )
 
     except Exception as e:
         logger.error(f"Error getting knowledge stats: {e}")
@@ -215,6 +351,80 @@ async def get_knowledge_stats():
         )
 
 
+@router.post("/knowledge/reconcile")
+async def reconcile_knowledge_stats() -> Dict[str, Any]:
+    """
+    Rebuild the knowledge base counters from the stored documents.
+
+    Counters are maintained on every write, so this is only needed if they
+    drifted (e.g. after a crash). Scans the whole collection.
+    """
+    service = get_rag_service()
+    if service is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Knowledge base is not available",
+        )
+
+    result = await service.reconcile_stats()
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to reconcile knowledge base stats",
+        )
+    return result
+
+
+@router.post("/knowledge/compact")
+async def compact_knowledge_base() -> Dict[str, Any]:
+    """
+    Evict documents older than their type's TTL (also runs periodically).
+    """
+    service = get_rag_service()
+    if service is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Knowledge base is not available",
+        )
+
+    removed = await service.compact()
+    if removed is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to compact knowledge base",
+        )
+    return {"removed": removed}
+
+
+@router.post("/knowledge/snapshot")
+async def export_knowledge_snapshot() -> Dict[str, Any]:
+    """
+    Export documents, metadata and embeddings to KB_SNAPSHOT_PATH.
+
+    New instances load the snapshot at startup when their store is empty,
+    instead of re-fetching and re-embedding everything.
+    """
+    service = get_rag_service()
+    if service is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Knowledge base is not available",
+        )
+    if not settings.kb_snapshot_path:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="KB_SNAPSHOT_PATH is not configured",
+        )
+
+    info = await service.export_snapshot(settings.kb_snapshot_path)
+    if info is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to export knowledge base snapshot",
+        )
+    return info
+
+
 @router.delete("/knowledge/clear")
 async def clear_knowledge_base():
     """
@@ -224,7 +434,7 @@ async def clear_knowledge_base():
     """
     try:
         service = get_rag_service()
-        success = service.clear_knowledge_base()
+        success = await service.clear_knowledge_base()
 
         if not success:
             raise HTTPException(
@@ -253,8 +463,10 @@ async def root():
         "endpoints": {
             "health": "/health",
             "chat": "/chat",
+            "chat_stats": "/chat/stats",
             "search_games": "/games/search",
             "game_details": "/games/details",
+            "similar_games": "/games/similar",
             "analyze_game": "/games/analyze",
             "knowledge_stats": "/knowledge/stats",
         },
@@ -0,0 +1,280 @@
+"""
+Bulk knowledge-base backfill.
+
+Fetches enriched Steam data for many games with bounded concurrency and
+writes them to the knowledge base in large batches, checkpointing progress so
+an interrupted run can resume.
+
+Usage (from backend/):
+    python -m src.cli.backfill 367520 1145360 --concurrency 8
+    python -m src.cli.backfill --file catalogue.txt --batch-size 64
+    python -m src.cli.backfill --file catalogue.txt --fixture fixtures/steam_sample.json
+    python -m src.cli.backfill --file catalogue.txt --record fixtures/steam_sample.json
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set
+
+import httpx
+
+from src.services.steam_service import SteamService
+from src.utils.logger import get_logger
+from src.utils.steam_fixture import SteamFixture
+
+logger = get_logger()
+
+DEFAULT_CHECKPOINT = "./data/backfill_checkpoint.json"
+
+
+def load_app_ids(app_ids: List[str], catalogue: Optional[str]) -> List[int]:
+    """
+    Collect app_ids from arguments and an optional catalogue file.
+
+    The catalogue may be a JSON list (of ids or objects with "app_id"), a CSV
+    with an "app_id" column, or plain text with one id per line.
+
+    Args:
+        app_ids: App ids given on the command line
+        catalogue: Optional catalogue file path
+
+    Returns:
+        De-duplicated app_ids in input order
+    """
+    values: List[Any] = list(app_ids)
+
+    if catalogue:
+        with open(catalogue, encoding="utf-8") as f:
+            if catalogue.endswith(".json"):
+                for entry in json.load(f):
+                    values.append(entry.get("app_id") if isinstance(entry, dict) else entry)
+            elif catalogue.endswith(".csv"):
+                values.extend(row.get("app_id") for row in csv.DictReader(f))
+            else:
+                values.extend(line.split("#")[0].strip() for line in f)
+
+    seen: Set[int] = set()
+    result = []
+    for value in values:
+        try:
+            app_id = int(value)
+        except (TypeError, ValueError):
+            continue
+        if app_id > 0 and app_id not in seen:
+            seen.add(app_id)
+            result.append(app_id)
+    return result
+
+
+class Checkpoint:
+    """Set of processed app_ids persisted after every batch."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[int] = set()
+        self.missing: Set[int] = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.done = set(data.get("done", []))
+            self.missing = set(data.get("missing", []))
+
+    def __contains__(self, app_id: int) -> bool:
+        return app_id in self.done or app_id in self.missing
+
+    def save(self) -> None:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"done": sorted(self.done), "missing": sorted(self.missing)}, f)
+        os.replace(tmp_path, self.path)
+
+
+async def backfill(
+    app_ids: List[int],
+    rag_service,
+    steam_service: SteamService,
+    checkpoint: Checkpoint,
+    concurrency: int = 8,
+    batch_size: int = 64,
+    retries: int = 2,
+) -> Dict[str, Any]:
+    """
+    Fetch and ingest games.
+
+    Args:
+        app_ids: Games to ingest (already processed ones are skipped)
+        rag_service: Synchronous RAGService
+        steam_service: SteamService used to fetch data
+        checkpoint: Progress checkpoint
+        concurrency: Maximum concurrent Steam fetches
+        batch_size: Games per knowledge base upsert
+        retries: Extra attempts for games that failed without a definite
+            "not found" (timeouts, rate limits, server errors)
+
+    Returns:
+        Run summary with counts and throughput
+    """
+    todo = [app_id for app_id in app_ids if app_id not in checkpoint]
+    logger.info(f"Backfilling {len(todo)} games ({len(app_ids) - len(todo)} already done)")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    summary = {
+        "requested": len(app_ids),
+        "skipped": len(app_ids) - len(todo),
+        "ingested": 0,
+        "missing": 0,
+        "failed": 0,
+        "documents_written": 0,
+        "documents_unchanged": 0,
+        "embed_seconds": 0.0,
+    }
+
+    async def fetch(app_id: int):
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(2 ** (attempt - 1))
+            async with semaphore:
+                data = await steam_service.get_enriched_game_data(app_id)
+            if data or steam_service.is_not_found(app_id):
+                break
+        return app_id, data
+
+    async def flush(batch: List[tuple], batch_ids: List[int]) -> None:
+        embed_start = time.perf_counter()
+        result = await asyncio.to_thread(rag_service.add_games_batch, batch)
+        elapsed = time.perf_counter() - embed_start
+        if result is None:
+            raise RuntimeError(f"Knowledge base write failed for batch starting at {batch_ids[0]}")
+
+        summary["embed_seconds"] += elapsed
+        summary["ingested"] += len(batch)
+        summary["documents_written"] += result["written"]
+        summary["documents_unchanged"] += result["unchanged"]
+        checkpoint.done.update(batch_ids)
+        checkpoint.save()
+
+        total = time.perf_counter() - start
+        logger.info(
+            f"{summary['ingested'] + summary['missing'] + summary['failed']}/{len(todo)} games | "
+            f"batch {result['written']} docs in {elapsed:.2f}s "
+            f"({result['written'] / elapsed if elapsed else 0:.1f} docs/sec) | "
+            f"overall {summary['documents_written'] / total:.1f} docs/sec"
+        )
+
+    batch: List[tuple] = []
+    batch_ids: List[int] = []
+    for next_result in asyncio.as_completed([fetch(app_id) for app_id in todo]):
+        app_id, data = await next_result
+        if not data:
+            if steam_service.is_not_found(app_id):
+                summary["missing"] += 1
+                checkpoint.missing.add(app_id)
+            else:
+                # Left out of the checkpoint so a resumed run tries again
+                summary["failed"] += 1
+                logger.warning(f"Could not fetch {app_id} after {retries + 1} attempts")
+            continue
+
+        reviews = [r["review"] for r in data.get("sample_reviews", []) if r.get("review")]
+        batch.append((data, reviews))
+        batch_ids.append(app_id)
+        if len(batch) >= batch_size:
+            await flush(batch, batch_ids)
+            batch, batch_ids = [], []
+
+    if batch:
+        await flush(batch, batch_ids)
+    checkpoint.save()
+
+    total = time.perf_counter() - start
+    summary["elapsed_seconds"] = round(total, 2)
+    summary["embed_seconds"] = round(summary["embed_seconds"], 2)
+    summary["docs_per_sec"] = round(summary["documents_written"] / total, 2) if total else 0.0
+    summary["embed_docs_per_sec"] = (
+        round(summary["documents_written"] / summary["embed_seconds"], 2)
+        if summary["embed_seconds"]
+        else 0.0
+    )
+    return summary
+
+
+async def _main(args: argparse.Namespace) -> int:
+    app_ids = load_app_ids(args.app_ids, args.file)
+    if not app_ids:
+        logger.error("No app_ids given (pass ids or --file)")
+        return 2
+
+    fixture = None
+    client = None
+    if args.fixture:
+        fixture = SteamFixture(args.fixture)
+        client = httpx.AsyncClient(transport=fixture.replay_transport())
+        logger.info(f"Replaying Steam responses from {args.fixture} (offline)")
+    elif args.record:
+        fixture = SteamFixture(args.record)
+        client = httpx.AsyncClient(transport=fixture.recording_transport(), timeout=30.0)
+        logger.info(f"Recording Steam responses to {args.record}")
+
+    from src.services.rag_service import RAGService
+
+    rag_service = RAGService()
+    steam_service = SteamService(client=client)
+    checkpoint = Checkpoint(args.checkpoint)
+    if args.restart:
+        checkpoint.done.clear()
+        checkpoint.missing.clear()
+
+    try:
+        summary = await backfill(
+            app_ids,
+            rag_service,
+            steam_service,
+            checkpoint,
+            concurrency=args.concurrency,
+            batch_size=args.batch_size,
+            retries=args.retries,
+        )
+    finally:
+        await steam_service.close()
+        # Flushes the debounced knowledge base counters and the embedding cache
+        rag_service.close()
+        if args.record and fixture:
+            fixture.save()
+
+    if fixture and args.fixture:
+        summary["fixture_hits"] = fixture.hits
+        summary["fixture_misses"] = fixture.misses
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill the knowledge base with Steam games")
+    parser.add_argument("app_ids", nargs="*", help="Steam app ids")
+    parser.add_argument("--file", help="Catalogue file (.txt, .csv or .json)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent Steam fetches")
+    parser.add_argument("--batch-size", type=int, default=64, help="Games per knowledge base upsert")
+    parser.add_argument(
+        "--retries", type=int, default=2,
+        help="Extra attempts per game after timeouts, rate limits or server errors",
+    )
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Progress checkpoint file")
+    parser.add_argument("--restart", action="store_true", help="Ignore the existing checkpoint")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--fixture", help="Replay Steam responses from a recorded fixture (offline)")
+    source.add_argument("--record", help="Record live Steam responses to a fixture file")
+    args = parser.parse_args(argv)
+
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
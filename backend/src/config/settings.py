@@ -11,6 +11,9 @@ class Settings(BaseSettings):
     env: str = "development"
     debug: bool = True
     log_level: str = "INFO"
+    log_format: str = "auto"  # auto (json in production), text or json
+    log_levels: str = ""  # Per-module levels, e.g. "src.services.steam_service=DEBUG"
+    log_throttle_interval: float = 10.0  # Seconds between throttled hot-path messages
 
     # Server
     host: str = "0.0.0.0"
@@ -24,13 +27,97 @@ class Settings(BaseSettings):
     claude_model: str = "claude-sonnet-4-5"
     max_tokens: int = 4096
     temperature: float = 0.7
+    llm_max_concurrency: int = 8  # Concurrent Claude calls per process
+    llm_max_queue: int = 32  # Calls waiting for a slot before new chats get 429
+    llm_queue_timeout: float = 15.0  # Max seconds a call waits for a slot
 
-    # ChromaDB
+    # Knowledge base (ChromaDB or the NumPy vector store)
     chroma_persist_dir: str = "./chroma_db"
+    vector_backend: str = "auto"  # auto (chroma if installed), chroma or numpy
+    vector_quantization: str = "float32"  # float32 or int8 (NumPy backend)
+    vector_index: str = "exact"  # exact or ivf (NumPy backend)
+    vector_ivf_nprobe: int = 16  # IVF lists scanned per query (recall vs latency)
+    embedding_dim: int = 384
+    embedding_cache_size: int = 10000  # Cached query/document embeddings (0 disables)
+    embedding_cache_persist: bool = True  # Save the cache next to the collection on shutdown
+    review_dedup_threshold: float = 0.7  # MinHash similarity treated as a duplicate review
+    review_chunk_chars: int = 800  # Longer reviews are split into chunks
+    review_chunk_overlap: int = 120
+    kb_ttl_game_info: int = 604800  # Compaction evicts game info older than 7 days
+    kb_ttl_review: int = 2592000  # ...and reviews older than 30 days (0 keeps forever)
+    kb_timestamp_refresh_interval: int = 3600  # Re-stamp unchanged documents at most hourly
+    kb_compaction_interval: int = 3600  # Seconds between compaction runs (0 disables)
+    kb_snapshot_path: Optional[str] = None  # e.g. ./data/kb_snapshot.npz, loaded into an empty store
+    kb_counters_flush_interval: float = 5.0  # Min seconds between counter file writes
+
+    # Hybrid retrieval (BM25 + vector)
+    retrieval_mode: str = "hybrid"  # hybrid, vector or bm25
+    hybrid_fusion: str = "rrf"  # rrf (reciprocal rank fusion) or weighted
+    hybrid_rrf_k: int = 60
+    hybrid_vector_weight: float = 1.0
+    hybrid_bm25_weight: float = 1.0
+    rag_executor_workers: int = 2  # Threads running blocking RAG calls
+    rag_max_queue: int = 32  # Calls queued or running before new ones are skipped
+    rag_call_timeout: float = 10.0
+
+    # Knowledge-first chat: cached game documents injected before the first LLM call
+    knowledge_first_enabled: bool = True
+    knowledge_first_max_games: int = 3
+    knowledge_first_token_budget: int = 1500
+    knowledge_first_max_distance: float = 0.6  # As reported by the backend (cosine for numpy)
+    knowledge_first_game_max_age: int = 259200  # 3 days: prices and scores move
+    knowledge_first_review_max_age: int = 2592000  # 30 days
+    knowledge_first_timeout: float = 1.0  # Skip retrieval rather than delay the chat
+    knowledge_first_holdout: float = 0.0  # Fraction of chats kept as a no-context control group
+
+    # Write-behind knowledge base ingestion
+    ingest_queue_size: int = 256
+    ingest_batch_size: int = 32
+    ingest_flush_interval: float = 0.5  # Seconds to wait for a batch to fill
+    ingest_enqueue_timeout: float = 0.5  # Backpressure wait before dropping an item
+    ingest_spool_path: Optional[str] = None  # e.g. ./data/ingest_spool.jsonl
+
+    # Local game store (SQLite + FTS5)
+    game_store_path: Optional[str] = "./data/game_store.db"
+    game_store_ttl: int = 604800  # Serve stored details for up to 7 days
+
+    # Genre search answered from the local facet index
+    genre_local_min_results: int = 3  # Local matches needed to skip Steam (0 always asks Steam)
+    genre_refresh_interval: int = 3600  # Seconds between background Steam re-searches of a locally answered genre (0 never)
+
+    # Similar-games recommendations
+    similar_games_top_k: int = 20
+    similar_games_rebuild_interval: int = 300  # Seconds between index rebuilds
 
     # Redis Cache
     redis_url: Optional[str] = None
     cache_ttl: int = 3600
+    memory_cache_max_entries: int = 10000
+
+    # Speculative prefetch of Steam data for top search results
+    prefetch_enabled: bool = True
+    prefetch_top_n: int = 3
+    prefetch_max_concurrency: int = 4
+    prefetch_max_pending: int = 20
+
+    # Observability
+    metrics_enabled: bool = True  # Prometheus-style /metrics endpoint and HTTP metrics
+    chat_trace_log: bool = True  # Log each chat's timing trace as a JSON line
+    loop_monitor_enabled: bool = True  # Event loop lag monitor and blocking-call detector
+    loop_monitor_interval: float = 0.1  # Seconds between heartbeats
+    loop_block_threshold: float = 0.1  # Loop stalls longer than this capture a stack
+    profile_secret: Optional[str] = None  # Requests with X-Profile: <secret> are profiled
+    profile_sample_rate: float = 0.0  # Fraction of requests profiled without the header
+    profile_interval: float = 0.005  # Seconds between profiler samples
+    profile_dir: str = "./data/profiles"  # Speedscope files, one per profiled request
+    profile_max_files: int = 50
+
+    # Offline upstreams (benchmarks, load tests)
+    upstream_mode: str = "live"  # live, record (capture Claude/Steam responses) or replay
+    llm_fixture_path: str = "./fixtures/sessions/chat_sessions.json"
+    steam_fixture_path: str = "./fixtures/steam_sample.json"
+    replay_llm_latency: str = "recorded"  # none, recorded, fixed:MS, uniform:LO,HI, normal:MEAN,STD or lognormal:MEDIAN,SIGMA
+    replay_steam_latency: str = "lognormal:120,0.5"
 
     # Steam API
     steam_api_base_url: str = "https://api.steampowered.com"
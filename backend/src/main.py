@@ -3,7 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from src.config import settings
-from src.api.routes import router
+from src.api.routes import router, shutdown_services
+from src.api.metrics import install_metrics
+from src.api.profiling import install_profiler
+from src.utils.loop_monitor import start_loop_monitor
 from src.utils.logger import get_logger
 
 logger = get_logger()
@@ -15,9 +18,12 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Videogames Chatbot API...")
     logger.info(f"Environment: {settings.env}")
     logger.info(f"Claude Model: {settings.claude_model}")
+    if settings.loop_monitor_enabled:
+        start_loop_monitor(settings.loop_monitor_interval, settings.loop_block_threshold)
 
     yield
 
+    await shutdown_services()
     logger.info("Shutting down Videogames Chatbot API...")
 
 
@@ -43,6 +49,12 @@ app.add_middleware(
 # Include routers
 app.include_router(router, prefix="/api/v1")
 
+# Prometheus-style metrics (/metrics)
+install_metrics(app)
+
+# Opt-in request profiling (PROFILE_SECRET / PROFILE_SAMPLE_RATE)
+install_profiler(app)
+
 
 @app.get("/")
 async def root():
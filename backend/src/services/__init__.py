@@ -1,9 +1,22 @@
+from .game_store import GameStore
 from .steam_service import SteamService
+from .recommendation_service import RecommendationService
+from .async_rag_service import AsyncRAGService
+from .ingestion_service import IngestionService
 from .chatbot_service import ChatbotService
 
+__all__ = [
+    "GameStore",
+    "SteamService",
+    "RecommendationService",
+    "AsyncRAGService",
+    "IngestionService",
+    "ChatbotService",
+]
+
 # RAGService is optional - only export if available
 try:
     from .rag_service import RAGService
-    __all__ = ["SteamService", "RAGService", "ChatbotService"]
+    __all__.append("RAGService")
 except ImportError:
-    __all__ = ["SteamService", "ChatbotService"]
+    pass
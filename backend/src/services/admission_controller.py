@@ -0,0 +1,191 @@
+"""
+Admission control for LLM calls.
+
+Every Claude call takes one of a fixed number of concurrency slots. Calls
+beyond the cap wait in a FIFO queue for at most a timeout. New chats are shed
+immediately (429 with Retry-After) once the queue is full, while calls from
+chats already in progress may still queue: they have done part of their work,
+so finishing them frees capacity sooner than starting new ones.
+
+Slots are per process (one controller per worker).
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Any, Optional
+
+from src.config import settings
+from src.utils.logger import get_logger
+from src.utils.metrics import LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT, LLM_REJECTED
+
+logger = get_logger()
+
+# Bounds of the Retry-After estimate, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 60
+
+
+class AdmissionRejected(Exception):
+    """Raised when an LLM call is shed (queue full or wait timed out)."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"LLM capacity exceeded ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency cap and bounded wait queue for LLM calls."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            max_concurrency: Concurrent LLM calls (defaults to settings.llm_max_concurrency)
+            max_queue: Calls waiting before new chats are shed (defaults to settings.llm_max_queue)
+            queue_timeout: Max seconds a call waits for a slot (defaults to settings.llm_queue_timeout)
+        """
+        if max_concurrency is None:
+            max_concurrency = settings.llm_max_concurrency
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = settings.llm_max_queue if max_queue is None else max_queue
+        # 0 is a valid timeout: queued calls fail fast instead of waiting
+        self.queue_timeout = settings.llm_queue_timeout if queue_timeout is None else queue_timeout
+
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Moving average of how long a call holds a slot, for Retry-After
+        self._avg_hold = 2.0
+
+        self.stats = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "max_queue_depth": 0,
+            "wait_seconds_total": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def queue_depth(self) -> int:
+        """Get number of calls waiting for a slot."""
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Estimate seconds until the current queue drains."""
+        seconds = self._avg_hold * (len(self._waiters) + 1) / self.max_concurrency
+        return min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(seconds)))
+
+    def check(self) -> None:
+        """
+        Shed a new chat before it does any work if the queue is full.
+
+        Raises:
+            AdmissionRejected: If no slot is free and the queue is full
+        """
+        if self._active >= self.max_concurrency and len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+    @asynccontextmanager
+    async def slot(self, in_progress: bool = False):
+        """
+        Hold a concurrency slot for one LLM call.
+
+        Args:
+            in_progress: The call belongs to a chat that already made LLM calls
+                (allowed to queue past max_queue, still bounded by the timeout)
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait timed out
+        """
+        await self._acquire(in_progress)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._avg_hold += 0.1 * (time.perf_counter() - start - self._avg_hold)
+            self._release()
+
+    async def _acquire(self, in_progress: bool) -> None:
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            self.stats["admitted"] += 1
+            return
+        if not in_progress and len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self.stats["queued"] += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._waiters))
+        LLM_QUEUE_DEPTH.set(len(self._waiters))
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the wait ended; pass it on
+                self._release()
+            elif future in self._waiters:
+                self._waiters.remove(future)
+                LLM_QUEUE_DEPTH.set(len(self._waiters))
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject("timeout")
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            LLM_QUEUE_WAIT.observe(waited)
+            self.stats["wait_seconds_total"] += waited
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+        self.stats["admitted"] += 1
+
+    def _release(self) -> None:
+        """Hand the slot to the oldest waiter, or free it."""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                LLM_QUEUE_DEPTH.set(len(self._waiters))
+                future.set_result(None)
+                return
+        LLM_QUEUE_DEPTH.set(0)
+        self._active -= 1
+
+    def _reject(self, reason: str) -> None:
+        self.stats[f"rejected_{reason}"] += 1
+        LLM_REJECTED.labels(reason).inc()
+        retry_after = self.retry_after()
+        logger.bind(throttle=f"llm_admission_{reason}").warning(
+            f"Shedding LLM call ({reason}): {self._active} running, "
+            f"{len(self._waiters)} waiting, retry after {retry_after}s"
+        )
+        raise AdmissionRejected(reason, retry_after)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get admission statistics.
+
+        Returns:
+            Dictionary with limits, running and waiting calls, outcome counters
+            and average/max wait in milliseconds
+        """
+        queued = self.stats["queued"]
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "running": self._active,
+            "waiting": len(self._waiters),
+            **{k: v for k, v in self.stats.items() if "seconds" not in k},
+            "avg_wait_ms": round(self.stats["wait_seconds_total"] / queued * 1000, 2) if queued else 0.0,
+            "max_wait_ms": round(self.stats["max_wait_seconds"] * 1000, 2),
+            "avg_call_seconds": round(self._avg_hold, 2),
+        }
@@ -0,0 +1,238 @@
+"""
+Async facade over the synchronous RAGService.
+
+ChromaDB calls (including embedding) are blocking, so every RAGService method
+runs in a dedicated bounded thread pool instead of on the event loop. Calls
+beyond the queue limit or past their timeout fall back to the same "empty"
+results RAGService returns on errors.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.config import settings
+from src.services.rag_service import COLLECTION_NAME
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class AsyncRAGService:
+    """Runs RAGService calls in a bounded executor with queue-depth metrics and timeouts."""
+
+    def __init__(
+        self,
+        rag_service,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the facade.
+
+        Args:
+            rag_service: Synchronous RAGService instance
+            max_workers: Executor threads (defaults to settings.rag_executor_workers)
+            max_queue: Maximum calls queued or running (defaults to settings.rag_max_queue)
+            timeout: Default per-call timeout in seconds (defaults to settings.rag_call_timeout)
+        """
+        self.rag = rag_service
+        self.max_workers = max_workers or settings.rag_executor_workers
+        self.max_queue = max_queue or settings.rag_max_queue
+        self.timeout = timeout or settings.rag_call_timeout
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="rag"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._maintenance: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "max_queue_depth": 0,
+            "wait_seconds_total": 0.0,
+            "run_seconds_total": 0.0,
+        }
+
+    async def add_game_to_knowledge_base(
+        self, game_data: Dict[str, Any], reviews: Optional[List[str]] = None
+    ) -> bool:
+        """Add game information to the knowledge base without blocking the loop."""
+        return await self._call(
+            "add_game_to_knowledge_base", game_data, reviews, default=False
+        )
+
+    async def add_games_batch(
+        self, items: List[Tuple[Dict[str, Any], Optional[List[str]]]]
+    ) -> Optional[Dict[str, int]]:
+        """Add several games in one batch without blocking the loop."""
+        return await self._call("add_games_batch", items, default=None)
+
+    async def search_similar_games(
+        self, query: str, n_results: int = 5, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Search the knowledge base without blocking the loop."""
+        return await self._call(
+            "search_similar_games", query, n_results, filters, default=[]
+        )
+
+    async def get_game_context(self, app_id: int) -> Optional[str]:
+        """Get stored context for a game without blocking the loop."""
+        return await self._call("get_game_context", app_id, default=None)
+
+    async def get_game_documents(self, app_id: int) -> List[Dict[str, Any]]:
+        """Get a game's stored documents and metadata without blocking the loop."""
+        return await self._call("get_game_documents", app_id, default=[])
+
+    async def delete_game(self, app_id: int) -> bool:
+        """Delete a game from the knowledge base without blocking the loop."""
+        return await self._call("delete_game", app_id, default=False)
+
+    async def get_collection_stats(self) -> Dict[str, Any]:
+        """Get knowledge base statistics without blocking the loop."""
+        return await self._call(
+            "get_collection_stats",
+            default={
+                "total_documents": 0,
+                "estimated_games": 0,
+                "estimated_reviews": 0,
+                "collection_name": COLLECTION_NAME,
+            },
+        )
+
+    async def reconcile_stats(self) -> Optional[Dict[str, Any]]:
+        """Rebuild knowledge base counters without blocking the loop (full scan, long timeout)."""
+        return await self._call("reconcile_stats", default=None, timeout=300.0)
+
+    async def compact(self) -> Optional[Dict[str, int]]:
+        """Evict documents past their TTL without blocking the loop."""
+        return await self._call("compact", default=None, timeout=300.0)
+
+    async def export_snapshot(
+        self, path: str, if_changed: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Write a knowledge base snapshot without blocking the loop (full scan, long timeout)."""
+        return await self._call("export_snapshot", path, if_changed, default=None, timeout=600.0)
+
+    def start_maintenance(self, interval: Optional[float] = None) -> None:
+        """
+        Start the periodic compaction task on the running event loop.
+
+        Each run evicts expired documents and, when settings.kb_snapshot_path
+        is set, exports a snapshot if anything changed since the last one.
+
+        Args:
+            interval: Seconds between runs (defaults to settings.kb_compaction_interval)
+        """
+        interval = settings.kb_compaction_interval if interval is None else interval
+        if interval <= 0 or (self._maintenance and not self._maintenance.done()):
+            return
+        self._maintenance = asyncio.create_task(self._maintenance_loop(interval))
+
+    async def _maintenance_loop(self, interval: float) -> None:
+        """Run compaction and snapshot export every interval seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.compact()
+            if settings.kb_snapshot_path:
+                await self.export_snapshot(settings.kb_snapshot_path, True)
+
+    async def clear_knowledge_base(self) -> bool:
+        """Clear the knowledge base without blocking the loop."""
+        return await self._call("clear_knowledge_base", default=False)
+
+    def queue_depth(self) -> int:
+        """Get number of calls waiting for an executor thread."""
+        return self._queued
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics.
+
+        Returns:
+            Dictionary with queue depth, in-flight calls, outcome counters and
+            average wait/run times in milliseconds
+        """
+        finished = self.stats["completed"] + self.stats["failed"]
+        wait_total = self.stats["wait_seconds_total"]
+        run_total = self.stats["run_seconds_total"]
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queued": self._queued,
+            "running": self._running,
+            **{k: v for k, v in self.stats.items() if not k.endswith("_seconds_total")},
+            "avg_wait_ms": round(wait_total / finished * 1000, 2) if finished else 0.0,
+            "avg_run_ms": round(run_total / finished * 1000, 2) if finished else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop accepting work, release executor threads once idle and persist state."""
+        if self._maintenance:
+            self._maintenance.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        try:
+            self.rag.close()
+        except Exception as e:
+            logger.warning(f"Error closing RAG service: {e}")
+
+    async def _call(
+        self, method: str, *args, default: Any = None, timeout: Optional[float] = None
+    ) -> Any:
+        """Run a RAGService method in the executor, returning default on overload or timeout."""
+        with self._lock:
+            depth = self._queued + self._running
+            if depth >= self.max_queue:
+                self.stats["rejected"] += 1
+                logger.warning(f"RAG executor full ({depth} calls), skipping {method}")
+                return default
+            self._queued += 1
+            self.stats["submitted"] += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], depth + 1)
+
+        submitted_at = time.perf_counter()
+        func = getattr(self.rag, method)
+
+        def run():
+            started_at = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self.stats["wait_seconds_total"] += started_at - submitted_at
+            try:
+                result = func(*args)
+                outcome = "completed"
+                return result
+            except Exception:
+                outcome = "failed"
+                raise
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self.stats[outcome] += 1
+                    self.stats["run_seconds_total"] += time.perf_counter() - started_at
+
+        future = self._executor.submit(run)
+        try:
+            # Shield so a timeout never cancels a call that has not started yet
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)), timeout or self.timeout
+            )
+        except asyncio.TimeoutError:
+            # The thread keeps running; only the caller stops waiting
+            with self._lock:
+                self.stats["timeouts"] += 1
+            logger.warning(f"RAG call {method} timed out after {timeout or self.timeout}s")
+            return default
+        except Exception as e:
+            logger.error(f"RAG call {method} failed: {e}")
+            return default
@@ -0,0 +1,157 @@
+"""
+Incremental BM25 inverted index kept next to the vector collection.
+
+Lexical scoring catches what embeddings miss: exact titles, studio names and
+franchise numbers ("Hollow Knight", "FromSoftware", "Baldur's Gate 3").
+Documents can be added, replaced and removed one at a time; document
+frequencies and average length are maintained incrementally.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.services.vector_store import matches_where
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase word tokens (numbers are kept).
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens
+    """
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index with per-document metadata for filtering."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalisation
+        """
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._metas: Dict[str, Dict[str, Any]] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def upsert(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        Add or replace documents.
+
+        Args:
+            ids: Document ids
+            documents: Document texts
+            metadatas: Optional metadata used by `where` filters
+        """
+        metadatas = metadatas or [{} for _ in ids]
+        with self._lock:
+            for doc_id, document, meta in zip(ids, documents, metadatas):
+                self._remove(doc_id)
+                counts = Counter(tokenize(document))
+                for term, tf in counts.items():
+                    self._postings.setdefault(term, {})[doc_id] = tf
+                length = sum(counts.values())
+                self._doc_len[doc_id] = length
+                self._doc_terms[doc_id] = list(counts)
+                self._metas[doc_id] = dict(meta or {})
+                self._total_len += length
+
+    def update_metadata(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Replace stored metadata of indexed documents (postings are unchanged)."""
+        with self._lock:
+            for doc_id, meta in zip(ids, metadatas):
+                if doc_id in self._metas:
+                    self._metas[doc_id] = dict(meta or {})
+
+    def delete(self, ids: List[str]) -> None:
+        """Remove documents (unknown ids are ignored)."""
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def clear(self) -> None:
+        """Remove every document."""
+        with self._lock:
+            self._postings.clear()
+            self._doc_len.clear()
+            self._doc_terms.clear()
+            self._metas.clear()
+            self._total_len = 0
+
+    def search(
+        self, query: str, n_results: int = 10, where: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Score documents containing any query term.
+
+        Args:
+            query: Search query
+            n_results: Number of results to return
+            where: Optional ChromaDB-style metadata filter
+
+        Returns:
+            List of (doc_id, score) sorted by descending score
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if not n_docs or not terms:
+                return []
+            avg_len = self._total_len / n_docs
+
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            if where:
+                scores = {
+                    doc_id: score for doc_id, score in scores.items()
+                    if matches_where(self._metas[doc_id], where)
+                }
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n_results]
+
+    def _remove(self, doc_id: str) -> None:
+        """Drop a document's postings (caller holds the lock)."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+        self._metas.pop(doc_id, None)
@@ -3,44 +3,140 @@ Simplified chatbot service without complex LangChain agents.
 Uses direct Claude API with tool calling.
 """
 
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from contextlib import nullcontext
+from contextvars import ContextVar
 from typing import Dict, Any, List, Optional
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
 from langchain_core.tools import tool
 
 from src.config import settings
+from src.utils.latency import LatencyModel
+from src.utils.llm_fixture import LLMFixture, RecordingChatModel, ReplayChatModel
 from src.utils.logger import get_logger
-from src.services.steam_service import SteamService
+from src.utils.metrics import (
+    CHAT_ITERATIONS,
+    LLM_IN_FLIGHT,
+    LLM_LATENCY,
+    LLM_REQUESTS,
+    LLM_TOKENS,
+    TOOL_CALLS,
+    TOOL_LATENCY,
+)
+from src.utils.tracing import current_trace, end_trace, start_trace
+from src.services.steam_service import SteamService, REVIEWS_PER_REQUEST, steam_request_counter
+from src.services.recommendation_service import RecommendationService
+from src.services.prefetch_service import PrefetchService
+from src.services.async_rag_service import AsyncRAGService
+from src.services.admission_controller import AdmissionController, AdmissionRejected
+from src.services.knowledge_retriever import KnowledgeRetriever
 
 logger = get_logger()
 
+# New Steam titles whose details a background genre refresh fetches
+GENRE_REFRESH_MAX_GAMES = 5
+
+# Genres remembered for refresh scheduling before stale entries are pruned
+MAX_GENRE_REFRESH_KEYS = 1000
+
+# Maximum games resolved by the composite by-name tools
+MAX_GAMES_BY_NAME = 5
+
+# Prefetches started during the current chat, cancelled when it finishes
+_chat_prefetches: ContextVar[Optional[list]] = ContextVar("chat_prefetches", default=None)
+
 
 class ChatbotService:
     """Main chatbot service using Claude with direct tool calling."""
 
-    def __init__(self):
-        """Initialize chatbot with Claude LLM."""
-        self.steam_service = SteamService()
+    def __init__(
+        self,
+        steam_service: Optional[SteamService] = None,
+        recommendation_service: Optional[RecommendationService] = None,
+        rag_service: Optional[AsyncRAGService] = None,
+        admission: Optional[AdmissionController] = None,
+    ):
+        """
+        Initialize chatbot with Claude LLM.
+
+        Args:
+            steam_service: Optional shared Steam service (a new one is created otherwise)
+            recommendation_service: Optional shared similar-games engine
+            rag_service: Optional shared async RAG facade
+            admission: Optional LLM admission controller (created from settings otherwise)
+        """
+        self.steam_service = steam_service or SteamService()
+        self.admission = admission or AdmissionController()
+        self.recommendation_service = recommendation_service or RecommendationService(
+            self.steam_service
+        )
+        self.prefetch_service = PrefetchService(self.steam_service)
+
+        # Last Steam search per genre (monotonic time), so genres answered from
+        # the facet index still pick up new titles in the background
+        self._genre_refreshed: Dict[str, float] = {}
+        self._genre_refresh_tasks: set = set()
 
         # RAG is optional - skip if ChromaDB/ONNXRuntime not available
-        try:
-            from src.services.rag_service import RAGService
-            self.rag_service = RAGService()
-            logger.info("RAG service initialized")
-        except Exception as e:
-            logger.warning(f"RAG service not available (this is OK): {e}")
-            self.rag_service = None
+        self.rag_service = rag_service
+        if self.rag_service is None:
+            try:
+                from src.services.rag_service import RAGService
+                self.rag_service = AsyncRAGService(RAGService())
+                logger.info("RAG service initialized")
+            except Exception as e:
+                logger.warning(f"RAG service not available (this is OK): {e}")
+
+        # Knowledge-first retrieval needs the knowledge base
+        self.knowledge_retriever = (
+            KnowledgeRetriever(self.rag_service)
+            if self.rag_service and settings.knowledge_first_enabled
+            else None
+        )
 
         # Define tools
         self.tools = self._create_tools()
 
-        # Initialize Claude with tools
+        # Initialize Claude with tools (or recorded responses, see UPSTREAM_MODE)
+        self.llm_fixture: Optional[LLMFixture] = None
+        self.llm = self._create_llm()
+
+        # System prompt
+        self.system_prompt = self._create_system_prompt()
+
+        # Running totals to track LLM iterations and tool usage per chat
+        self.chat_stats = {"chats": 0, "llm_iterations": 0, "tool_calls": 0}
+        self.tool_usage: Counter = Counter()
+
+        # Per knowledge-first group: "injected" (context added), "holdout" (context
+        # found but withheld as a control) and "none" (nothing relevant stored)
+        self.knowledge_stats = {
+            group: {"chats": 0, "llm_iterations": 0, "steam_requests": 0, "answered_without_tools": 0}
+            for group in ("injected", "holdout", "none")
+        }
+
+        logger.info(f"Chatbot initialized with model: {settings.claude_model}")
+
+    def _create_llm(self):
+        """Create the tool-bound Claude model, or its replaying/recording stand-in."""
+        if settings.upstream_mode == "replay":
+            self.llm_fixture = LLMFixture(settings.llm_fixture_path)
+            logger.info(
+                f"Replaying Claude responses from {settings.llm_fixture_path} "
+                f"({len(self.llm_fixture.sessions)} sessions, latency {settings.replay_llm_latency})"
+            )
+            return ReplayChatModel(self.llm_fixture, LatencyModel(settings.replay_llm_latency))
+
         logger.info(f"Initializing ChatAnthropic with model: {settings.claude_model}")
         logger.info(f"API key present: {bool(settings.anthropic_api_key)}")
-        logger.info(f"API key prefix: {settings.anthropic_api_key[:20]}...")
 
         try:
-            self.llm = ChatAnthropic(
+            llm = ChatAnthropic(
                 anthropic_api_key=settings.anthropic_api_key,
                 model=settings.claude_model,
                 max_tokens=settings.max_tokens,
@@ -51,14 +147,25 @@ class ChatbotService:
             logger.error(f"✗ Failed to initialize ChatAnthropic: {e}")
             raise
 
-        # System prompt
-        self.system_prompt = self._create_system_prompt()
-
-        logger.info(f"Chatbot initialized with model: {settings.claude_model}")
+        if settings.upstream_mode == "record":
+            self.llm_fixture = LLMFixture(settings.llm_fixture_path)
+            logger.info(f"Recording Claude responses to {settings.llm_fixture_path}")
+            return RecordingChatModel(llm, self.llm_fixture)
+        return llm
 
     def _create_tools(self) -> List:
         """Create tool definitions for Claude."""
         steam_service = self.steam_service
+        facet_index = steam_service.facet_index
+        recommendation_service = self.recommendation_service
+        prefetch = self.prefetch_service
+
+        def prefetch_top_results(app_ids: List[int], kinds=("details", "reviews")) -> None:
+            """Start background prefetches, tracked so the chat can cancel them."""
+            keys = prefetch.schedule(app_ids, kinds)
+            chat_keys = _chat_prefetches.get()
+            if chat_keys is not None:
+                chat_keys.extend(keys)
 
         @tool
         async def search_steam_games(query: str, limit: int = 5) -> str:
@@ -77,6 +184,8 @@ class ChatbotService:
                 if not results:
                     return f"No se encontraron juegos para '{query}'"
 
+                prefetch_top_results([game["app_id"] for game in results])
+
                 import json
                 return json.dumps(results, ensure_ascii=False, indent=2)
             except Exception as e:
@@ -95,6 +204,7 @@ class ChatbotService:
                 JSON string with comprehensive game details
             """
             try:
+                await prefetch.claim("details", app_id)
                 details = await steam_service.get_game_details(app_id)
                 if not details:
                     return f"No se pudo obtener información del juego {app_id}"
@@ -118,6 +228,8 @@ class ChatbotService:
                 JSON string with review data and statistics
             """
             try:
+                if num_reviews == REVIEWS_PER_REQUEST:
+                    await prefetch.claim("reviews", app_id)
                 reviews = await steam_service.get_game_reviews(app_id, num_reviews=num_reviews)
                 if not reviews:
                     return f"No se pudieron obtener reseñas del juego {app_id}"
@@ -147,6 +259,12 @@ class ChatbotService:
                 # Limit to 5 games max
                 app_ids = app_ids[:5]
 
+                await asyncio.gather(*(
+                    prefetch.claim(kind, app_id)
+                    for app_id in app_ids
+                    for kind in ("details", "reviews")
+                ))
+
                 # Fetch all games in parallel
                 tasks = [steam_service.get_enriched_game_data(app_id) for app_id in app_ids]
                 results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -167,14 +285,18 @@ class ChatbotService:
                 return f"Error al obtener detalles de múltiples juegos: {str(e)}"
 
         @tool
-        async def search_games_by_genre(genre: str, limit: int = 10) -> str:
+        async def search_games_by_genre(
+            genre: str, limit: int = 10, sort_by: str = "recommendations"
+        ) -> str:
             """
             Search for games by genre or tag (horror, indie, action, RPG, etc.).
-            More efficient than searching one by one.
+            More efficient than searching one by one. Known genres and categories
+            are answered from the local index of previously seen games.
 
             Args:
                 genre: Genre or tag to search (e.g., "horror indie", "action RPG")
                 limit: Maximum number of results (default 10)
+                sort_by: Ranking for local results: "recommendations" or "metacritic"
 
             Returns:
                 JSON string with list of games matching the genre
@@ -182,8 +304,36 @@ class ChatbotService:
             try:
                 import json
 
+                # Resolve known genres/categories locally; leftover terms must appear in the text
+                filters, unmatched = facet_index.resolve(genre)
+                min_local = settings.genre_local_min_results
+                if filters and min_local > 0:
+                    local_games = facet_index.query(**filters, sort_by=sort_by, limit=None)
+                    if unmatched:
+                        local_games = [
+                            game for game in local_games
+                            if all(
+                                term in f"{game['name']} {game['short_description']}".lower()
+                                for term in unmatched
+                            )
+                        ]
+
+                    if len(local_games) >= min(limit, min_local):
+                        logger.info(f"Answered genre search '{genre}' from local facet index")
+                        prefetch_top_results([game["app_id"] for game in local_games], ("reviews",))
+                        self._schedule_genre_refresh(genre, limit)
+                        return json.dumps({
+                            "search_genre": genre,
+                            "source": "local_index",
+                            "matched_facets": filters,
+                            "total_found": len(local_games),
+                            "detailed_games": local_games[:limit],
+                            "additional_results": [],
+                        }, ensure_ascii=False, indent=2)
+
                 # Search using genre keywords
                 results = await steam_service.search_games(genre, limit=limit)
+                self._genre_refreshed[genre.strip().lower()] = time.monotonic()
 
                 if not results:
                     return f"No se encontraron juegos para el género '{genre}'"
@@ -207,6 +357,8 @@ class ChatbotService:
                         logger.error(f"Error getting details for {game['app_id']}: {e}")
                         continue
 
+                prefetch_top_results([game["app_id"] for game in games_with_details], ("reviews",))
+
                 return json.dumps({
                     "search_genre": genre,
                     "total_found": len(results),
@@ -217,14 +369,303 @@ class ChatbotService:
                 logger.error(f"Error in search_games_by_genre: {e}")
                 return f"Error al buscar juegos por género: {str(e)}"
 
+        @tool
+        async def get_games_by_name(game_names: List[str]) -> str:
+            """
+            Get full information for games given by NAME, in a single step.
+            Resolves each name on Steam and fetches details, review summary,
+            sample reviews and current players for all games concurrently.
+            Use this instead of search_steam_games + get_game_details + get_game_reviews.
+
+            Args:
+                game_names: List of game names (max 5), e.g. ["Elden Ring"]
+
+            Returns:
+                JSON string with one entry per requested name
+            """
+            try:
+                import json
+
+                games = await self._games_by_name(game_names)
+                return json.dumps(games, ensure_ascii=False, indent=2)
+            except Exception as e:
+                logger.error(f"Error in get_games_by_name: {e}")
+                return f"Error al obtener juegos por nombre: {str(e)}"
+
+        @tool
+        async def compare_games_by_name(game_names: List[str]) -> str:
+            """
+            Compare games given by NAME, in a single step.
+            Resolves and fetches all games concurrently and returns their data
+            plus a side-by-side comparison of price, scores, reviews and players.
+
+            Args:
+                game_names: List of 2 to 5 game names, e.g. ["Cyberpunk 2077", "The Witcher 3"]
+
+            Returns:
+                JSON string with games and a field-by-field comparison
+            """
+            try:
+                import json
+
+                games = await self._games_by_name(game_names)
+                found = [game for game in games if "error" not in game]
+
+                comparison = {}
+                for field in (
+                    "price",
+                    "release_date",
+                    "developers",
+                    "genres",
+                    "metacritic_score",
+                    "positive_percent",
+                    "total_reviews",
+                    "review_score_desc",
+                    "current_players",
+                    "recommendations",
+                ):
+                    comparison[field] = {game["name"]: game.get(field) for game in found}
+
+                return json.dumps(
+                    {"games": games, "comparison": comparison}, ensure_ascii=False, indent=2
+                )
+            except Exception as e:
+                logger.error(f"Error in compare_games_by_name: {e}")
+                return f"Error al comparar juegos: {str(e)}"
+
+        @tool
+        async def find_similar_games(game_name: str, limit: int = 5) -> str:
+            """
+            Find games similar to a given game (e.g., "games like Hollow Knight").
+            Uses a precomputed similarity index of known games, so it answers
+            in one step without searching Steam game by game.
+
+            Args:
+                game_name: Name of the reference game
+                limit: Maximum number of similar games (default 5)
+
+            Returns:
+                JSON string with the reference game and its most similar games
+            """
+            try:
+                import json
+
+                result = await recommendation_service.similar_games(name=game_name, limit=limit)
+                if not result or not result["similar_games"]:
+                    return f"No se encontraron juegos similares a '{game_name}'"
+
+                return json.dumps(result, ensure_ascii=False, indent=2)
+            except Exception as e:
+                logger.error(f"Error in find_similar_games: {e}")
+                return f"Error al buscar juegos similares: {str(e)}"
+
         return [
             search_steam_games,
             get_game_details,
             get_game_reviews,
             get_multiple_games_details,
-            search_games_by_genre
+            search_games_by_genre,
+            find_similar_games,
+            get_games_by_name,
+            compare_games_by_name,
         ]
 
+    def _schedule_genre_refresh(self, genre: str, limit: int) -> None:
+        """
+        Re-search a genre on Steam in the background, at most once per interval.
+
+        Details fetched for titles missing from the facet index are added to it,
+        so later local answers include them.
+
+        Args:
+            genre: Genre search text answered from the local index
+            limit: Steam results to look at
+        """
+        interval = settings.genre_refresh_interval
+        if interval <= 0:
+            return
+
+        key = genre.strip().lower()
+        now = time.monotonic()
+        last = self._genre_refreshed.get(key)
+        if last is not None and now - last < interval:
+            return
+        self._genre_refreshed[key] = now
+        if len(self._genre_refreshed) > MAX_GENRE_REFRESH_KEYS:
+            self._genre_refreshed = {
+                k: t for k, t in self._genre_refreshed.items() if now - t < interval
+            }
+
+        task = asyncio.create_task(self._refresh_genre(genre, limit))
+        self._genre_refresh_tasks.add(task)
+        task.add_done_callback(self._genre_refresh_tasks.discard)
+
+    async def _refresh_genre(self, genre: str, limit: int) -> None:
+        """Fetch details for Steam genre results not yet in the facet index."""
+        try:
+            results = await self.steam_service.search_games(genre, limit=limit)
+            facet_index = self.steam_service.facet_index
+            new_ids = [
+                game["app_id"] for game in results if game["app_id"] not in facet_index
+            ][:GENRE_REFRESH_MAX_GAMES]
+            if new_ids:
+                await asyncio.gather(
+                    *(self.steam_service.get_game_details(app_id) for app_id in new_ids),
+                    return_exceptions=True,
+                )
+                logger.info(f"Genre refresh for '{genre}' found {len(new_ids)} new games on Steam")
+        except Exception as e:
+            logger.warning(f"Genre refresh for '{genre}' failed: {e}")
+
+    async def _games_by_name(self, game_names: List[str]) -> List[Dict[str, Any]]:
+        """
+        Resolve game names and fetch enriched data for all of them concurrently.
+
+        Args:
+            game_names: Game names (only the first MAX_GAMES_BY_NAME are used)
+
+        Returns:
+            List of compact game dictionaries, or error entries for unresolved names
+        """
+        game_names = game_names[:MAX_GAMES_BY_NAME]
+
+        async def fetch(name: str) -> Dict[str, Any]:
+            resolved = await self.steam_service.resolve_game_name(name)
+            if not resolved:
+                return {"query": name, "error": "Game not found"}
+
+            await asyncio.gather(
+                self.prefetch_service.claim("details", resolved["app_id"]),
+                self.prefetch_service.claim("reviews", resolved["app_id"]),
+            )
+            data = await self.steam_service.get_enriched_game_data(resolved["app_id"])
+            if not data:
+                return {"query": name, "app_id": resolved["app_id"], "error": "Game not found"}
+
+            return {"query": name, **self._compact_game(data)}
+
+        results = await asyncio.gather(*(fetch(name) for name in game_names), return_exceptions=True)
+
+        games = []
+        for name, result in zip(game_names, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching game '{name}': {result}")
+                games.append({"query": name, "error": str(result)})
+            else:
+                games.append(result)
+        return games
+
+    @staticmethod
+    def _compact_game(data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reduce enriched game data to the fields the model needs.
+
+        Drops the HTML detailed description and screenshots, and truncates
+        sample reviews, to keep tool output small.
+        """
+        summary = data.get("reviews_summary", {})
+        total = summary.get("total_reviews", 0)
+        positive = summary.get("total_positive", 0)
+
+        return {
+            "app_id": data.get("app_id"),
+            "name": data.get("name"),
+            "short_description": data.get("short_description"),
+            "developers": data.get("developers", []),
+            "publishers": data.get("publishers", []),
+            "price": data.get("price"),
+            "release_date": data.get("release_date"),
+            "genres": data.get("genres", []),
+            "categories": data.get("categories", [])[:5],
+            "platforms": data.get("platforms", {}),
+            "metacritic_score": (data.get("metacritic") or {}).get("score"),
+            "recommendations": data.get("recommendations", 0),
+            "total_reviews": total,
+            "positive_percent": round(positive / total * 100, 1) if total else None,
+            "review_score_desc": summary.get("review_score_desc"),
+            "current_players": data.get("current_players"),
+            "sample_reviews": [
+                {
+                    "recommended": review.get("recommended"),
+                    "playtime_forever": review.get("playtime_forever"),
+                    "review": (review.get("review") or "")[:400],
+                }
+                for review in data.get("sample_reviews", [])[:3]
+            ],
+        }
+
+    def _record_chat(
+        self,
+        iterations: int,
+        tool_names: List[str],
+        knowledge_group: str = "none",
+        steam_requests: int = 0,
+    ) -> None:
+        """Record LLM iterations, tool calls and Steam requests of a finished chat."""
+        self.chat_stats["chats"] += 1
+        self.chat_stats["llm_iterations"] += iterations
+        self.chat_stats["tool_calls"] += len(tool_names)
+        self.tool_usage.update(tool_names)
+        CHAT_ITERATIONS.observe(iterations)
+
+        group = self.knowledge_stats[knowledge_group]
+        group["chats"] += 1
+        group["llm_iterations"] += iterations
+        group["steam_requests"] += steam_requests
+        if not tool_names:
+            group["answered_without_tools"] += 1
+
+    def _knowledge_first_stats(self) -> Dict[str, Any]:
+        """
+        Summarize knowledge-first groups and estimate savings.
+
+        Savings compare chats with injected context against the holdout control
+        group when it has data, otherwise against chats with no stored knowledge.
+        """
+        groups = {}
+        for name, group in self.knowledge_stats.items():
+            chats = group["chats"]
+            groups[name] = {
+                **group,
+                "avg_llm_iterations": round(group["llm_iterations"] / chats, 2) if chats else 0.0,
+                "avg_steam_requests": round(group["steam_requests"] / chats, 2) if chats else 0.0,
+            }
+
+        injected = groups["injected"]
+        baseline_name = "holdout" if groups["holdout"]["chats"] else "none"
+        baseline = groups[baseline_name]
+        saved = {"baseline": baseline_name}
+        if injected["chats"] and baseline["chats"]:
+            for key in ("llm_iterations", "steam_requests"):
+                per_chat = baseline[f"avg_{key}"] - injected[f"avg_{key}"]
+                saved[f"{key}_per_chat"] = round(per_chat, 2)
+                saved[f"{key}_total"] = round(per_chat * injected["chats"], 1)
+
+        return {
+            "enabled": self.knowledge_retriever is not None,
+            "holdout_fraction": settings.knowledge_first_holdout,
+            "groups": groups,
+            "estimated_saved": saved,
+        }
+
+    def get_chat_stats(self) -> Dict[str, Any]:
+        """
+        Get LLM iteration and tool usage statistics since startup.
+
+        Returns:
+            Dictionary with totals, per-chat averages and per-tool call counts
+        """
+        chats = self.chat_stats["chats"]
+        return {
+            **self.chat_stats,
+            "avg_llm_iterations": round(self.chat_stats["llm_iterations"] / chats, 2) if chats else 0.0,
+            "avg_tool_calls": round(self.chat_stats["tool_calls"] / chats, 2) if chats else 0.0,
+            "tool_usage": dict(self.tool_usage),
+            "prefetch": self.prefetch_service.get_stats(),
+            "knowledge_first": self._knowledge_first_stats(),
+            "admission": self.admission.get_stats(),
+        }
+
     def _create_system_prompt(self) -> str:
         """Create comprehensive system prompt for the chatbot."""
         return """Eres un asistente experto y apasionado en videojuegos, con acceso directo a la API de Steam. No eres solo un bot - eres un compañero gamer que entiende la cultura, las mecánicas, los géneros y lo que hace que un juego sea especial. Tu objetivo es ayudar a los usuarios a descubrir, analizar y disfrutar videojuegos.
@@ -257,6 +698,17 @@ class ChatbotService:
 5. **get_game_reviews**: Reseñas de usuarios y estadísticas de satisfacción
    - Úsalo cuando necesites el "sentimiento" real de la comunidad
 
+6. **find_similar_games**: Juegos parecidos a uno dado ("juegos como Hollow Knight")
+   - **LA MEJOR OPCIÓN** para "juegos similares a X" - responde en un solo paso
+   - Si no devuelve resultados, recurre a `search_games_by_genre`
+
+7. **get_games_by_name**: Todo sobre juegos dados por NOMBRE (hasta 5) en UN solo paso
+   - Resuelve el nombre, detalles, resumen de reseñas y jugadores actuales a la vez
+   - **Úsalo en lugar de** search_steam_games → get_game_details → get_game_reviews
+
+8. **compare_games_by_name**: Compara juegos dados por NOMBRE en UN solo paso
+   - Incluye tabla comparativa de precio, metacritic, % positivo, reseñas y jugadores
+
 ## 🎯 Estrategias de uso eficiente:
 
 **Para RECOMENDACIONES:**
@@ -264,14 +716,20 @@ class ChatbotService:
 - Acción: `search_games_by_genre("horror indie")` → Ya tiene detalles de top 5
 - Luego: Analiza, compara y recomienda con personalidad
 
+**Para JUEGOS SIMILARES:**
+- Pregunta: "Juegos parecidos a Hollow Knight"
+- Acción: `find_similar_games("Hollow Knight")` → Ya trae los más parecidos con detalles
+- Luego: Explica qué comparten con el juego original
+
 **Para COMPARACIONES:**
 - Pregunta: "Cyberpunk vs Witcher 3"
-- Acción: Busca ambos → `get_multiple_games_details([id1, id2])`
+- Acción: `compare_games_by_name(["Cyberpunk 2077", "The Witcher 3"])` → todo en un paso
+- Si ya tienes los app_id: `get_multiple_games_details([id1, id2])`
 - Luego: Compara profundamente: mecánicas, ambientación, narrativa, valor, etc.
 
 **Para CONSULTAS ESPECÍFICAS:**
 - Pregunta: "¿Vale la pena Elden Ring?"
-- Acción: `search_steam_games` → `get_game_details` → `get_game_reviews`
+- Acción: `get_games_by_name(["Elden Ring"])` → detalles + reseñas + jugadores en un paso
 - Luego: Análisis profundo con datos y contexto
 
 **Para CONVERSACIONES GENERALES:**
@@ -343,7 +801,10 @@ Eres un gamer experto con superpoderes de datos. Mantén conversaciones fluidas
 """
 
     async def chat(
-        self, message: str, conversation_history: Optional[List[Dict[str, str]]] = None
+        self,
+        message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        include_trace: bool = False,
     ) -> Dict[str, Any]:
         """
         Process a chat message and generate a response with tool calling support.
@@ -351,13 +812,55 @@ Eres un gamer experto con superpoderes de datos. Mantén conversaciones fluidas
         Args:
             message: User message
             conversation_history: Optional list of previous messages
+            include_trace: Add the timing trace (LLM iterations, tool calls with
+                their Steam requests and cache lookups, tokens) to the metadata
 
         Returns:
             Dictionary with response and metadata
+
+        Raises:
+            AdmissionRejected: If LLM capacity is exhausted
         """
+        # Shed before retrieval and tools when the LLM queue is already full
+        self.admission.check()
+        trace, trace_token = start_trace()
         try:
+            result = await self._run_chat(message, conversation_history)
+        finally:
+            end_trace(trace_token)
+
+        trace_data = trace.to_dict()
+        if settings.chat_trace_log:
+            logger.bind(chat_trace=trace_data).info("chat_trace")
+        if include_trace:
+            result["metadata"] = {**(result.get("metadata") or {}), "trace": trace_data}
+        return result
+
+    async def _run_chat(
+        self, message: str, conversation_history: Optional[List[Dict[str, str]]]
+    ) -> Dict[str, Any]:
+        """Run the knowledge-first retrieval and tool calling loop for one message."""
+        prefetch_keys = []
+        prefetch_token = _chat_prefetches.set(prefetch_keys)
+        steam_requests = [0]
+        steam_token = steam_request_counter.set(steam_requests)
+        try:
+            # Knowledge-first: stored game documents go into the system prompt so
+            # the model can often answer without a Steam tool iteration
+            knowledge_start = time.perf_counter()
+            knowledge = await self._retrieve_knowledge(message)
+            current_trace().knowledge_ms = round((time.perf_counter() - knowledge_start) * 1000, 2)
+            knowledge_group = "none"
+            system_prompt = self.system_prompt
+            if knowledge:
+                if random.random() < settings.knowledge_first_holdout:
+                    knowledge_group = "holdout"
+                else:
+                    knowledge_group = "injected"
+                    system_prompt = f"{self.system_prompt}\n\n{self._knowledge_prompt(knowledge)}"
+
             # Build conversation context
-            messages = [SystemMessage(content=self.system_prompt)]
+            messages = [SystemMessage(content=system_prompt)]
 
             if conversation_history and isinstance(conversation_history, list):
                 for msg in conversation_history[-10:]:  # Keep last 10 messages
@@ -375,16 +878,18 @@ Eres un gamer experto con superpoderes de datos. Mantén conversaciones fluidas
             # Tool calling loop
             max_iterations = 10  # Increased to handle complex queries
             iteration = 0
+            tool_names: List[str] = []
 
             while iteration < max_iterations:
                 iteration += 1
 
                 # Get response from Claude
-                logger.info(f"Calling Claude API (iteration {iteration})...")
+                logger.debug(f"Calling Claude API (iteration {iteration})")
                 try:
-                    response = await self.llm.ainvoke(messages)
-                    logger.info(f"✓ Claude API response received")
+                    response = await self._invoke_llm(messages, "chat", in_progress=iteration > 1)
                     messages.append(response)
+                except AdmissionRejected:
+                    raise
                 except Exception as e:
                     logger.error(f"✗ Claude API call failed: {e}")
                     logger.error(f"Error type: {type(e).__name__}")
@@ -394,34 +899,41 @@ Eres un gamer experto con superpoderes de datos. Mantén conversaciones fluidas
                 # Check if tool calls are present
                 if not response.tool_calls:
                     # No more tool calls, return final response
-                    logger.info(f"Generated final response for message: '{message[:50]}...'")
+                    logger.bind(throttle="chat_response").info(
+                        f"Generated final response for message: '{message[:50]}...'"
+                    )
+                    self._record_chat(iteration, tool_names, knowledge_group, steam_requests[0])
                     return {
                         "response": response.content,
                         "success": True,
                         "metadata": {
                             "model": settings.claude_model,
                             "tool_calls": iteration - 1,
+                            "llm_iterations": iteration,
+                            "tools_used": tool_names,
+                            "steam_requests": steam_requests[0],
+                            "knowledge_context": {
+                                "group": knowledge_group,
+                                "app_ids": knowledge["app_ids"],
+                                "documents": knowledge["documents"],
+                                "tokens": knowledge["tokens"],
+                            }
+                            if knowledge
+                            else None,
                         },
                     }
 
                 # Execute tool calls
-                logger.info(f"Executing {len(response.tool_calls)} tool calls")
+                logger.debug(f"Executing {len(response.tool_calls)} tool calls")
                 for tool_call in response.tool_calls:
                     tool_name = tool_call["name"]
                     tool_args = tool_call["args"]
                     tool_id = tool_call["id"]
 
-                    logger.info(f"Calling tool: {tool_name} with args: {tool_args}")
-
-                    # Find and execute the tool
-                    tool_result = None
-                    for tool in self.tools:
-                        if tool.name == tool_name:
-                            tool_result = await tool.ainvoke(tool_args)
-                            break
+                    logger.debug(f"Calling tool: {tool_name} with args: {str(tool_args)[:200]}")
+                    tool_names.append(tool_name)
 
-                    if tool_result is None:
-                        tool_result = f"Error: Tool {tool_name} not found"
+                    tool_result = await self._run_tool(tool_name, tool_args)
 
                     # Add tool result to messages
                     messages.append(
@@ -433,12 +945,15 @@ Eres un gamer experto con superpoderes de datos. Mantén conversaciones fluidas
 
             # Max iterations reached
             logger.warning("Max tool iterations reached")
+            self._record_chat(iteration, tool_names, knowledge_group, steam_requests[0])
             return {
                 "response": "Lo siento, la consulta es demasiado compleja. Por favor, intenta dividirla en preguntas más específicas.",
                 "success": False,
                 "metadata": {"error": "max_iterations_reached"},
             }
 
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error(f"Error in chat: {e}")
             return {
@@ -446,6 +961,90 @@ Eres un gamer experto con superpoderes de datos. Mantén conversaciones fluidas
                 "success": False,
                 "metadata": {"error": str(e)},
             }
+        finally:
+            # Anything not fetched yet is no longer needed by this chat
+            self.prefetch_service.cancel(prefetch_keys)
+            _chat_prefetches.reset(prefetch_token)
+            steam_request_counter.reset(steam_token)
+
+    async def _invoke_llm(self, messages: List, operation: str, in_progress: bool = False):
+        """
+        Call the LLM within an admission slot, recording latency, outcome and token usage.
+
+        Args:
+            messages: Conversation messages
+            operation: Metrics label ("chat" or "simple_chat")
+            in_progress: The chat already made LLM calls (may queue past the limit)
+        """
+        model = settings.claude_model
+        async with self.admission.slot(in_progress):
+            start = time.perf_counter()
+            outcome = "error"
+            LLM_IN_FLIGHT.inc()
+            try:
+                response = await self.llm.ainvoke(messages)
+                outcome = "success"
+            finally:
+                LLM_IN_FLIGHT.dec()
+                LLM_LATENCY.labels(model, operation).observe(time.perf_counter() - start)
+                LLM_REQUESTS.labels(model, outcome).inc()
+
+        usage = getattr(response, "usage_metadata", None) or {}
+        LLM_TOKENS.labels(model, "input").inc(usage.get("input_tokens", 0))
+        LLM_TOKENS.labels(model, "output").inc(usage.get("output_tokens", 0))
+        trace = current_trace()
+        if trace is not None:
+            trace.record_llm(
+                time.perf_counter() - start,
+                usage,
+                [call["name"] for call in getattr(response, "tool_calls", None) or []],
+            )
+        return response
+
+    async def _run_tool(self, tool_name: str, tool_args: Dict[str, Any]) -> Any:
+        """Execute a tool by name, recording latency and outcome."""
+        tool = next((t for t in self.tools if t.name == tool_name), None)
+        if tool is None:
+            TOOL_CALLS.labels(tool_name, "not_found").inc()
+            return f"Error: Tool {tool_name} not found"
+
+        trace = current_trace()
+        span = trace.tool_span(tool_name, tool_args) if trace is not None else nullcontext({})
+        start = time.perf_counter()
+        outcome = "error"
+        with span as span_data:
+            try:
+                result = await tool.ainvoke(tool_args)
+                outcome = "success"
+                return result
+            finally:
+                span_data["outcome"] = outcome
+                TOOL_LATENCY.labels(tool_name).observe(time.perf_counter() - start)
+                TOOL_CALLS.labels(tool_name, outcome).inc()
+
+    async def _retrieve_knowledge(self, message: str) -> Optional[Dict[str, Any]]:
+        """Get knowledge-first context for a message, skipping it if slow or failing."""
+        if self.knowledge_retriever is None:
+            return None
+        try:
+            return await asyncio.wait_for(
+                self.knowledge_retriever.retrieve(message), settings.knowledge_first_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Knowledge-first retrieval timed out, continuing without it")
+        except Exception as e:
+            logger.warning(f"Knowledge-first retrieval failed: {e}")
+        return None
+
+    def _knowledge_prompt(self, knowledge: Dict[str, Any]) -> str:
+        """Format retrieved knowledge as a system prompt section."""
+        return (
+            "## CONOCIMIENTO GUARDADO (datos de Steam ya consultados)\n"
+            "Si esta información basta para responder, úsala directamente SIN llamar "
+            "herramientas. Usa herramientas solo para datos que falten aquí o que deban "
+            "estar al día (precio u oferta actual, jugadores conectados).\n\n"
+            f"{knowledge['context']}"
+        )
 
     async def simple_chat(self, message: str) -> str:
         """
@@ -463,9 +1062,11 @@ Eres un gamer experto con superpoderes de datos. Mantén conversaciones fluidas
                 HumanMessage(content=message),
             ]
 
-            response = await self.llm.ainvoke(messages)
+            response = await self._invoke_llm(messages, "simple_chat")
             return response.content
 
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error(f"Error in simple_chat: {e}")
             return f"Lo siento, ocurrió un error: {str(e)}"
@@ -529,11 +1130,25 @@ Estadísticas generales:
                 },
             }
 
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error(f"Error analyzing game sentiment: {e}")
             return {"error": str(e)}
 
     async def close(self):
         """Close all service connections."""
+        for task in list(self._genre_refresh_tasks):
+            task.cancel()
+        await asyncio.gather(*self._genre_refresh_tasks, return_exceptions=True)
+        await self.prefetch_service.close()
         await self.steam_service.close()
+        if self.llm_fixture:
+            if settings.upstream_mode == "record":
+                self.llm_fixture.save()
+            else:
+                logger.info(
+                    f"Replayed Claude responses: {self.llm_fixture.hits} hits, "
+                    f"{self.llm_fixture.misses} misses"
+                )
         logger.info("Chatbot services closed")
@@ -0,0 +1,198 @@
+"""
+Embedding cache shared by the query and ingest paths.
+
+Embeddings are keyed by embedding model id plus a hash of the text and kept
+as float32 rows in a bounded LRU, so repeated queries ("roguelike
+deckbuilder") and re-ingested documents are embedded once. The cache can be
+persisted to a compact .npz file and reloaded at startup.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.logger import get_logger
+from src.utils.metrics import CACHE_EVICTIONS, CACHE_REQUESTS
+
+logger = get_logger()
+
+
+class EmbeddingCache:
+    """Bounded LRU of text embeddings for one embedding model."""
+
+    def __init__(
+        self,
+        embed: Callable[[Sequence[str]], Any],
+        model_id: str,
+        max_entries: int = 10000,
+        path: Optional[str] = None,
+    ):
+        """
+        Initialize cache, loading persisted entries for the same model.
+
+        Args:
+            embed: Function embedding a list of texts (returns one vector per text)
+            model_id: Embedding model identifier, part of every key
+            max_entries: Maximum cached embeddings (least recently used are evicted)
+            path: Optional .npz file used by load/save
+        """
+        self._embed = embed
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "embed_seconds_total": 0.0}
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def key(self, text: str) -> bytes:
+        """Get the cache key of a text (model id + text hash)."""
+        return hashlib.blake2b(
+            f"{self.model_id}\0{text}".encode("utf-8"), digest_size=16
+        ).digest()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed texts, computing only those not cached (in one batch).
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array with one row per text
+        """
+        keys = [self.key(text) for text in texts]
+        rows: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for key in keys:
+                row = self._entries.get(key)
+                if row is not None:
+                    self._entries.move_to_end(key)
+                rows.append(row)
+
+        missing = [idx for idx, row in enumerate(rows) if row is None]
+        if missing:
+            # Duplicate texts within one call are embedded once
+            unique: Dict[bytes, int] = {}
+            for idx in missing:
+                unique.setdefault(keys[idx], idx)
+            start = time.perf_counter()
+            vectors = np.asarray(
+                self._embed([texts[idx] for idx in unique.values()]), dtype=np.float32
+            )
+            elapsed = time.perf_counter() - start
+            computed = dict(zip(unique, vectors))
+            for idx in missing:
+                rows[idx] = computed[keys[idx]]
+
+            with self._lock:
+                self.stats["embed_seconds_total"] += elapsed
+                self.stats["misses"] += len(unique)
+                for key, vector in computed.items():
+                    self._entries[key] = vector
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+                    CACHE_EVICTIONS.labels("embedding").inc()
+            CACHE_REQUESTS.labels("embedding", "miss").inc(len(unique))
+
+        with self._lock:
+            self.stats["hits"] += len(texts) - len(missing)
+        if len(texts) > len(missing):
+            CACHE_REQUESTS.labels("embedding", "hit").inc(len(texts) - len(missing))
+
+        if not rows:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack(rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with size, hit counters, hit rate, average embedding
+            time per text and the embedding time saved by hits (estimated
+            from the average)
+        """
+        with self._lock:
+            hits = self.stats["hits"]
+            misses = self.stats["misses"]
+            embed_total = self.stats["embed_seconds_total"]
+            size = len(self._entries)
+            evictions = self.stats["evictions"]
+        avg_embed = embed_total / misses if misses else 0.0
+        return {
+            "model": self.model_id,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "evictions": evictions,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "avg_embed_ms": round(avg_embed * 1000, 3),
+            "saved_seconds": round(hits * avg_embed, 3),
+        }
+
+    def clear(self) -> None:
+        """Drop every cached embedding."""
+        with self._lock:
+            self._entries.clear()
+
+    def save(self) -> bool:
+        """
+        Persist entries (least recently used first) to the cache file.
+
+        Returns:
+            True if written
+        """
+        if not self.path:
+            return False
+        try:
+            with self._lock:
+                keys = list(self._entries)
+                vectors = list(self._entries.values())
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    model=np.frombuffer(self.model_id.encode("utf-8"), dtype=np.uint8),
+                    keys=np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(-1, 16),
+                    vectors=np.stack(vectors) if vectors else np.zeros((0, 0), np.float32),
+                )
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not save embedding cache to {self.path}: {e}")
+            return False
+
+    def load(self) -> int:
+        """
+        Load persisted entries written for the same model.
+
+        Returns:
+            Number of entries loaded
+        """
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if data["model"].tobytes().decode("utf-8") != self.model_id:
+                    logger.info(f"Embedding cache {self.path} is for another model, ignoring it")
+                    return 0
+                keys = data["keys"]
+                vectors = data["vectors"].astype(np.float32)
+            with self._lock:
+                for key, vector in zip(keys[-self.max_entries :], vectors[-self.max_entries :]):
+                    self._entries[key.tobytes()] = vector
+            logger.info(f"Loaded {len(self._entries)} cached embeddings from {self.path}")
+            return len(self._entries)
+        except Exception as e:
+            logger.warning(f"Could not load embedding cache from {self.path}: {e}")
+            return 0
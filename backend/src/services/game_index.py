@@ -0,0 +1,242 @@
+"""
+In-memory faceted index over every game detail record the service has seen.
+
+Genres, categories, developers and publishers map to sorted posting lists of
+compact integer document ids, so multi-facet queries are answered locally by
+intersecting posting lists instead of calling Steam.
+"""
+
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+FACETS = ("genres", "categories", "developers", "publishers")
+
+# Facets that free-text queries such as "action rpg" are resolved against
+_TEXT_FACETS = ("genres", "categories")
+
+_SORT_KEYS = {
+    "recommendations": lambda s: s["recommendations"],
+    "metacritic": lambda s: (s["metacritic"] or 0, s["recommendations"]),
+}
+
+
+def _intersect(a: array, b: array) -> array:
+    """Intersect two sorted posting lists, galloping through the longer one."""
+    if len(a) > len(b):
+        a, b = b, a
+
+    result = array("I")
+    lo = 0
+    for doc_id in a:
+        lo = bisect_left(b, doc_id, lo)
+        if lo == len(b):
+            break
+        if b[lo] == doc_id:
+            result.append(doc_id)
+    return result
+
+
+class FacetIndex:
+    """Inverted index from game facets to integer-id posting lists."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._lock = threading.Lock()
+        self._doc_ids: Dict[int, int] = {}
+        self._app_ids = array("I")
+        self._summaries: List[Dict[str, Any]] = []
+        self._doc_facets: List[Dict[str, Tuple[str, ...]]] = []
+        self._postings: Dict[str, Dict[str, array]] = {facet: {} for facet in FACETS}
+        self._labels: Dict[str, Dict[str, str]] = {facet: {} for facet in FACETS}
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def __contains__(self, app_id: Any) -> bool:
+        try:
+            return int(app_id) in self._doc_ids
+        except (TypeError, ValueError):
+            return False
+
+    def add(self, game: Dict[str, Any]) -> None:
+        """
+        Add or update a game details record.
+
+        Args:
+            game: Game details dictionary as returned by SteamService.get_game_details
+        """
+        try:
+            app_id = int(game["app_id"])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        facets = {
+            facet: tuple(sorted({v.strip().lower() for v in game.get(facet) or [] if v}))
+            for facet in FACETS
+        }
+        summary = {
+            "app_id": app_id,
+            "name": game.get("name"),
+            "genres": game.get("genres", []),
+            "short_description": game.get("short_description", ""),
+            "price": game.get("price", "N/A"),
+            "recommendations": game.get("recommendations") or 0,
+            "metacritic": (game.get("metacritic") or {}).get("score"),
+        }
+
+        with self._lock:
+            doc_id = self._doc_ids.get(app_id)
+            if doc_id is None:
+                doc_id = len(self._app_ids)
+                self._doc_ids[app_id] = doc_id
+                self._app_ids.append(app_id)
+                self._summaries.append(summary)
+                self._doc_facets.append({facet: () for facet in FACETS})
+
+            self._summaries[doc_id] = summary
+            old_facets = self._doc_facets[doc_id]
+
+            for facet in FACETS:
+                old, new = set(old_facets[facet]), set(facets[facet])
+                postings = self._postings[facet]
+
+                for value in old - new:
+                    posting = postings[value]
+                    del posting[bisect_left(posting, doc_id)]
+                    if not posting:
+                        del postings[value]
+
+                for value in new - old:
+                    posting = postings.setdefault(value, array("I"))
+                    pos = bisect_left(posting, doc_id)
+                    posting.insert(pos, doc_id)
+
+                for label in game.get(facet) or []:
+                    if label:
+                        self._labels[facet].setdefault(label.strip().lower(), label.strip())
+
+            self._doc_facets[doc_id] = facets
+
+    def query(
+        self,
+        genres: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        developers: Optional[List[str]] = None,
+        publishers: Optional[List[str]] = None,
+        sort_by: str = "recommendations",
+        limit: Optional[int] = 10,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find games matching every given facet value.
+
+        Args:
+            genres: Genres the game must all have
+            categories: Categories the game must all have
+            developers: Developers the game must all have
+            publishers: Publishers the game must all have
+            sort_by: "recommendations" or "metacritic"
+            limit: Maximum number of results (None for all)
+
+        Returns:
+            List of game summaries, best ranked first
+        """
+        doc_ids = self._match(
+            {
+                "genres": genres,
+                "categories": categories,
+                "developers": developers,
+                "publishers": publishers,
+            }
+        )
+        if doc_ids is None:
+            return []
+
+        key = _SORT_KEYS.get(sort_by, _SORT_KEYS["recommendations"])
+        summaries = [self._summaries[doc_id] for doc_id in doc_ids]
+        summaries.sort(key=key, reverse=True)
+        return summaries[:limit]
+
+    def resolve(self, text: str) -> Tuple[Dict[str, List[str]], List[str]]:
+        """
+        Resolve free text such as "action rpg free to play" into facet filters.
+
+        Known genre and category labels are matched greedily, longest first.
+
+        Args:
+            text: Free-text genre/tag query
+
+        Returns:
+            Tuple of (facet filters, terms that matched no known facet value)
+        """
+        words = re.findall(r"[\w\-]+", text.lower())
+        filters: Dict[str, List[str]] = {}
+        unmatched: List[str] = []
+
+        with self._lock:
+            vocab = {
+                value: facet
+                for facet in _TEXT_FACETS
+                for value in self._postings[facet]
+            }
+        max_len = max((len(value.split()) for value in vocab), default=1)
+
+        i = 0
+        while i < len(words):
+            for size in range(min(max_len, len(words) - i), 0, -1):
+                phrase = " ".join(words[i : i + size])
+                facet = vocab.get(phrase)
+                if facet:
+                    filters.setdefault(facet, []).append(phrase)
+                    i += size
+                    break
+            else:
+                unmatched.append(words[i])
+                i += 1
+
+        return filters, unmatched
+
+    def facet_values(self, facet: str) -> Dict[str, int]:
+        """
+        Get every known value of a facet with its document count.
+
+        Args:
+            facet: One of "genres", "categories", "developers", "publishers"
+
+        Returns:
+            Mapping of display label to number of games
+        """
+        with self._lock:
+            labels = self._labels.get(facet, {})
+            return {
+                labels.get(value, value): len(posting)
+                for value, posting in self._postings.get(facet, {}).items()
+            }
+
+    def _match(self, filters: Dict[str, Optional[List[str]]]) -> Optional[array]:
+        """Intersect posting lists for all filters; None when nothing matches."""
+        with self._lock:
+            postings = []
+            for facet, values in filters.items():
+                for value in values or []:
+                    posting = self._postings[facet].get(value.strip().lower())
+                    if posting is None:
+                        return None
+                    postings.append(posting)
+
+            if not postings:
+                return array("I", range(len(self._app_ids)))
+
+            postings.sort(key=len)
+            result = postings[0]
+            for posting in postings[1:]:
+                result = _intersect(result, posting)
+                if not result:
+                    return None
+            return array("I", result)
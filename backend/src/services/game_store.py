@@ -0,0 +1,320 @@
+"""
+Durable local store for Steam game metadata.
+
+SQLite in WAL mode with an FTS5 index, so game details survive restarts and
+can be queried by text, genre, price and score without calling Steam.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+_PRICE_RE = re.compile(r"(\d+(?:[.,]\d{3})*(?:[.,]\d{1,2})?)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    app_id INTEGER PRIMARY KEY,
+    name TEXT,
+    type TEXT,
+    price_text TEXT,
+    price_cents INTEGER,
+    metacritic INTEGER,
+    recommendations INTEGER NOT NULL DEFAULT 0,
+    release_date TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS game_genres (
+    app_id INTEGER NOT NULL,
+    genre TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (genre, app_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_games_price ON games(price_cents);
+CREATE INDEX IF NOT EXISTS idx_games_metacritic ON games(metacritic);
+CREATE INDEX IF NOT EXISTS idx_game_genres_app ON game_genres(app_id);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS games_fts USING fts5(
+    name, short_description, developers, publishers, genres, categories,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_ORDER_BY = {
+    "recommendations": "g.recommendations DESC",
+    "metacritic": "g.metacritic IS NULL, g.metacritic DESC, g.recommendations DESC",
+    "price": "g.price_cents IS NULL, g.price_cents ASC",
+    "recent": "g.updated_at DESC",
+}
+
+
+def parse_price_cents(price: Optional[str]) -> Optional[int]:
+    """
+    Parse a Steam formatted price ("$19.99", "19,99€", "Free") into cents.
+
+    Args:
+        price: Formatted price string
+
+    Returns:
+        Price in cents, 0 for free games, or None if it cannot be parsed
+    """
+    if not price:
+        return None
+    if price.strip().lower() in ("free", "free to play", "gratis"):
+        return 0
+
+    match = _PRICE_RE.search(price)
+    if not match:
+        return None
+
+    number = match.group(1)
+    # The last separator followed by 1-2 digits is the decimal mark
+    if len(number) > 3 and number[-3] in ".,":
+        whole, cents = number[:-3], number[-2:]
+    elif len(number) > 2 and number[-2] in ".,":
+        whole, cents = number[:-2], number[-1] + "0"
+    else:
+        whole, cents = number, "00"
+
+    whole = whole.replace(".", "").replace(",", "")
+    return int(whole or 0) * 100 + int(cents)
+
+
+class GameStore:
+    """Persistent SQLite store of game details with full-text search."""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the game store.
+
+        Args:
+            path: SQLite database file path, or ":memory:"
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 not available, text search falls back to LIKE: {e}")
+            self.fts_enabled = False
+
+        logger.info(f"Game store opened at {path} with {self.count()} games")
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def upsert(self, game: Dict[str, Any]) -> bool:
+        """
+        Insert or replace a game details record.
+
+        Args:
+            game: Game details dictionary as returned by SteamService.get_game_details
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            app_id = int(game["app_id"])
+            price = game.get("price")
+            metacritic = (game.get("metacritic") or {}).get("score")
+            genres = [g for g in game.get("genres") or [] if g]
+
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.execute(
+                        """
+                        INSERT OR REPLACE INTO games (
+                            app_id, name, type, price_text, price_cents, metacritic,
+                            recommendations, release_date, data, updated_at
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (
+                            app_id,
+                            game.get("name"),
+                            game.get("type"),
+                            price,
+                            parse_price_cents(price),
+                            metacritic,
+                            game.get("recommendations") or 0,
+                            game.get("release_date"),
+                            json.dumps(game, ensure_ascii=False),
+                            time.time(),
+                        ),
+                    )
+                    self._conn.execute("DELETE FROM game_genres WHERE app_id = ?", (app_id,))
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO game_genres (app_id, genre) VALUES (?, ?)",
+                        [(app_id, genre) for genre in genres],
+                    )
+                    if self.fts_enabled:
+                        self._conn.execute("DELETE FROM games_fts WHERE rowid = ?", (app_id,))
+                        self._conn.execute(
+                            """
+                            INSERT INTO games_fts (
+                                rowid, name, short_description, developers,
+                                publishers, genres, categories
+                            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                            """,
+                            (
+                                app_id,
+                                game.get("name") or "",
+                                game.get("short_description") or "",
+                                " ".join(game.get("developers") or []),
+                                " ".join(game.get("publishers") or []),
+                                " ".join(genres),
+                                " ".join(c for c in game.get("categories") or [] if c),
+                            ),
+                        )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+
+            return True
+
+        except Exception as e:
+            logger.error(f"Error storing game {game.get('app_id')}: {e}")
+            return False
+
+    def get(self, app_id: int, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get stored details for a game.
+
+        Args:
+            app_id: Steam application ID
+            max_age: Optional maximum record age in seconds
+
+        Returns:
+            Game details dictionary or None if missing or stale
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT data, updated_at FROM games WHERE app_id = ?", (app_id,)
+                ).fetchone()
+
+            if row is None:
+                return None
+            if max_age is not None and time.time() - row["updated_at"] > max_age:
+                return None
+            return json.loads(row["data"])
+
+        except Exception as e:
+            logger.error(f"Error reading game {app_id} from store: {e}")
+            return None
+
+    def query(
+        self,
+        text: Optional[str] = None,
+        genres: Optional[List[str]] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_score: Optional[int] = None,
+        order_by: str = "recommendations",
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query stored games by full text, genre, price and metacritic score.
+
+        Args:
+            text: Optional full-text query over name, description, studios, genres
+            genres: Optional list of genres the game must all have
+            min_price: Optional minimum price (in currency units)
+            max_price: Optional maximum price (in currency units)
+            min_score: Optional minimum metacritic score
+            order_by: "relevance", "recommendations", "metacritic", "price" or "recent"
+            limit: Maximum number of results
+
+        Returns:
+            List of game details dictionaries
+        """
+        clauses = []
+        params: List[Any] = []
+        joins = ""
+
+        if text:
+            if self.fts_enabled:
+                joins = "JOIN games_fts f ON f.rowid = g.app_id"
+                clauses.append("games_fts MATCH ?")
+                params.append(self._fts_query(text))
+            else:
+                clauses.append("g.data LIKE ?")
+                params.append(f"%{text}%")
+
+        for genre in genres or []:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM game_genres gg WHERE gg.app_id = g.app_id AND gg.genre = ?)"
+            )
+            params.append(genre)
+
+        if min_price is not None:
+            clauses.append("g.price_cents >= ?")
+            params.append(int(round(min_price * 100)))
+        if max_price is not None:
+            clauses.append("g.price_cents <= ?")
+            params.append(int(round(max_price * 100)))
+        if min_score is not None:
+            clauses.append("g.metacritic >= ?")
+            params.append(min_score)
+
+        if order_by == "relevance" and text and self.fts_enabled:
+            order = "bm25(games_fts), g.recommendations DESC"
+        else:
+            order = _ORDER_BY.get(order_by, _ORDER_BY["recommendations"])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT g.data FROM games g {joins} {where} ORDER BY {order} LIMIT ?"
+        params.append(limit)
+
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+            return [json.loads(row["data"]) for row in rows]
+        except Exception as e:
+            logger.error(f"Error querying game store: {e}")
+            return []
+
+    def iter_games(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every stored game.
+
+        Returns:
+            Iterator of game details dictionaries
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM games ORDER BY app_id").fetchall()
+        for row in rows:
+            yield json.loads(row["data"])
+
+    def count(self) -> int:
+        """Get number of stored games."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        """Turn free text into an FTS5 query of quoted prefix terms."""
+        terms = re.findall(r"\w+", text, flags=re.UNICODE)
+        return " ".join(f'"{term}"*' for term in terms) or '""'
@@ -0,0 +1,358 @@
+"""
+Write-behind ingestion of game data into the knowledge base.
+
+Endpoints submit games and return immediately; a background worker coalesces
+repeated app_ids, batches documents into large upserts and applies
+backpressure when the queue is full. Pending items can optionally be spooled
+to disk so they survive a restart.
+
+The spool is an append-only JSONL log (later lines for an app_id win), written
+by a dedicated thread so file I/O never runs on the event loop. It is
+compacted to the pending items once it grows well past them, and truncated
+when nothing is pending.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque, Dict, Any, List, Optional, Tuple
+
+from src.config import settings
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+IngestItem = Tuple[Dict[str, Any], Optional[List[str]]]
+
+# Spool lines always allowed before compaction (beyond twice the pending items)
+SPOOL_COMPACT_MIN_LINES = 1000
+
+
+class IngestionService:
+    """Background write-behind queue feeding AsyncRAGService.add_games_batch."""
+
+    def __init__(
+        self,
+        rag_service,
+        max_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        spool_path: Optional[str] = None,
+    ):
+        """
+        Initialize ingestion queue.
+
+        Args:
+            rag_service: AsyncRAGService that receives batches
+            max_size: Maximum distinct games waiting (defaults to settings.ingest_queue_size)
+            batch_size: Maximum games per upsert (defaults to settings.ingest_batch_size)
+            spool_path: Optional JSONL file persisting pending items
+        """
+        self.rag_service = rag_service
+        self.batch_size = batch_size or settings.ingest_batch_size
+        self.spool_path = spool_path if spool_path is not None else settings.ingest_spool_path
+
+        # The queue carries app_ids only; the latest payload per app_id lives in
+        # _pending, so repeated submissions coalesce into one write
+        self._queue: asyncio.Queue = asyncio.Queue(
+            maxsize=max_size or settings.ingest_queue_size
+        )
+        self._pending: Dict[str, IngestItem] = {}
+        # app_ids whose first submit is still waiting for queue space, resolved
+        # with whether that put succeeded
+        self._enqueuing: Dict[str, asyncio.Future] = {}
+        # Restored app_ids that did not fit in the queue, fed in as it drains
+        self._backlog: Deque[str] = deque()
+        self._worker: Optional[asyncio.Task] = None
+
+        # One thread keeps spool writes ordered and off the event loop
+        self._spool_executor: Optional[ThreadPoolExecutor] = None
+        if self.spool_path:
+            self._spool_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-spool")
+        self._spool_lines = 0
+        # The spool may only be compacted once its entries are in _pending
+        self._restored = not self.spool_path
+
+        self.stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "batches": 0,
+            "games_ingested": 0,
+            "documents_written": 0,
+            "failed_batches": 0,
+            "last_batch_ms": 0.0,
+            "restored": 0,
+            "spool_corrupt_lines": 0,
+        }
+
+    def start(self) -> None:
+        """Start the background worker (requires a running event loop)."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+            logger.info("Knowledge base ingestion worker started")
+
+    async def stop(self, flush: bool = True) -> None:
+        """
+        Stop the worker.
+
+        Args:
+            flush: Ingest everything still pending before stopping
+        """
+        if self._worker:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        if flush:
+            await self.flush()
+        if self._spool_executor:
+            # Wait for spool writes already handed to the thread
+            await asyncio.get_running_loop().run_in_executor(self._spool_executor, lambda: None)
+
+    async def submit(
+        self, game_data: Dict[str, Any], reviews: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Queue a game for ingestion.
+
+        Returns immediately unless the queue is full, in which case the caller
+        waits up to settings.ingest_enqueue_timeout before the item is dropped.
+
+        Args:
+            game_data: Dictionary containing game information
+            reviews: Optional list of review texts
+
+        Returns:
+            True if queued (or merged into a queued item), False if dropped
+        """
+        self.start()
+        app_id = str(game_data.get("app_id"))
+        self.stats["submitted"] += 1
+
+        enqueuing = self._enqueuing.get(app_id)
+        if enqueuing is not None:
+            # Merged into an item still waiting for space: queued only if it gets in
+            self._pending[app_id] = (game_data, reviews)
+            self.stats["coalesced"] += 1
+            if await asyncio.shield(enqueuing):
+                return True
+            self.stats["dropped"] += 1
+            return False
+
+        if app_id in self._pending:
+            self._pending[app_id] = (game_data, reviews)
+            self.stats["coalesced"] += 1
+            # Later spool lines win on restore
+            self._append_spool(app_id, game_data, reviews)
+            return True
+
+        self._pending[app_id] = (game_data, reviews)
+        enqueuing = self._enqueuing[app_id] = asyncio.get_running_loop().create_future()
+        queued = False
+        try:
+            await asyncio.wait_for(self._queue.put(app_id), settings.ingest_enqueue_timeout)
+            queued = True
+        except asyncio.TimeoutError:
+            self.stats["dropped"] += 1
+            logger.warning(f"Ingestion queue full, dropped game {app_id}")
+        finally:
+            del self._enqueuing[app_id]
+            if not queued:
+                self._pending.pop(app_id, None)
+            enqueuing.set_result(queued)
+
+        # Spool the latest payload, including updates merged while waiting
+        item = self._pending.get(app_id)
+        if item is not None:
+            self._append_spool(app_id, *item)
+        return queued
+
+    async def flush(self) -> None:
+        """Ingest everything currently pending in batches."""
+        await self._restore_spool()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._backlog.clear()
+
+        items = list(self._pending.values())
+        self._pending.clear()
+        for start in range(0, len(items), self.batch_size):
+            await self._ingest(items[start : start + self.batch_size])
+
+    def queue_depth(self) -> int:
+        """Get number of games waiting to be ingested."""
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get ingestion statistics."""
+        return {
+            **self.stats,
+            "queue_depth": self._queue.qsize(),
+            "backlog": len(self._backlog),
+            "queue_capacity": self._queue.maxsize,
+            "running": self._worker is not None and not self._worker.done(),
+        }
+
+    async def _run(self) -> None:
+        """Worker loop: wait for work, linger briefly to fill a batch, ingest it."""
+        await self._restore_spool()
+        while True:
+            while self._backlog and not self._queue.full():
+                app_id = self._backlog.popleft()
+                if app_id in self._pending:
+                    self._queue.put_nowait(app_id)
+            first = await self._queue.get()
+            if self._queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(settings.ingest_flush_interval)
+            await self._ingest(self._take_batch(first))
+
+    def _take_batch(self, first: str) -> List[IngestItem]:
+        """Pop up to batch_size distinct games, starting with an already dequeued one."""
+        batch = []
+        item = self._pending.pop(first, None)
+        if item is not None:
+            batch.append(item)
+        while len(batch) < self.batch_size and not self._queue.empty():
+            app_id = self._queue.get_nowait()
+            item = self._pending.pop(app_id, None)
+            if item is not None:
+                batch.append(item)
+        return batch
+
+    async def _ingest(self, batch: List[IngestItem]) -> None:
+        """Write one batch to the knowledge base."""
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        result = await self.rag_service.add_games_batch(batch)
+        self.stats["last_batch_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+        if result is None:
+            self.stats["failed_batches"] += 1
+            logger.error(f"Failed to ingest batch of {len(batch)} games")
+        else:
+            self.stats["batches"] += 1
+            self.stats["games_ingested"] += len(batch)
+            self.stats["documents_written"] += result["written"]
+            logger.debug(
+                f"Ingested {len(batch)} games ({result['written']} documents written) "
+                f"in {self.stats['last_batch_ms']} ms"
+            )
+
+        self._compact_spool()
+
+    def _append_spool(
+        self, app_id: str, game_data: Dict[str, Any], reviews: Optional[List[str]]
+    ) -> None:
+        """Log a queued or updated item (written by the spool thread)."""
+        if not self._spool_executor:
+            return
+        self._spool_lines += 1
+        entry = {"app_id": app_id, "game": game_data, "reviews": reviews}
+        self._spool_executor.submit(self._write_spool, [entry], "a")
+
+    def _compact_spool(self) -> None:
+        """Rewrite the spool with what is still pending once it has grown enough."""
+        if not self._spool_executor or not self._restored or not self._spool_lines:
+            return
+        if self._pending and self._spool_lines < max(
+            SPOOL_COMPACT_MIN_LINES, 2 * len(self._pending)
+        ):
+            return
+        entries = [
+            {"app_id": app_id, "game": game_data, "reviews": reviews}
+            for app_id, (game_data, reviews) in self._pending.items()
+        ]
+        self._spool_lines = len(entries)
+        self._spool_executor.submit(self._write_spool, entries, "w")
+
+    def _write_spool(self, entries: List[Dict[str, Any]], mode: str) -> None:
+        """Append ("a") or atomically replace ("w") spool entries (spool thread)."""
+        try:
+            Path(self.spool_path).parent.mkdir(parents=True, exist_ok=True)
+            path = self.spool_path if mode == "a" else f"{self.spool_path}.tmp"
+            with open(path, mode, encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+            if mode == "w":
+                os.replace(path, self.spool_path)
+        except Exception as e:
+            logger.warning(f"Could not write ingestion spool: {e}")
+
+    def _read_spool(self) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Read spool entries (spool thread).
+
+        Unparseable lines are moved aside to <spool>.corrupt so compaction
+        never loses them silently.
+
+        Returns:
+            (entries in file order, number of corrupt lines)
+        """
+        if not os.path.exists(self.spool_path):
+            return [], 0
+        entries, corrupt = [], []
+        with open(self.spool_path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    entries.append(
+                        {"app_id": str(entry["app_id"]), "game": entry["game"], "reviews": entry.get("reviews")}
+                    )
+                except (ValueError, KeyError, TypeError):
+                    corrupt.append(line if line.endswith("\n") else line + "\n")
+        if corrupt:
+            with open(f"{self.spool_path}.corrupt", "a", encoding="utf-8") as f:
+                f.writelines(corrupt)
+        return entries, len(corrupt)
+
+    async def _restore_spool(self) -> None:
+        """
+        Re-queue items left in the spool by a previous process.
+
+        Every entry goes into _pending; those that do not fit in the queue wait
+        in a backlog fed to the queue as the worker drains it. Items submitted
+        since startup are newer and win over spooled ones.
+        """
+        if self._restored:
+            return
+        try:
+            entries, corrupt = await asyncio.get_running_loop().run_in_executor(
+                self._spool_executor, self._read_spool
+            )
+        except Exception as e:
+            # Keep _restored False so the spool is never compacted over unread entries
+            logger.warning(f"Could not restore ingestion spool: {e}")
+            return
+        self._restored = True
+        self._spool_lines += len(entries)
+
+        latest: Dict[str, IngestItem] = {}
+        for entry in entries:
+            latest[entry["app_id"]] = (entry["game"], entry["reviews"])
+        restored = 0
+        for app_id, item in latest.items():
+            if app_id in self._pending or app_id in self._enqueuing:
+                continue
+            self._pending[app_id] = item
+            if self._queue.full():
+                self._backlog.append(app_id)
+            else:
+                self._queue.put_nowait(app_id)
+            restored += 1
+
+        self.stats["restored"] += restored
+        self.stats["spool_corrupt_lines"] += corrupt
+        if restored:
+            logger.info(
+                f"Restored {restored} pending games from ingestion spool "
+                f"({len(self._backlog)} waiting for queue space)"
+            )
+        if corrupt:
+            logger.warning(f"Moved {corrupt} corrupt ingestion spool lines to {self.spool_path}.corrupt")
@@ -0,0 +1,151 @@
+"""
+Exact knowledge base counters.
+
+Document counts per type and per game are maintained on every write and
+delete, so statistics are constant-time and never sampled. Counters are
+persisted as JSON next to the collection and can be rebuilt from the stored
+metadata if they drift (e.g. after a crash between a write and a save).
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class KnowledgeBaseCounters:
+    """Per-type and per-game document counters with JSON persistence."""
+
+    def __init__(self, path: Optional[str] = None, flush_interval: float = 5.0):
+        """
+        Load counters.
+
+        Args:
+            path: JSON file persisting the counters (None keeps them in memory only)
+            flush_interval: Minimum seconds between writes of the file
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self.total = 0
+        self.by_type: Dict[str, int] = {}
+        self.by_game: Dict[str, Dict[str, int]] = {}
+        self.loaded = False
+        self._dirty = False
+        self._last_save = 0.0
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                self.total = data["total"]
+                self.by_type = data["by_type"]
+                self.by_game = data["by_game"]
+                self.loaded = True
+            except Exception as e:
+                logger.warning(f"Could not load knowledge base counters from {path}: {e}")
+
+    def apply(
+        self,
+        added: Iterable[Dict[str, Any]] = (),
+        removed: Iterable[Dict[str, Any]] = (),
+    ) -> None:
+        """
+        Update counters for written and deleted documents.
+
+        A replaced document is passed in both lists (old metadata removed,
+        new metadata added).
+
+        Args:
+            added: Metadata of documents now stored
+            removed: Metadata of documents no longer stored
+        """
+        with self._lock:
+            for meta in removed:
+                self._adjust(meta, -1)
+            for meta in added:
+                self._adjust(meta, 1)
+            self._dirty = True
+        self.save()
+
+    def rebuild(self, metadatas: Iterable[Dict[str, Any]]) -> None:
+        """Recount from scratch over every stored document's metadata."""
+        with self._lock:
+            self.total = 0
+            self.by_type = {}
+            self.by_game = {}
+            for meta in metadatas:
+                self._adjust(meta, 1)
+            self._dirty = True
+        self.save(force=True)
+
+    def reset(self) -> None:
+        """Zero every counter."""
+        self.rebuild(())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get total, per-type and game counts."""
+        with self._lock:
+            return {
+                "total_documents": self.total,
+                "documents_by_type": dict(self.by_type),
+                # One game_info document per game (its id is derived from the app_id)
+                "games": self.by_type.get("game_info", 0),
+                "reviews": self.by_type.get("review", 0),
+            }
+
+    def game_counts(self, app_id: str) -> Dict[str, int]:
+        """Get document counts by type for one game."""
+        with self._lock:
+            return dict(self.by_game.get(str(app_id), {}))
+
+    def save(self, force: bool = False) -> None:
+        """
+        Write counters if changed (at most once per flush_interval unless forced).
+
+        Args:
+            force: Write now regardless of the interval
+        """
+        if not self.path or not self._dirty:
+            return
+        if not force and time.monotonic() - self._last_save < self.flush_interval:
+            return
+
+        with self._lock:
+            data = {"total": self.total, "by_type": self.by_type, "by_game": self.by_game}
+            payload = json.dumps(data)
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self._dirty = True
+            logger.warning(f"Could not save knowledge base counters: {e}")
+
+    def _adjust(self, meta: Dict[str, Any], delta: int) -> None:
+        """Apply one document to the counters (caller holds the lock)."""
+        doc_type = (meta or {}).get("type", "unknown")
+        app_id = str((meta or {}).get("app_id"))
+
+        self.total += delta
+        self.by_type[doc_type] = self.by_type.get(doc_type, 0) + delta
+        if self.by_type[doc_type] <= 0:
+            del self.by_type[doc_type]
+
+        game = self.by_game.setdefault(app_id, {})
+        game[doc_type] = game.get(doc_type, 0) + delta
+        if game[doc_type] <= 0:
+            del game[doc_type]
+        if not game:
+            del self.by_game[app_id]
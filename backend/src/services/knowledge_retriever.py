@@ -0,0 +1,180 @@
+"""
+Knowledge-first retrieval for chat.
+
+Before the first LLM call, relevant game documents already stored in the
+knowledge base are selected (relevance gate, freshness policy per document
+type, token budget) and formatted as context, so the model can often answer
+without spending a tool iteration on Steam.
+"""
+
+import asyncio
+import re
+import time
+from typing import Dict, Any, List, Optional
+
+from src.config import settings
+from src.services.rag_service import document_timestamp
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# Rough characters-per-token ratio used to keep context within budget
+CHARS_PER_TOKEN = 4
+
+# Longest review excerpt injected
+MAX_REVIEW_CHARS = 500
+
+# Search results considered before grouping by game
+SEARCH_CANDIDATES = 12
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse punctuation for name matching."""
+    return " ".join(re.findall(r"\w+", (text or "").lower()))
+
+
+def document_age(metadata: Dict[str, Any], now: Optional[float] = None) -> Optional[float]:
+    """
+    Get a stored document's age in seconds.
+
+    Args:
+        metadata: Document metadata with a "timestamp" (epoch seconds or ISO string)
+        now: Current epoch time (defaults to time.time())
+
+    Returns:
+        Age in seconds, or None if the timestamp is missing or unreadable
+    """
+    stored_at = document_timestamp(metadata)
+    if stored_at is None:
+        return None
+    return (now or time.time()) - stored_at
+
+
+def _format_age(seconds: float) -> str:
+    """Format an age for the model (Spanish, like the system prompt)."""
+    if seconds < 3600:
+        return "menos de una hora"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} h"
+    return f"{int(seconds // 86400)} días"
+
+
+class KnowledgeRetriever:
+    """Selects fresh, relevant knowledge base documents within a token budget."""
+
+    def __init__(self, rag_service):
+        """
+        Initialize retriever.
+
+        Args:
+            rag_service: AsyncRAGService used for search and document lookup
+        """
+        self.rag_service = rag_service
+        self.max_age = {
+            "game_info": settings.knowledge_first_game_max_age,
+            "review": settings.knowledge_first_review_max_age,
+        }
+
+    def is_fresh(self, metadata: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """Check a document against the freshness policy for its type."""
+        age = document_age(metadata, now)
+        max_age = self.max_age.get(metadata.get("type"), settings.knowledge_first_game_max_age)
+        return age is not None and age <= max_age
+
+    async def retrieve(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Build knowledge context for a user message.
+
+        Args:
+            query: User message
+
+        Returns:
+            Dictionary with "context" text, "app_ids", "documents", "tokens" and
+            "stale_skipped", or None when nothing relevant and fresh is stored
+        """
+        hits = await self.rag_service.search_similar_games(query, n_results=SEARCH_CANDIDATES)
+        if not hits:
+            return None
+
+        # Group hits by game, keeping rank order and the best distance per game
+        query_norm = f" {_normalize(query)} "
+        games: Dict[str, Dict[str, Any]] = {}
+        for hit in hits:
+            meta = hit.get("metadata") or {}
+            app_id = meta.get("app_id")
+            if not app_id:
+                continue
+            game = games.setdefault(
+                app_id, {"name": meta.get("name", ""), "distance": None, "hit_ids": set()}
+            )
+            distance = hit.get("distance")
+            if distance is not None and (game["distance"] is None or distance < game["distance"]):
+                game["distance"] = distance
+            game["hit_ids"].add(meta.get("content_hash"))
+
+        max_distance = settings.knowledge_first_max_distance
+        selected = [
+            (app_id, game) for app_id, game in games.items()
+            if f" {_normalize(game['name'])} " in query_norm
+            or (game["distance"] is not None and game["distance"] <= max_distance)
+        ][: settings.knowledge_first_max_games]
+        if not selected:
+            return None
+
+        budget = settings.knowledge_first_token_budget * CHARS_PER_TOKEN
+        per_game_budget = budget // len(selected)
+        now = time.time()
+        sections: List[str] = []
+        app_ids: List[int] = []
+        used_docs = 0
+        stale_skipped = 0
+
+        documents_by_game = await asyncio.gather(
+            *(self.rag_service.get_game_documents(int(app_id)) for app_id, _ in selected)
+        )
+        for (app_id, game), documents in zip(selected, documents_by_game):
+            fresh = [d for d in documents if self.is_fresh(d["metadata"], now)]
+            stale_skipped += len(documents) - len(fresh)
+
+            info = next((d for d in fresh if d["metadata"].get("type") == "game_info"), None)
+            if info is None:
+                continue  # Reviews alone are not enough to answer about a game
+
+            age = document_age(info["metadata"], now) or 0.0
+            header = f"[{game['name']} (app_id {app_id}) · guardado hace {_format_age(age)}]"
+            section = f"{header}\n{info['document']}"
+            if len(section) > budget:
+                break
+
+            # Reviews that matched the query first, then the rest, within this game's share
+            reviews = sorted(
+                (d for d in fresh if d["metadata"].get("type") == "review"),
+                key=lambda d: d["metadata"].get("content_hash") not in game["hit_ids"],
+            )
+            review_lines = []
+            remaining = min(budget, per_game_budget) - len(section)
+            for review in reviews:
+                line = f'- "{review["document"][:MAX_REVIEW_CHARS].strip()}"'
+                if len(line) + 1 > remaining - len("\nReseñas:"):
+                    break
+                review_lines.append(line)
+                remaining -= len(line) + 1
+            if review_lines:
+                section += "\nReseñas:\n" + "\n".join(review_lines)
+
+            sections.append(section)
+            budget -= len(section)
+            app_ids.append(int(app_id))
+            used_docs += 1 + len(review_lines)
+
+        if not sections:
+            return None
+
+        context = "\n\n".join(sections)
+        return {
+            "context": context,
+            "app_ids": app_ids,
+            "documents": used_docs,
+            "tokens": len(context) // CHARS_PER_TOKEN,
+            "stale_skipped": stale_skipped,
+        }
@@ -0,0 +1,198 @@
+"""
+Speculative prefetch of likely-next Steam data.
+
+After a search-type tool returns, the model's next step is almost always a
+details or reviews lookup for the top hits. Prefetching those into the cache
+while Claude is generating its next turn hides the Steam latency.
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple, Iterable
+
+from src.config import settings
+from src.utils.cache import cache_manager
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# Prefetched keys remembered for hit-rate accounting
+_MAX_TRACKED_KEYS = 1000
+
+PrefetchKey = Tuple[str, int]
+
+
+class PrefetchService:
+    """Bounded, cancellable background prefetcher for Steam details and reviews."""
+
+    def __init__(self, steam_service):
+        """
+        Initialize prefetcher.
+
+        Args:
+            steam_service: SteamService whose cached methods are warmed
+        """
+        self.steam_service = steam_service
+        self.enabled = settings.prefetch_enabled
+        self.top_n = settings.prefetch_top_n
+        self.max_pending = settings.prefetch_max_pending
+
+        self._semaphore = asyncio.Semaphore(settings.prefetch_max_concurrency)
+        self._tasks: Dict[PrefetchKey, asyncio.Task] = {}
+        self._prefetched: OrderedDict = OrderedDict()  # key -> already requested?
+
+        self.stats = {
+            "scheduled": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "skipped_cached": 0,
+            "skipped_full": 0,
+            "hits": 0,
+            "misses": 0,
+        }
+
+    def schedule(
+        self, app_ids: Iterable[int], kinds: Iterable[str] = ("details", "reviews")
+    ) -> List[PrefetchKey]:
+        """
+        Start background prefetches for the top-N app_ids.
+
+        Never blocks: work beyond max_pending or already cached is skipped.
+
+        Args:
+            app_ids: Candidate app_ids in rank order
+            kinds: Data to prefetch per game ("details", "reviews")
+
+        Returns:
+            Keys of the prefetches started, to cancel them later
+        """
+        if not self.enabled:
+            return []
+
+        started = []
+        for app_id in list(app_ids)[: self.top_n]:
+            if not app_id:
+                continue
+            for kind in kinds:
+                key = (kind, int(app_id))
+                if key in self._tasks:
+                    continue
+                if self._is_cached(key):
+                    self.stats["skipped_cached"] += 1
+                    continue
+                if len(self._tasks) >= self.max_pending:
+                    self.stats["skipped_full"] += 1
+                    continue
+
+                self._prefetched.pop(key, None)
+                task = asyncio.create_task(self._run(key))
+                self._tasks[key] = task
+                task.add_done_callback(lambda t, key=key: self._tasks.pop(key, None))
+                self.stats["scheduled"] += 1
+                started.append(key)
+
+        if started:
+            logger.debug(f"Prefetching {len(started)} Steam lookups")
+        return started
+
+    async def claim(self, kind: str, app_id: int) -> None:
+        """
+        Record a real lookup, waiting for a matching in-flight prefetch.
+
+        Waiting avoids fetching the same data twice; the caller's cached lookup
+        then hits. Counts as a prefetch hit only once the prefetch has completed,
+        and at most once per completed prefetch.
+
+        Args:
+            kind: "details" or "reviews"
+            app_id: Steam application ID
+        """
+        if not self.enabled:
+            return
+
+        key = (kind, int(app_id))
+        task = self._tasks.get(key)
+        if task is not None:
+            try:
+                await asyncio.shield(task)
+            except BaseException:
+                # A cancelled prefetch just means the caller fetches itself
+                if not task.done():
+                    raise
+
+        # Completed prefetches are tracked as unused (False) until claimed
+        if self._prefetched.get(key) is False:
+            self.stats["hits"] += 1
+            self._prefetched[key] = True
+        else:
+            self.stats["misses"] += 1
+
+    def cancel(self, keys: Iterable[PrefetchKey]) -> int:
+        """
+        Cancel prefetches that are still pending.
+
+        Args:
+            keys: Keys returned by schedule()
+
+        Returns:
+            Number of tasks cancelled
+        """
+        cancelled = 0
+        for key in keys:
+            task = self._tasks.get(key)
+            if task and not task.done():
+                task.cancel()
+                cancelled += 1
+        return cancelled
+
+    async def close(self) -> None:
+        """Cancel all pending prefetches and wait for them to finish."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get prefetch statistics.
+
+        hit_rate is the share of completed prefetches later used by a tool;
+        coverage is the share of tool lookups that a prefetch had anticipated.
+        """
+        used = self.stats["hits"]
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "pending": len(self._tasks),
+            "top_n": self.top_n,
+            "hit_rate": round(used / self.stats["completed"], 3) if self.stats["completed"] else 0.0,
+            "coverage": round(used / lookups, 3) if lookups else 0.0,
+        }
+
+    async def _run(self, key: PrefetchKey) -> None:
+        """Fetch one item into the cache."""
+        kind, app_id = key
+        try:
+            async with self._semaphore:
+                if kind == "details":
+                    await self.steam_service.get_game_details(app_id)
+                else:
+                    await self.steam_service.get_game_reviews(app_id)
+            self.stats["completed"] += 1
+            self._prefetched.setdefault(key, False)
+            while len(self._prefetched) > _MAX_TRACKED_KEYS:
+                self._prefetched.popitem(last=False)
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.debug(f"Prefetch {kind} for {app_id} failed: {e}")
+
+    def _is_cached(self, key: PrefetchKey) -> bool:
+        """Check whether the data for a prefetch key is already cached."""
+        kind, app_id = key
+        steam = self.steam_service
+        method = steam.get_game_details if kind == "details" else steam.get_game_reviews
+        return cache_manager.contains(method.cache_key((steam, app_id), {}))
@@ -1,107 +1,342 @@
-import chromadb
-from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from pathlib import Path
+import hashlib
 import json
+import os
+import time
+import numpy as np
 from src.config import settings
+from src.services.bm25_index import BM25Index
+from src.services.embedding_cache import EmbeddingCache
+from src.services.kb_counters import KnowledgeBaseCounters
+from src.services.vector_store import NumpyVectorStore, HashingEmbedder
 from src.utils.logger import get_logger
+from src.utils.review_processing import MinHashDeduplicator, prepare_reviews
 
 logger = get_logger()
 
+# Name of the games collection (Chroma) / store directory (numpy)
+COLLECTION_NAME = "games_knowledge"
+
+# ChromaDB is optional (it does not install on Railway); the NumPy backend
+# needs nothing beyond NumPy
+try:
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+    CHROMA_AVAILABLE = True
+except ImportError:
+    CHROMA_AVAILABLE = False
+
+
+def _content_hash(text: str) -> str:
+    """Get a stable hash of a document's text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def document_timestamp(metadata: Dict[str, Any]) -> Optional[float]:
+    """
+    Get when a document was stored or last confirmed, as epoch seconds.
+
+    Args:
+        metadata: Document metadata (legacy documents carry an ISO string)
+
+    Returns:
+        Epoch seconds, or None if missing or unreadable
+    """
+    timestamp = (metadata or {}).get("timestamp")
+    try:
+        if isinstance(timestamp, (int, float)):
+            return float(timestamp)
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _document_order(document: Dict[str, Any]) -> Tuple[bool, int, int]:
+    """Sort key placing game info first, then reviews and their chunks in order."""
+    meta = document["metadata"] or {}
+    return (
+        meta.get("type") != "game_info",
+        meta.get("review_index", 0),
+        meta.get("chunk_index", 0),
+    )
+
 
 class RAGService:
-    """Service for RAG (Retrieval Augmented Generation) using ChromaDB."""
+    """Service for RAG (Retrieval Augmented Generation) using ChromaDB or a NumPy vector store."""
+
+    def __init__(self, backend: Optional[str] = None):
+        """
+        Initialize the vector backend and collection.
+
+        Args:
+            backend: "chroma", "numpy" or "auto" (defaults to settings.vector_backend;
+                "auto" uses ChromaDB when installed, NumPy otherwise)
+        """
+        backend = backend or settings.vector_backend
+        if backend == "auto":
+            backend = "chroma" if CHROMA_AVAILABLE else "numpy"
+        if backend not in ("chroma", "numpy"):
+            raise ValueError(f"Unknown vector backend: {backend}")
+        if backend == "chroma" and not CHROMA_AVAILABLE:
+            raise ImportError("chromadb is not installed (use VECTOR_BACKEND=numpy)")
+        self.backend = backend
+        self.client = None
 
-    def __init__(self):
-        """Initialize ChromaDB client and collection."""
         try:
-            # Initialize ChromaDB with persistent storage
-            self.client = chromadb.PersistentClient(
-                path=settings.chroma_persist_dir,
-                settings=ChromaSettings(
-                    anonymized_telemetry=False,
-                    allow_reset=True,
-                ),
-            )
+            if backend == "chroma":
+                # Initialize ChromaDB with persistent storage
+                self.client = chromadb.PersistentClient(
+                    path=settings.chroma_persist_dir,
+                    settings=ChromaSettings(
+                        anonymized_telemetry=False,
+                        allow_reset=True,
+                    ),
+                )
+
+                # Create or get collection for games
+                self.games_collection = self.client.get_or_create_collection(
+                    name=COLLECTION_NAME,
+                    metadata={"description": "Videogame information and reviews"},
+                )
+            else:
+                self.games_collection = NumpyVectorStore(
+                    path=os.path.join(settings.chroma_persist_dir, "numpy"),
+                    name=COLLECTION_NAME,
+                    embedder=HashingEmbedder(settings.embedding_dim),
+                    quantization=settings.vector_quantization,
+                    index=settings.vector_index,
+                    nprobe=settings.vector_ivf_nprobe,
+                )
 
-            # Create or get collection for games
-            self.games_collection = self.client.get_or_create_collection(
-                name="games_knowledge",
-                metadata={"description": "Videogame information and reviews"},
+            self.embedding_model = self._embedding_model_id()
+            self.embedding_cache = self._create_embedding_cache()
+            self.revision = 0  # Bumped on every write, used to skip unchanged snapshots
+            self._snapshot_revision = -1
+            self.deduplicator = MinHashDeduplicator(threshold=settings.review_dedup_threshold)
+
+            # Lexical index for hybrid retrieval (rebuilt from the stored documents)
+            # and exact per-type/per-game counters (persisted next to the collection)
+            self.bm25 = BM25Index()
+            self.counters = KnowledgeBaseCounters(
+                os.path.join(settings.chroma_persist_dir, f"{backend}_kb_counters.json"),
+                flush_interval=settings.kb_counters_flush_interval,
             )
+            self._load_indexes()
+
+            # A fresh replica starts from the latest snapshot instead of re-embedding
+            if (
+                settings.kb_snapshot_path
+                and self.games_collection.count() == 0
+                and os.path.exists(settings.kb_snapshot_path)
+            ):
+                self.import_snapshot(settings.kb_snapshot_path)
 
             logger.info(
-                f"ChromaDB initialized with {self.games_collection.count()} documents"
+                f"Knowledge base ({backend}) initialized with "
+                f"{self.games_collection.count()} documents"
             )
 
         except Exception as e:
-            logger.error(f"Error initializing ChromaDB: {e}")
+            logger.error(f"Error initializing {backend} knowledge base: {e}")
             raise
 
     def add_game_to_knowledge_base(
         self, game_data: Dict[str, Any], reviews: Optional[List[str]] = None
     ) -> bool:
         """
-        Add game information to the knowledge base.
+        Add or refresh game information in the knowledge base.
+
+        Documents are upserted under content-addressed ids with a content hash
+        in their metadata; unchanged documents are skipped (no re-embedding)
+        and reviews no longer present are removed.
 
         Args:
             game_data: Dictionary containing game information
-            reviews: Optional list of review texts
+            reviews: Optional list of review texts (None leaves stored reviews untouched)
 
         Returns:
             True if successful, False otherwise
         """
+        result = self.add_games_batch([(game_data, reviews)])
+        if result is not None:
+            logger.info(
+                f"Synced game '{game_data.get('name', 'Unknown')}' to knowledge base: "
+                f"{result['written']} written, {result['unchanged']} unchanged, "
+                f"{result['removed']} removed"
+            )
+        return result is not None
+
+    def add_games_batch(
+        self, items: List[Tuple[Dict[str, Any], Optional[List[str]]]]
+    ) -> Optional[Dict[str, int]]:
+        """
+        Add or refresh several games with one lookup, one upsert and one delete.
+
+        Args:
+            items: List of (game_data, reviews) pairs; reviews=None leaves stored reviews untouched
+
+        Returns:
+            Counts of written, unchanged (of which refreshed) and removed
+            documents, or None on error
+        """
         try:
-            app_id = str(game_data.get("app_id"))
-            game_name = game_data.get("name", "Unknown")
-
-            # Create document from game data
-            documents = []
-            metadatas = []
-            ids = []
-
-            # Add main game information
-            main_doc = self._create_game_document(game_data)
-            documents.append(main_doc)
-            metadatas.append(
-                {
-                    "app_id": app_id,
-                    "name": game_name,
-                    "type": "game_info",
-                    "timestamp": datetime.now().isoformat(),
+            ids: List[str] = []
+            documents: List[str] = []
+            metadatas: List[Dict[str, Any]] = []
+            replace_reviews = set()
+            duplicates = 0
+
+            # A game listed twice is written once, with its last entry, so its
+            # documents are neither upserted nor counted twice
+            latest = {str(game_data.get("app_id")): (game_data, reviews) for game_data, reviews in items}
+            for game_data, reviews in latest.values():
+                game_ids, game_docs, game_metas, game_duplicates = self._build_game_documents(
+                    game_data, reviews
+                )
+                duplicates += game_duplicates
+                ids.extend(game_ids)
+                documents.extend(game_docs)
+                metadatas.extend(game_metas)
+                if reviews is not None:
+                    replace_reviews.add(str(game_data.get("app_id")))
+
+            if not ids:
+                return {
+                    "written": 0, "unchanged": 0, "refreshed": 0, "removed": 0, "duplicates": 0
                 }
-            )
-            ids.append(f"game_{app_id}")
-
-            # Add reviews if provided
-            if reviews:
-                for idx, review in enumerate(reviews[:20]):  # Limit to 20 reviews
-                    if review and len(review.strip()) > 50:  # Only meaningful reviews
-                        documents.append(review)
-                        metadatas.append(
-                            {
-                                "app_id": app_id,
-                                "name": game_name,
-                                "type": "review",
-                                "review_index": idx,
-                                "timestamp": datetime.now().isoformat(),
-                            }
-                        )
-                        ids.append(f"review_{app_id}_{idx}")
 
-            # Add to collection
-            self.games_collection.add(
-                documents=documents, metadatas=metadatas, ids=ids
-            )
+            # Compare against what is already stored for these games
+            app_ids = sorted({meta["app_id"] for meta in metadatas})
+            where = {"app_id": app_ids[0]} if len(app_ids) == 1 else {"app_id": {"$in": app_ids}}
+            existing = self.games_collection.get(where=where, include=["metadatas"])
+            stored = dict(zip(existing["ids"], [meta or {} for meta in existing["metadatas"]]))
+
+            changed = [
+                idx for idx, doc_id in enumerate(ids)
+                if stored.get(doc_id, {}).get("content_hash") != metadatas[idx]["content_hash"]
+            ]
+            # Unchanged documents are re-stamped (metadata only, no re-embedding)
+            # so TTLs and freshness count from when the data was last confirmed
+            changed_set = set(changed)
+            refresh_before = time.time() - settings.kb_timestamp_refresh_interval
+            refresh = [
+                idx for idx, doc_id in enumerate(ids)
+                if idx not in changed_set
+                and (document_timestamp(stored[doc_id]) or 0.0) < refresh_before
+            ]
+            new_ids = set(ids)
+            stale = [
+                doc_id for doc_id, meta in stored.items()
+                if doc_id not in new_ids
+                and meta.get("type") == "review"
+                and meta.get("app_id") in replace_reviews
+            ]
+
+            if changed:
+                changed_ids = [ids[idx] for idx in changed]
+                changed_docs = [documents[idx] for idx in changed]
+                changed_metas = [metadatas[idx] for idx in changed]
+                self.games_collection.upsert(
+                    ids=changed_ids,
+                    documents=changed_docs,
+                    metadatas=changed_metas,
+                    embeddings=self._embed(changed_docs),
+                )
+                self.bm25.upsert(changed_ids, changed_docs, changed_metas)
+                self.counters.apply(
+                    added=changed_metas,
+                    removed=[stored[doc_id] for doc_id in changed_ids if doc_id in stored],
+                )
+            if refresh:
+                refresh_ids = [ids[idx] for idx in refresh]
+                refresh_metas = [metadatas[idx] for idx in refresh]
+                self.games_collection.update(ids=refresh_ids, metadatas=refresh_metas)
+                self.bm25.update_metadata(refresh_ids, refresh_metas)
+            if stale:
+                self.games_collection.delete(ids=stale)
+                self.bm25.delete(stale)
+                self.counters.apply(removed=[stored[doc_id] for doc_id in stale])
+            if changed or stale:
+                self.revision += 1
 
-            logger.info(
-                f"Added game '{game_name}' with {len(documents)} documents to knowledge base"
-            )
-            return True
+            return {
+                "written": len(changed),
+                "unchanged": len(ids) - len(changed),
+                "refreshed": len(refresh),
+                "removed": len(stale),
+                "duplicates": duplicates,
+            }
 
         except Exception as e:
-            logger.error(f"Error adding game to knowledge base: {e}")
-            return False
+            logger.error(f"Error adding games to knowledge base: {e}")
+            return None
+
+    def _build_game_documents(
+        self, game_data: Dict[str, Any], reviews: Optional[List[str]] = None
+    ) -> Tuple[List[str], List[str], List[Dict[str, Any]], int]:
+        """
+        Build ids, documents and metadata for a game and its reviews.
+
+        Reviews are normalised, near-duplicates dropped and long reviews split
+        into chunks. Review ids are derived from the normalised text, so the
+        same review keeps the same id regardless of its position in the list;
+        chunks add a suffix and reference the review through parent_id.
+
+        Args:
+            game_data: Dictionary containing game information
+            reviews: Optional list of review texts
+
+        Returns:
+            Tuple of (ids, documents, metadatas, near-duplicate reviews dropped)
+        """
+        app_id = str(game_data.get("app_id"))
+        game_name = game_data.get("name", "Unknown")
+        timestamp = round(time.time(), 3)
+
+        main_doc = self._create_game_document(game_data)
+        ids = [f"game_{app_id}"]
+        documents = [main_doc]
+        metadatas = [
+            {
+                "app_id": app_id,
+                "name": game_name,
+                "type": "game_info",
+                "timestamp": timestamp,
+                "content_hash": _content_hash(main_doc),
+            }
+        ]
+
+        prepared = prepare_reviews(
+            (reviews or [])[:20],  # Limit to 20 reviews
+            self.deduplicator,
+            max_chars=settings.review_chunk_chars,
+            overlap=settings.review_chunk_overlap,
+        )
+        for review in prepared["reviews"]:
+            parent_id = f"review_{app_id}_{_content_hash(review['text'])[:16]}"
+            if parent_id in ids:
+                continue
+            chunks = review["chunks"]
+            for chunk_index, chunk in enumerate(chunks):
+                ids.append(parent_id if len(chunks) == 1 else f"{parent_id}_c{chunk_index}")
+                documents.append(chunk)
+                metadatas.append(
+                    {
+                        "app_id": app_id,
+                        "name": game_name,
+                        "type": "review",
+                        "review_index": review["index"],
+                        "parent_id": parent_id,
+                        "chunk_index": chunk_index,
+                        "chunk_count": len(chunks),
+                        "timestamp": timestamp,
+                        "content_hash": _content_hash(chunk),
+                    }
+                )
+
+        return ids, documents, metadatas, prepared["duplicates"]
 
     def _create_game_document(self, game_data: Dict[str, Any]) -> str:
         """
@@ -167,46 +402,400 @@ class RAGService:
         return "\n".join(doc_parts)
 
     def search_similar_games(
-        self, query: str, n_results: int = 5, filters: Optional[Dict[str, Any]] = None
+        self,
+        query: str,
+        n_results: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
-        Search for similar games based on semantic similarity.
+        Search for similar games combining semantic and lexical (BM25) matching.
+
+        In hybrid mode both retrievers return a candidate pool that is fused
+        with reciprocal rank fusion (or weighted score blending), so exact
+        titles, studios and franchise numbers rank well alongside semantic matches.
 
         Args:
             query: Search query
             n_results: Number of results to return
             filters: Optional metadata filters
+            mode: "hybrid", "vector" or "bm25" (defaults to settings.retrieval_mode)
 
         Returns:
             List of matching documents with metadata
         """
         try:
             where_filter = filters if filters else None
+            mode = mode or settings.retrieval_mode
+            pool = max(n_results * 4, 20) if mode == "hybrid" else n_results
+
+            vector_hits: List[Dict[str, Any]] = []
+            if mode != "bm25":
+                embeddings = self._embed([query])
+                query_args = (
+                    {"query_texts": [query]} if embeddings is None else {"query_embeddings": embeddings}
+                )
+                results = self.games_collection.query(
+                    **query_args, n_results=pool, where=where_filter
+                )
+                if results and results["documents"]:
+                    for idx in range(len(results["documents"][0])):
+                        vector_hits.append(
+                            {
+                                "id": results["ids"][0][idx],
+                                "document": results["documents"][0][idx],
+                                "metadata": results["metadatas"][0][idx],
+                                "distance": results["distances"][0][idx]
+                                if results.get("distances")
+                                else None,
+                            }
+                        )
 
-            results = self.games_collection.query(
-                query_texts=[query], n_results=n_results, where=where_filter
-            )
+            lexical_hits = self.bm25.search(query, pool, where_filter) if mode != "vector" else []
 
-            formatted_results = []
-            if results and results["documents"]:
-                for idx in range(len(results["documents"][0])):
-                    formatted_results.append(
-                        {
-                            "document": results["documents"][0][idx],
-                            "metadata": results["metadatas"][0][idx],
-                            "distance": results["distances"][0][idx]
-                            if results.get("distances")
-                            else None,
-                        }
-                    )
+            if mode == "vector":
+                hits = vector_hits
+            else:
+                hits = self._fuse(vector_hits, lexical_hits, n_results)
 
-            logger.info(f"Found {len(formatted_results)} results for query: '{query}'")
+            formatted_results = [
+                {key: value for key, value in hit.items() if key != "id"} for hit in hits
+            ]
+            logger.bind(throttle="rag_search").info(
+                f"Found {len(formatted_results)} results for query: '{query}'"
+            )
             return formatted_results
 
         except Exception as e:
             logger.error(f"Error searching knowledge base: {e}")
             return []
 
+    def _fuse(
+        self,
+        vector_hits: List[Dict[str, Any]],
+        lexical_hits: List[Tuple[str, float]],
+        n_results: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fuse vector and BM25 rankings.
+
+        Args:
+            vector_hits: Vector results (with "id" and "distance"), best first
+            lexical_hits: (doc_id, bm25_score) pairs, best first
+            n_results: Number of results to return
+
+        Returns:
+            Fused hits with a "score" key, best first
+        """
+        fused: Dict[str, float] = {}
+        vector_weight = settings.hybrid_vector_weight
+        bm25_weight = settings.hybrid_bm25_weight
+
+        if settings.hybrid_fusion == "weighted":
+            # Min-max normalise each retriever's scores within its candidate pool
+            def normalise(scores: Dict[str, float]) -> Dict[str, float]:
+                if not scores:
+                    return {}
+                low, high = min(scores.values()), max(scores.values())
+                span = (high - low) or 1.0
+                return {doc_id: (score - low) / span for doc_id, score in scores.items()}
+
+            vector_scores = normalise(
+                {hit["id"]: -(hit["distance"] or 0.0) for hit in vector_hits}
+            )
+            for doc_id, score in vector_scores.items():
+                fused[doc_id] = fused.get(doc_id, 0.0) + vector_weight * score
+            for doc_id, score in normalise(dict(lexical_hits)).items():
+                fused[doc_id] = fused.get(doc_id, 0.0) + bm25_weight * score
+        else:
+            k = settings.hybrid_rrf_k
+            for rank, hit in enumerate(vector_hits):
+                fused[hit["id"]] = fused.get(hit["id"], 0.0) + vector_weight / (k + rank + 1)
+            for rank, (doc_id, _) in enumerate(lexical_hits):
+                fused[doc_id] = fused.get(doc_id, 0.0) + bm25_weight / (k + rank + 1)
+
+        top_ids = sorted(fused, key=fused.get, reverse=True)[:n_results]
+
+        # Lexical-only hits still need their document and metadata
+        by_id = {hit["id"]: hit for hit in vector_hits}
+        missing = [doc_id for doc_id in top_ids if doc_id not in by_id]
+        if missing:
+            stored = self.games_collection.get(ids=missing, include=["documents", "metadatas"])
+            for doc_id, doc, meta in zip(stored["ids"], stored["documents"], stored["metadatas"]):
+                by_id[doc_id] = {"id": doc_id, "document": doc, "metadata": meta, "distance": None}
+
+        return [
+            {**by_id[doc_id], "score": round(fused[doc_id], 6)}
+            for doc_id in top_ids
+            if doc_id in by_id
+        ]
+
+    def _iter_collection(self, include: List[str], page_size: int = 5000):
+        """Yield every stored document in pages."""
+        offset = 0
+        while True:
+            page = self.games_collection.get(limit=page_size, offset=offset, include=include)
+            if not page["ids"]:
+                break
+            yield page
+            offset += len(page["ids"])
+
+    def _load_indexes(self) -> None:
+        """Rebuild the BM25 index and, if missing or stale, the counters in one scan."""
+        reconcile = (
+            not self.counters.loaded
+            or self.counters.total != self.games_collection.count()
+        )
+        metadatas: List[Dict[str, Any]] = []
+        legacy_ids: List[str] = []
+        legacy_metas: List[Dict[str, Any]] = []
+        for page in self._iter_collection(["documents", "metadatas"]):
+            for doc_id, meta in zip(page["ids"], page["metadatas"]):
+                if isinstance((meta or {}).get("timestamp"), str):
+                    legacy_ids.append(doc_id)
+                    legacy_metas.append({**meta, "timestamp": document_timestamp(meta) or 0.0})
+            self.bm25.upsert(page["ids"], page["documents"], page["metadatas"])
+            if reconcile:
+                metadatas.extend(page["metadatas"])
+        if reconcile:
+            self.counters.rebuild(metadatas)
+            logger.info(f"Rebuilt knowledge base counters ({self.counters.total} documents)")
+
+        # Older documents stored ISO timestamps; numeric ones allow $lt filters for TTLs
+        for start in range(0, len(legacy_ids), 1000):
+            batch_ids = legacy_ids[start : start + 1000]
+            batch_metas = legacy_metas[start : start + 1000]
+            self.games_collection.update(ids=batch_ids, metadatas=batch_metas)
+            self.bm25.update_metadata(batch_ids, batch_metas)
+        if legacy_ids:
+            logger.info(f"Migrated {len(legacy_ids)} documents to numeric timestamps")
+
+    def reconcile_stats(self) -> Dict[str, Any]:
+        """
+        Rebuild the counters from the stored metadata.
+
+        Returns:
+            Counter snapshots before and after, and whether they differed
+        """
+        before = self.counters.snapshot()
+        self.counters.rebuild(
+            meta for page in self._iter_collection(["metadatas"]) for meta in page["metadatas"]
+        )
+        after = self.counters.snapshot()
+        if before != after:
+            logger.warning(f"Knowledge base counters drifted: {before} -> {after}")
+        return {"before": before, "after": after, "drifted": before != after}
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Evict documents older than their type's TTL.
+
+        Args:
+            now: Current epoch time (defaults to time.time())
+
+        Returns:
+            Number of documents removed per type
+        """
+        now = now or time.time()
+        ttls = {"game_info": settings.kb_ttl_game_info, "review": settings.kb_ttl_review}
+        removed: Dict[str, int] = {}
+        for doc_type, ttl in ttls.items():
+            if ttl <= 0:
+                continue
+            expired = self.games_collection.get(
+                where={"$and": [{"type": doc_type}, {"timestamp": {"$lt": now - ttl}}]},
+                include=["metadatas"],
+            )
+            if expired["ids"]:
+                self.games_collection.delete(ids=expired["ids"])
+                self.bm25.delete(expired["ids"])
+                self.counters.apply(removed=expired["metadatas"])
+                self.revision += 1
+            removed[doc_type] = len(expired["ids"])
+
+        if any(removed.values()):
+            logger.info(f"Knowledge base compaction removed {removed}")
+        return removed
+
+    def export_snapshot(self, path: str, if_changed: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Write documents, metadata and embeddings to a single .npz file.
+
+        Embeddings are stored as float16 (half the size, negligible loss for
+        unit vectors); text and metadata as JSON byte arrays, so loading needs
+        no pickle and no re-embedding.
+
+        Args:
+            path: Snapshot file path
+            if_changed: Skip the export when nothing changed since the last one
+
+        Returns:
+            Snapshot info, or None if skipped or failed
+        """
+        if if_changed and self.revision == self._snapshot_revision:
+            return None
+        try:
+            revision = self.revision
+            ids: List[str] = []
+            documents: List[str] = []
+            metadatas: List[Dict[str, Any]] = []
+            embeddings: List[np.ndarray] = []
+            for page in self._iter_collection(["documents", "metadatas", "embeddings"]):
+                ids.extend(page["ids"])
+                documents.extend(page["documents"])
+                metadatas.extend(page["metadatas"])
+                embeddings.append(np.asarray(page["embeddings"], dtype=np.float16))
+
+            info = {
+                "version": 1,
+                "embedding_model": self.embedding_model,
+                "count": len(ids),
+                "created_at": round(time.time(), 3),
+            }
+
+            def as_bytes(value: Any) -> np.ndarray:
+                return np.frombuffer(json.dumps(value).encode("utf-8"), dtype=np.uint8)
+
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    info=as_bytes(info),
+                    ids=as_bytes(ids),
+                    documents=as_bytes(documents),
+                    metadatas=as_bytes(metadatas),
+                    embeddings=(
+                        np.concatenate(embeddings) if embeddings else np.zeros((0, 0), np.float16)
+                    ),
+                )
+            os.replace(tmp_path, path)
+            self._snapshot_revision = revision
+
+            info["bytes"] = os.path.getsize(path)
+            logger.info(f"Exported knowledge base snapshot with {len(ids)} documents to {path}")
+            return info
+
+        except Exception as e:
+            logger.error(f"Error exporting knowledge base snapshot: {e}")
+            return None
+
+    def import_snapshot(self, path: str, batch_size: int = 5000) -> Optional[Dict[str, Any]]:
+        """
+        Load a snapshot written by export_snapshot, reusing its embeddings.
+
+        Args:
+            path: Snapshot file path
+            batch_size: Documents per upsert
+
+        Returns:
+            Snapshot info with the number of documents loaded, or None on error
+        """
+        try:
+            start = time.perf_counter()
+            with np.load(path, allow_pickle=False) as data:
+                info = json.loads(data["info"].tobytes())
+                if info.get("embedding_model") != self.embedding_model:
+                    logger.warning(
+                        f"Snapshot {path} was embedded with {info.get('embedding_model')}, "
+                        f"current model is {self.embedding_model}; not loading it"
+                    )
+                    return None
+                ids = json.loads(data["ids"].tobytes())
+                documents = json.loads(data["documents"].tobytes())
+                metadatas = json.loads(data["metadatas"].tobytes())
+                embeddings = data["embeddings"].astype(np.float32)
+
+            for i in range(0, len(ids), batch_size):
+                batch = slice(i, i + batch_size)
+                self.games_collection.upsert(
+                    ids=ids[batch],
+                    documents=documents[batch],
+                    metadatas=metadatas[batch],
+                    embeddings=embeddings[batch],
+                )
+                self.bm25.upsert(ids[batch], documents[batch], metadatas[batch])
+            self.counters.rebuild(
+                meta for page in self._iter_collection(["metadatas"]) for meta in page["metadatas"]
+            )
+            self.revision += 1
+            self._snapshot_revision = self.revision
+
+            info["loaded"] = len(ids)
+            info["seconds"] = round(time.perf_counter() - start, 2)
+            logger.info(f"Loaded {len(ids)} documents from snapshot {path} in {info['seconds']}s")
+            return info
+
+        except Exception as e:
+            logger.error(f"Error importing knowledge base snapshot: {e}")
+            return None
+
+    def _embedding_model_id(self) -> str:
+        """Identify the embedding function, so snapshots are only loaded into the same space."""
+        if self.backend == "numpy":
+            return self.games_collection.embedder.model_id
+        embedding_function = getattr(self.games_collection, "_embedding_function", None)
+        try:
+            return f"chroma:{embedding_function.name()}"
+        except Exception:
+            return f"chroma:{type(embedding_function).__name__}"
+
+    def _create_embedding_cache(self) -> Optional[EmbeddingCache]:
+        """Wrap the collection's embedding function in an LRU cache (None if disabled)."""
+        if settings.embedding_cache_size <= 0:
+            return None
+        if self.backend == "numpy":
+            embed = self.games_collection.embedder
+        else:
+            embed = getattr(self.games_collection, "_embedding_function", None)
+        if embed is None:
+            return None
+        path = (
+            os.path.join(settings.chroma_persist_dir, f"{self.backend}_embedding_cache.npz")
+            if settings.embedding_cache_persist
+            else None
+        )
+        return EmbeddingCache(embed, self.embedding_model, settings.embedding_cache_size, path)
+
+    def _embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Embed texts through the cache (None lets the collection embed them itself)."""
+        if self.embedding_cache is None:
+            return None
+        return self.embedding_cache.embed(texts)
+
+    def close(self) -> None:
+        """Persist pending counter updates and the embedding cache."""
+        self.counters.save(force=True)
+        if self.embedding_cache is not None:
+            self.embedding_cache.save()
+
+    def get_game_documents(self, app_id: int) -> List[Dict[str, Any]]:
+        """
+        Get every stored document of a game with its metadata.
+
+        Args:
+            app_id: Steam application ID
+
+        Returns:
+            List of {"id", "document", "metadata"} dictionaries (game info first)
+        """
+        try:
+            results = self.games_collection.get(
+                where={"app_id": str(app_id)}, include=["documents", "metadatas"]
+            )
+            documents = [
+                {"id": doc_id, "document": doc, "metadata": meta or {}}
+                for doc_id, doc, meta in zip(
+                    results["ids"], results["documents"], results["metadatas"]
+                )
+            ]
+            documents.sort(key=_document_order)
+            return documents
+
+        except Exception as e:
+            logger.error(f"Error getting documents for game {app_id}: {e}")
+            return []
+
     def get_game_context(self, app_id: int) -> Optional[str]:
         """
         Get all stored information about a specific game.
@@ -225,12 +814,12 @@ class RAGService:
             if not results or not results["documents"]:
                 return None
 
-            context_parts = []
-            for doc, meta in zip(results["documents"], results["metadatas"]):
-                if meta.get("type") == "game_info":
-                    context_parts.insert(0, doc)  # Game info first
-                else:
-                    context_parts.append(doc)
+            # Game info first, then reviews with their chunks in order
+            pairs = sorted(
+                zip(results["documents"], results["metadatas"]),
+                key=lambda pair: _document_order({"metadata": pair[1]}),
+            )
+            context_parts = [doc for doc, _ in pairs]
 
             return "\n\n".join(context_parts)
 
@@ -249,7 +838,14 @@ class RAGService:
             True if successful, False otherwise
         """
         try:
-            self.games_collection.delete(where={"app_id": str(app_id)})
+            stored = self.games_collection.get(
+                where={"app_id": str(app_id)}, include=["metadatas"]
+            )
+            if stored["ids"]:
+                self.games_collection.delete(ids=stored["ids"])
+                self.bm25.delete(stored["ids"])
+                self.counters.apply(removed=stored["metadatas"])
+                self.revision += 1
             logger.info(f"Deleted game {app_id} from knowledge base")
             return True
         except Exception as e:
@@ -260,32 +856,32 @@ class RAGService:
         """
         Get statistics about the knowledge base.
 
+        Counts come from maintained counters, so they are exact and O(1).
+
         Returns:
             Dictionary with collection statistics
         """
         try:
-            total_docs = self.games_collection.count()
-
-            # Get sample of metadata to count types
-            sample = self.games_collection.get(limit=1000, include=["metadatas"])
-
-            game_count = sum(
-                1 for meta in sample["metadatas"] if meta.get("type") == "game_info"
-            )
-            review_count = sum(
-                1 for meta in sample["metadatas"] if meta.get("type") == "review"
-            )
-
+            counts = self.counters.snapshot()
             return {
-                "total_documents": total_docs,
-                "estimated_games": game_count,
-                "estimated_reviews": review_count,
+                "total_documents": counts["total_documents"],
+                "estimated_games": counts["games"],
+                "estimated_reviews": counts["reviews"],
+                "documents_by_type": counts["documents_by_type"],
                 "collection_name": self.games_collection.name,
+                "embedding_cache": (
+                    self.embedding_cache.get_stats() if self.embedding_cache is not None else None
+                ),
             }
 
         except Exception as e:
             logger.error(f"Error getting collection stats: {e}")
-            return {"total_documents": 0, "estimated_games": 0, "estimated_reviews": 0}
+            return {
+                "total_documents": 0,
+                "estimated_games": 0,
+                "estimated_reviews": 0,
+                "collection_name": COLLECTION_NAME,
+            }
 
     def clear_knowledge_base(self) -> bool:
         """
@@ -295,11 +891,17 @@ class RAGService:
             True if successful, False otherwise
         """
         try:
-            self.client.delete_collection(name="games_knowledge")
-            self.games_collection = self.client.create_collection(
-                name="games_knowledge",
-                metadata={"description": "Videogame information and reviews"},
-            )
+            if self.backend == "numpy":
+                self.games_collection.reset()
+            else:
+                self.client.delete_collection(name=COLLECTION_NAME)
+                self.games_collection = self.client.create_collection(
+                    name=COLLECTION_NAME,
+                    metadata={"description": "Videogame information and reviews"},
+                )
+            self.bm25.clear()
+            self.counters.reset()
+            self.revision += 1
             logger.warning("Knowledge base cleared!")
             return True
         except Exception as e:
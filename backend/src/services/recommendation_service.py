@@ -0,0 +1,341 @@
+"""
+Item-item similarity engine for "games like X" recommendations.
+
+Every game in the local store becomes a sparse feature vector built from its
+genres, categories, developers, publishers and TF-IDF weighted description
+terms. Top-k cosine neighbours are precomputed with vectorised sparse matrix
+products, so recommendations are served without calling Steam.
+"""
+
+import asyncio
+import math
+import re
+import time
+from collections import Counter
+from typing import Dict, Any, List, NamedTuple, Optional, Iterable
+
+import numpy as np
+from scipy import sparse
+
+from src.config import settings
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# Relative weight of each feature group in the similarity score
+FEATURE_WEIGHTS = {
+    "genre": 1.0,
+    "cat": 0.4,
+    "dev": 1.5,
+    "pub": 0.5,
+    "term": 1.0,
+}
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this "
+    "to with you your their they them into through over all new more can will our "
+    "game games play player players world".split()
+)
+
+# Rows of the similarity matrix computed per chunk (bounds peak memory)
+_CHUNK_ROWS = 256
+
+
+def _terms(text: Optional[str]) -> List[str]:
+    """Tokenize a description into lowercase content terms."""
+    words = re.findall(r"[a-z][a-z0-9']{2,}", (text or "").lower())
+    return [word for word in words if word not in _STOPWORDS]
+
+
+def _facet_features(game: Dict[str, Any]) -> Dict[str, float]:
+    """Get weighted categorical features for a game."""
+    features = {}
+    for group, field in (
+        ("genre", "genres"),
+        ("cat", "categories"),
+        ("dev", "developers"),
+        ("pub", "publishers"),
+    ):
+        for value in game.get(field) or []:
+            if value:
+                features[f"{group}:{value.strip().lower()}"] = FEATURE_WEIGHTS[group]
+    return features
+
+
+class _SimilarityIndex(NamedTuple):
+    """Immutable snapshot of a build, swapped in with a single assignment."""
+
+    vocab: Dict[str, int]
+    idf: np.ndarray
+    matrix: sparse.csr_matrix
+    app_ids: np.ndarray
+    row_of: Dict[int, int]
+    summaries: List[Dict[str, Any]]
+    neighbors: np.ndarray
+    scores: np.ndarray
+
+
+_EMPTY_INDEX = _SimilarityIndex(
+    vocab={},
+    idf=np.zeros(0, dtype=np.float32),
+    matrix=sparse.csr_matrix((0, 0), dtype=np.float32),
+    app_ids=np.zeros(0, dtype=np.int64),
+    row_of={},
+    summaries=[],
+    neighbors=np.zeros((0, 0), dtype=np.int32),
+    scores=np.zeros((0, 0), dtype=np.float32),
+)
+
+
+class RecommendationService:
+    """Precomputed top-k similar games over the local game store."""
+
+    def __init__(self, steam_service, top_k: Optional[int] = None):
+        """
+        Initialize recommendation engine.
+
+        Args:
+            steam_service: SteamService whose game store provides the catalogue
+            top_k: Number of neighbours precomputed per game
+        """
+        self.steam_service = steam_service
+        self.top_k = top_k or settings.similar_games_top_k
+
+        # Replaced as a whole by build() (which runs in a worker thread); readers
+        # take one reference per call so they never mix two builds
+        self._index = _EMPTY_INDEX
+
+        self._built_count = -1
+        self._built_at = 0.0
+        self._build_lock = asyncio.Lock()
+
+    def build(self, games: Iterable[Dict[str, Any]]) -> int:
+        """
+        Build feature matrix and precompute top-k neighbours for every game.
+
+        Args:
+            games: Game details dictionaries
+
+        Returns:
+            Number of games indexed
+        """
+        start = time.perf_counter()
+        games = [game for game in games if game.get("app_id")]
+        n = len(games)
+
+        # Document frequencies for description terms
+        term_lists = [_terms(game.get("short_description")) for game in games]
+        df = Counter(term for terms in term_lists for term in set(terms))
+
+        vocab: Dict[str, int] = {}
+        rows, cols, vals = [], [], []
+        for row, (game, terms) in enumerate(zip(games, term_lists)):
+            for feature, weight in _facet_features(game).items():
+                rows.append(row)
+                cols.append(vocab.setdefault(feature, len(vocab)))
+                vals.append(weight)
+            for term, tf in Counter(terms).items():
+                # Terms seen in a single game carry no similarity signal
+                if df[term] < 2:
+                    continue
+                rows.append(row)
+                cols.append(vocab.setdefault(f"term:{term}", len(vocab)))
+                vals.append(FEATURE_WEIGHTS["term"] * (1 + math.log(tf)))
+
+        idf = np.ones(len(vocab), dtype=np.float32)
+        for feature, col in vocab.items():
+            if feature.startswith("term:"):
+                idf[col] = math.log((1 + n) / (1 + df[feature[5:]])) + 1
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(vals, dtype=np.float32), (rows, cols)),
+            shape=(n, len(vocab)),
+            dtype=np.float32,
+        )
+        matrix = self._normalize(matrix.multiply(idf).tocsr())
+
+        k = min(self.top_k, max(n - 1, 0))
+        neighbors = np.zeros((n, k), dtype=np.int32)
+        scores = np.zeros((n, k), dtype=np.float32)
+        if k > 0:
+            transposed = matrix.T.tocsc()
+            for start_row in range(0, n, _CHUNK_ROWS):
+                stop_row = min(start_row + _CHUNK_ROWS, n)
+                sims = (matrix[start_row:stop_row] @ transposed).toarray()
+                # Exclude each game from its own neighbour list
+                sims[np.arange(stop_row - start_row), np.arange(start_row, stop_row)] = -1.0
+                top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+                top_scores = np.take_along_axis(sims, top, axis=1)
+                order = np.argsort(-top_scores, axis=1)
+                neighbors[start_row:stop_row] = np.take_along_axis(top, order, axis=1)
+                scores[start_row:stop_row] = np.take_along_axis(top_scores, order, axis=1)
+
+        app_ids = np.asarray([int(game["app_id"]) for game in games], dtype=np.int64)
+        self._index = _SimilarityIndex(
+            vocab=vocab,
+            idf=idf,
+            matrix=matrix,
+            app_ids=app_ids,
+            row_of={int(app_id): row for row, app_id in enumerate(app_ids)},
+            summaries=[self._summarize(game) for game in games],
+            neighbors=neighbors,
+            scores=scores,
+        )
+        self._built_count = n
+        self._built_at = time.time()
+
+        logger.info(
+            f"Built similarity index for {n} games ({len(vocab)} features) "
+            f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+        return n
+
+    async def refresh(self, force: bool = False) -> None:
+        """
+        Rebuild the index off the event loop when the game store has grown.
+
+        Args:
+            force: Rebuild even if the rebuild interval has not elapsed
+        """
+        store = self.steam_service.game_store
+        if not store:
+            return
+
+        async with self._build_lock:
+            count = store.count()
+            stale = count != self._built_count
+            due = time.time() - self._built_at >= settings.similar_games_rebuild_interval
+            if stale and (force or due or self._built_count < 0):
+                await asyncio.to_thread(lambda: self.build(store.iter_games()))
+
+    async def similar_games(
+        self, app_id: Optional[int] = None, name: Optional[str] = None, limit: int = 5
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get games similar to a given game.
+
+        Args:
+            app_id: Steam application ID of the reference game
+            name: Game name, resolved when no app_id is given
+            limit: Maximum number of similar games
+
+        Returns:
+            Dictionary with the reference game and its neighbours, or None if not found
+        """
+        await self.refresh()
+
+        if app_id is None and name:
+            app_id = await self._resolve_name(name)
+        if app_id is None:
+            return None
+
+        index = self._index
+        row = index.row_of.get(int(app_id))
+        if row is not None:
+            reference = index.summaries[row]
+            candidates = zip(index.neighbors[row], index.scores[row])
+            results = [
+                {**index.summaries[col], "similarity": round(float(score), 4)}
+                for col, score in candidates
+                if score > 0
+            ][:limit]
+        else:
+            # Unknown to the precomputed index: score it against the current matrix
+            details = await self.steam_service.get_game_details(int(app_id))
+            if not details:
+                return None
+            reference = self._summarize(details)
+            results = self._score_against_index(index, details, int(app_id), limit)
+
+        return {"game": reference, "similar_games": results}
+
+    def stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        index = self._index
+        return {
+            "games": len(index.summaries),
+            "features": len(index.vocab),
+            "top_k": index.neighbors.shape[1] if index.neighbors.ndim == 2 else 0,
+            "built_at": self._built_at or None,
+        }
+
+    async def _resolve_name(self, name: str) -> Optional[int]:
+        """
+        Resolve a game name to an app_id.
+
+        An exact (case-insensitive) name match, locally or on Steam, wins; the
+        top local full-text hit is only used when nothing matches exactly, since
+        prefix matching ranks e.g. "Hollow Knight: Silksong" over "Hollow Knight".
+        """
+        wanted = name.strip().lower()
+        resolved = await self.steam_service.resolve_game_name(name)
+        if resolved and (resolved.get("name") or "").strip().lower() == wanted:
+            return int(resolved["app_id"])
+
+        store = self.steam_service.game_store
+        if store:
+            matches = await asyncio.to_thread(
+                store.query, text=name, order_by="relevance", limit=1
+            )
+            if matches:
+                return int(matches[0]["app_id"])
+
+        if resolved and resolved.get("app_id"):
+            return int(resolved["app_id"])
+        return None
+
+    def _score_against_index(
+        self, index: _SimilarityIndex, game: Dict[str, Any], app_id: int, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Score one game's vector against every game of an index snapshot."""
+        if not index.summaries:
+            return []
+
+        cols, vals = [], []
+        for feature, weight in _facet_features(game).items():
+            if feature in index.vocab:
+                cols.append(index.vocab[feature])
+                vals.append(weight)
+        for term, tf in Counter(_terms(game.get("short_description"))).items():
+            col = index.vocab.get(f"term:{term}")
+            if col is not None:
+                cols.append(col)
+                vals.append(FEATURE_WEIGHTS["term"] * (1 + math.log(tf)))
+        if not cols:
+            return []
+
+        vector = np.zeros(len(index.vocab), dtype=np.float32)
+        np.add.at(vector, cols, vals)
+        vector *= index.idf
+        vector /= np.linalg.norm(vector) or 1.0
+
+        sims = index.matrix @ vector
+        top = np.argsort(-sims)[: limit + 1]
+        return [
+            {**index.summaries[col], "similarity": round(float(sims[col]), 4)}
+            for col in top
+            if sims[col] > 0 and index.app_ids[col] != app_id
+        ][:limit]
+
+    @staticmethod
+    def _normalize(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        """L2-normalize matrix rows."""
+        if matrix.shape[0] == 0:
+            return matrix
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms).astype(np.float32) @ matrix
+
+    @staticmethod
+    def _summarize(game: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the compact representation returned to callers."""
+        return {
+            "app_id": int(game["app_id"]),
+            "name": game.get("name"),
+            "genres": game.get("genres", []),
+            "developers": game.get("developers", []),
+            "short_description": game.get("short_description", ""),
+            "price": game.get("price", "N/A"),
+            "recommendations": game.get("recommendations") or 0,
+            "metacritic": (game.get("metacritic") or {}).get("score"),
+        }
@@ -1,20 +1,78 @@
+import asyncio
+import time
 import httpx
+from contextvars import ContextVar
 from typing import Dict, List, Optional, Any
 from src.config import settings
 from src.utils.logger import get_logger
 from src.utils.cache import cached
+from src.utils.latency import LatencyModel
+from src.utils.metrics import CACHE_REQUESTS, STEAM_IN_FLIGHT, STEAM_LATENCY, STEAM_REQUESTS
+from src.utils.steam_fixture import SteamFixture
+from src.utils.tracing import trace_cache, trace_steam
+from src.services.game_store import GameStore
+from src.services.game_index import FacetIndex
 
 logger = get_logger()
 
+# Reviews requested per call by default; responses keep at most 20 reviews anyway
+REVIEWS_PER_REQUEST = 20
+
+# App ids remembered as definitely not found on Steam (oldest forgotten first)
+MAX_NOT_FOUND = 10000
+
+# Steam HTTP requests made in the current context (e.g. one chat), when tracked:
+# set it to [0] and read element 0 afterwards. Tasks spawned from the context share it.
+steam_request_counter: ContextVar[Optional[List[int]]] = ContextVar(
+    "steam_request_counter", default=None
+)
+
 
 class SteamService:
     """Service for interacting with Steam API."""
 
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize Steam service.
+
+        Args:
+            client: Optional HTTP client (e.g. one replaying a recorded fixture)
+        """
         self.api_key = settings.steam_api_key
         self.base_url = settings.steam_api_base_url
         self.store_url = settings.steam_store_api_url
-        self.client = httpx.AsyncClient(timeout=30.0)
+
+        # UPSTREAM_MODE=replay/record serves or captures responses in a fixture file
+        self.fixture: Optional[SteamFixture] = None
+        if client is None and settings.upstream_mode != "live":
+            self.fixture = SteamFixture(settings.steam_fixture_path)
+            client = self.fixture.client(
+                settings.upstream_mode, LatencyModel(settings.replay_steam_latency)
+            )
+            logger.info(
+                f"Steam upstream in {settings.upstream_mode} mode ({settings.steam_fixture_path})"
+            )
+        self.client = client or httpx.AsyncClient(timeout=30.0)
+        self.client.event_hooks["request"].append(self._count_request)
+        self.request_count = 0
+        # App ids Steam answered "not found" for (success: false or 404), as
+        # opposed to None from timeouts, rate limits or server errors
+        self._not_found: Dict[int, None] = {}
+
+        # Local game store is optional - details are still served from Steam without it
+        self.game_store: Optional[GameStore] = None
+        if settings.game_store_path:
+            try:
+                self.game_store = GameStore(settings.game_store_path)
+            except Exception as e:
+                logger.warning(f"Game store not available (this is OK): {e}")
+
+        # Faceted index over every detail record seen, warmed from the store
+        self.facet_index = FacetIndex()
+        if self.game_store:
+            for game in self.game_store.iter_games():
+                self.facet_index.add(game)
+            logger.info(f"Facet index warmed with {len(self.facet_index)} games")
 
         # Log API key status
         if not self.api_key:
@@ -25,26 +83,75 @@ class SteamService:
         else:
             logger.info("✅ Steam API key configured")
 
+    async def _count_request(self, request: httpx.Request) -> None:
+        """Count outgoing Steam requests (globally and for the current context)."""
+        self.request_count += 1
+        counter = steam_request_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+    async def _get(self, endpoint: str, url: str, params: Dict[str, Any]) -> httpx.Response:
+        """GET a Steam URL, recording latency and status for the endpoint."""
+        start = time.perf_counter()
+        status = "error"
+        STEAM_IN_FLIGHT.inc()
+        try:
+            response = await self.client.get(url, params=params)
+            status = str(response.status_code)
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            STEAM_IN_FLIGHT.dec()
+            STEAM_LATENCY.labels(endpoint).observe(elapsed)
+            STEAM_REQUESTS.labels(endpoint, status).inc()
+            trace_steam(endpoint, status, elapsed)
+
     async def close(self):
-        """Close HTTP client."""
+        """Close HTTP client and game store (saving recorded responses)."""
         await self.client.aclose()
+        if self.fixture:
+            if settings.upstream_mode == "record":
+                self.fixture.save()
+            else:
+                logger.info(
+                    f"Replayed Steam fixture: {self.fixture.hits} hits, {self.fixture.misses} misses"
+                )
+        if self.game_store:
+            self.game_store.close()
 
     @cached(prefix="steam_game_details", ttl=86400)  # Cache for 24 hours
     async def get_game_details(self, app_id: int) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a game from Steam Store API.
 
+        Fresh records in the local game store are served from disk; anything
+        fetched from Steam is written through to the store.
+
         Args:
             app_id: Steam application ID
 
         Returns:
             Game details dictionary or None if not found
         """
+        # The store is SQLite: run its calls in a thread, off the event loop
+        if self.game_store:
+            stored = await asyncio.to_thread(
+                self.game_store.get, app_id, max_age=settings.game_store_ttl
+            )
+            CACHE_REQUESTS.labels("game_store", "hit" if stored else "miss").inc()
+            trace_cache("game_store", str(app_id), "hit" if stored else "miss")
+            if stored:
+                logger.debug(f"Game store hit for {app_id}")
+                self.facet_index.add(stored)
+                return stored
+
         try:
             url = f"{self.store_url}/appdetails"
             params = {"appids": app_id, "l": "english"}
 
-            response = await self.client.get(url, params=params)
+            response = await self._get("appdetails", url, params)
+            if response.status_code == 404:
+                self._mark_not_found(app_id)
             response.raise_for_status()
 
             data = response.json()
@@ -52,7 +159,7 @@ class SteamService:
             if str(app_id) in data and data[str(app_id)]["success"]:
                 game_data = data[str(app_id)]["data"]
 
-                return {
+                details = {
                     "app_id": app_id,
                     "name": game_data.get("name"),
                     "type": game_data.get("type"),
@@ -70,6 +177,15 @@ class SteamService:
                     "recommendations": game_data.get("recommendations", {}).get("total", 0),
                 }
 
+                self.facet_index.add(details)
+                if self.game_store:
+                    await asyncio.to_thread(self.game_store.upsert, details)
+
+                self._not_found.pop(app_id, None)
+                return details
+
+            if str(app_id) in data:
+                self._mark_not_found(app_id)
             logger.warning(f"Game {app_id} not found in Steam Store")
             return None
 
@@ -80,8 +196,30 @@ class SteamService:
             logger.error(f"Error getting game details for {app_id}: {e}")
             return None
 
+    def _mark_not_found(self, app_id: int) -> None:
+        """Remember a definite "not found" answer for an app id."""
+        self._not_found.pop(app_id, None)
+        self._not_found[app_id] = None
+        if len(self._not_found) > MAX_NOT_FOUND:
+            del self._not_found[next(iter(self._not_found))]
+
+    def is_not_found(self, app_id: int) -> bool:
+        """
+        Check whether Steam said an app does not exist.
+
+        Args:
+            app_id: Steam application ID
+
+        Returns:
+            True if the last details lookup got success: false or 404 (False
+            for found apps, transient failures and ids never looked up)
+        """
+        return app_id in self._not_found
+
     @cached(prefix="steam_reviews", ttl=3600)  # Cache for 1 hour
-    async def get_game_reviews(self, app_id: int, num_reviews: int = 100) -> Dict[str, Any]:
+    async def get_game_reviews(
+        self, app_id: int, num_reviews: int = REVIEWS_PER_REQUEST
+    ) -> Dict[str, Any]:
         """
         Get user reviews for a game.
 
@@ -101,7 +239,7 @@ class SteamService:
                 "filter": "recent",
             }
 
-            response = await self.client.get(url, params=params)
+            response = await self._get("appreviews", url, params)
             response.raise_for_status()
 
             data = response.json()
@@ -154,7 +292,7 @@ class SteamService:
             url = f"{self.store_url}/storesearch"
             params = {"term": query, "l": "english", "cc": "US"}
 
-            response = await self.client.get(url, params=params)
+            response = await self._get("storesearch", url, params)
             response.raise_for_status()
 
             data = response.json()
@@ -171,13 +309,47 @@ class SteamService:
                     }
                 )
 
-            logger.info(f"Found {len(results)} games for query: {query}")
+            logger.bind(throttle="steam_search").info(
+                f"Found {len(results)} games for query: {query}"
+            )
             return results
 
         except Exception as e:
             logger.error(f"Error searching games with query '{query}': {e}")
             return []
 
+    async def resolve_game_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a game name to its best matching Steam app.
+
+        Exact (case-insensitive) name matches in the local store win; otherwise
+        the Steam store search is used, preferring an exact match over the top hit.
+
+        Args:
+            name: Game name as written by the user
+
+        Returns:
+            Dictionary with app_id and name, or None if nothing matches
+        """
+        wanted = name.strip().lower()
+
+        if self.game_store:
+            stored = await asyncio.to_thread(
+                self.game_store.query, text=name, order_by="relevance", limit=5
+            )
+            for game in stored:
+                if (game.get("name") or "").strip().lower() == wanted:
+                    return {"app_id": game["app_id"], "name": game["name"]}
+
+        results = await self.search_games(name, limit=5)
+        if not results:
+            return None
+
+        for result in results:
+            if (result.get("name") or "").strip().lower() == wanted:
+                return {"app_id": result["app_id"], "name": result["name"]}
+        return {"app_id": results[0]["app_id"], "name": results[0]["name"]}
+
     async def get_player_count(self, app_id: int) -> Optional[int]:
         """
         Get current player count for a game.
@@ -199,7 +371,7 @@ class SteamService:
             if self.api_key:
                 params["key"] = self.api_key
 
-            response = await self.client.get(url, params=params)
+            response = await self._get("player_count", url, params)
             response.raise_for_status()
 
             data = response.json()
@@ -226,14 +398,16 @@ class SteamService:
         Returns:
             Enriched game data dictionary
         """
-        game_details = await self.get_game_details(app_id)
+        # Fetch everything concurrently - reviews and player count are cheap to discard
+        game_details, reviews, player_count = await asyncio.gather(
+            self.get_game_details(app_id),
+            self.get_game_reviews(app_id),
+            self.get_player_count(app_id),
+        )
 
         if not game_details:
             return None
 
-        reviews = await self.get_game_reviews(app_id)
-        player_count = await self.get_player_count(app_id)
-
         # Combine all data
         enriched_data = {
             **game_details,
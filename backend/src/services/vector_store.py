@@ -0,0 +1,665 @@
+"""
+Dependency-light vector store backend for RAGService.
+
+Only NumPy (plus the standard library's sqlite3) is required. Embeddings live
+in a memory-mapped file as float32 or int8-quantised rows; ids, documents and
+metadata live in SQLite. Search is an exact vectorised dot product, or an IVF
+(inverted file) index over k-means centroids for large collections.
+
+NumpyVectorStore mirrors the subset of the ChromaDB collection API that
+RAGService uses, so it is a drop-in replacement for `games_collection`.
+"""
+
+import json
+import math
+import re
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Slots allocated when the vector file is created or grown
+_INITIAL_CAPACITY = 1024
+
+# Collections smaller than this are always searched exactly
+_IVF_MIN_SIZE = 2048
+
+# Rows dequantized at a time when scoring int8 vectors
+_SCORE_CHUNK = 4096
+
+
+class HashingEmbedder:
+    """
+    Lightweight local text embedder using signed feature hashing.
+
+    Word unigrams, word bigrams and character trigrams are hashed into a fixed
+    number of dimensions with sublinear term frequency and L2 normalisation.
+    Deterministic and stateless, so nothing needs to be downloaded or persisted.
+    """
+
+    def __init__(self, dim: int = 384):
+        """
+        Initialize embedder.
+
+        Args:
+            dim: Embedding dimensions
+        """
+        self.dim = dim
+        self.model_id = f"hashing-v1-{dim}"
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dim) with unit-norm rows
+        """
+        result = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[int, float] = {}
+            words = _TOKEN_RE.findall((text or "").lower())
+            features = list(words)
+            features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+            for word in words:
+                padded = f"<{word}>"
+                features.extend(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                index = h % self.dim
+                sign = 1.0 if (h >> 31) & 1 else -1.0
+                weight = 0.5 if feature[0] == "#" else 1.0
+                counts[index] = counts.get(index, 0.0) + sign * weight
+
+            if counts:
+                indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+                values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+                result[row, indices] = np.sign(values) * np.log1p(np.abs(values))
+
+        norms = np.linalg.norm(result, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return result / norms
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """
+    Evaluate a ChromaDB-style metadata filter.
+
+    Supports field equality, $eq, $ne, $gt, $gte, $lt, $lte, $in, $nin,
+    and the logical operators $and and $or.
+
+    Args:
+        metadata: Document metadata
+        where: Filter, e.g. {"$and": [{"type": "review"}, {"timestamp": {"$lt": 1700000000}}]}
+
+    Returns:
+        True if the metadata matches (or there is no filter)
+    """
+    if not where:
+        return True
+
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, operand in condition.items():
+                if not _compare(value, op, operand):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def _compare(value: Any, op: str, operand: Any) -> bool:
+    """Apply one comparison operator."""
+    if op == "$eq":
+        return value == operand
+    if op == "$ne":
+        return value != operand
+    if op == "$in":
+        return value in operand
+    if op == "$nin":
+        return value not in operand
+    if value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > operand
+        if op == "$gte":
+            return value >= operand
+        if op == "$lt":
+            return value < operand
+        if op == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+class NumpyVectorStore:
+    """Persistent vector collection backed by a memory-mapped NumPy array and SQLite."""
+
+    def __init__(
+        self,
+        path: str,
+        name: str = "games_knowledge",
+        embedder: Optional[HashingEmbedder] = None,
+        quantization: str = "float32",
+        index: str = "exact",
+        nprobe: int = 16,
+    ):
+        """
+        Open (or create) a collection.
+
+        Args:
+            path: Directory holding the collection files
+            name: Collection name
+            embedder: Text embedder (defaults to a 384-dim HashingEmbedder)
+            quantization: "float32" or "int8" storage for embeddings
+            index: "exact" or "ivf" search
+            nprobe: IVF lists probed per query
+        """
+        if quantization not in ("float32", "int8"):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+
+        self.name = name
+        self.embedder = embedder or HashingEmbedder()
+        self.dim = self.embedder.dim
+        self.quantized = quantization == "int8"
+        self.index = index
+        self.nprobe = nprobe
+
+        self._dir = Path(path) / name
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+
+        self._db = sqlite3.connect(
+            str(self._dir / "documents.db"), check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                slot INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                document TEXT,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT)")
+        self._check_layout()
+
+        # In-memory view of the slots: ids, metadata and liveness
+        self._slot_of: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._metas: List[Optional[Dict[str, Any]]] = []
+        rows = self._db.execute("SELECT slot, id, metadata FROM documents ORDER BY slot").fetchall()
+        high_water = (rows[-1][0] + 1) if rows else 0
+
+        self._capacity = 0
+        self._open_vectors(max(_INITIAL_CAPACITY, high_water))
+        self._alive = np.zeros(self._capacity, dtype=bool)
+        self._ids = [None] * high_water
+        self._metas = [None] * high_water
+        for slot, doc_id, metadata in rows:
+            self._ids[slot] = doc_id
+            self._metas[slot] = json.loads(metadata)
+            self._slot_of[doc_id] = slot
+            self._alive[slot] = True
+        self._free = [slot for slot in range(high_water) if not self._alive[slot]]
+
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.full(self._capacity, -1, dtype=np.int32)
+        self._ivf_trained_on = 0
+
+        logger.info(
+            f"Numpy vector store '{name}' opened with {len(self._slot_of)} documents "
+            f"({quantization}, {index} search)"
+        )
+
+    # ------------------------------------------------------------------ writes
+
+    def add(
+        self,
+        ids: List[str],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        embeddings: Optional[Sequence[Sequence[float]]] = None,
+    ) -> None:
+        """Insert documents; ids that already exist are ignored (as in ChromaDB)."""
+        with self._lock:
+            keep = [i for i, doc_id in enumerate(ids) if doc_id not in self._slot_of]
+        if not keep:
+            return
+        self.upsert(
+            ids=[ids[i] for i in keep],
+            documents=[documents[i] for i in keep] if documents is not None else None,
+            metadatas=[metadatas[i] for i in keep] if metadatas is not None else None,
+            embeddings=[embeddings[i] for i in keep] if embeddings is not None else None,
+        )
+
+    def upsert(
+        self,
+        ids: List[str],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        embeddings: Optional[Sequence[Sequence[float]]] = None,
+    ) -> None:
+        """
+        Insert or replace documents.
+
+        An id repeated within one call is stored once, with its last entry.
+
+        Args:
+            ids: Document ids
+            documents: Document texts (embedded when embeddings are not given)
+            metadatas: Metadata dictionaries
+            embeddings: Optional precomputed embeddings
+        """
+        if not ids:
+            return
+        if len(set(ids)) != len(ids):
+            # One slot per id: a second slot would outlive its replaced SQLite row
+            keep = sorted({doc_id: i for i, doc_id in enumerate(ids)}.values())
+            ids = [ids[i] for i in keep]
+            documents = [documents[i] for i in keep] if documents is not None else None
+            metadatas = [metadatas[i] for i in keep] if metadatas is not None else None
+            embeddings = [embeddings[i] for i in keep] if embeddings is not None else None
+        if embeddings is None:
+            if documents is None:
+                raise ValueError("Either documents or embeddings are required")
+            vectors = self.embedder(documents)
+        else:
+            vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"Expected embeddings of shape ({len(ids)}, {self.dim})")
+
+        documents = documents if documents is not None else [None] * len(ids)
+        metadatas = metadatas if metadatas is not None else [{} for _ in ids]
+
+        with self._lock:
+            slots = []
+            for doc_id in ids:
+                slot = self._slot_of.get(doc_id)
+                if slot is None:
+                    slot = self._allocate_slot()
+                slots.append(slot)
+
+            slot_array = np.asarray(slots, dtype=np.int64)
+            self._write_vectors(slot_array, vectors)
+
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO documents (slot, id, document, metadata) VALUES (?, ?, ?, ?)",
+                    [
+                        (slot, doc_id, document, json.dumps(meta or {}))
+                        for slot, doc_id, document, meta in zip(slots, ids, documents, metadatas)
+                    ],
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+            for slot, doc_id, meta in zip(slots, ids, metadatas):
+                self._ids[slot] = doc_id
+                self._metas[slot] = dict(meta or {})
+                self._slot_of[doc_id] = slot
+                self._alive[slot] = True
+
+            if self._centroids is not None:
+                self._assign[slot_array] = self._nearest_centroid(vectors)
+
+    def update(
+        self,
+        ids: List[str],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        embeddings: Optional[Sequence[Sequence[float]]] = None,
+    ) -> None:
+        """
+        Update existing documents (unknown ids are ignored).
+
+        Metadata-only updates rewrite metadata without touching vectors.
+
+        Args:
+            ids: Document ids
+            documents: New texts (re-embedded unless embeddings are given)
+            metadatas: New metadata dictionaries (replacing the stored ones)
+            embeddings: New embeddings
+        """
+        with self._lock:
+            known = [i for i, doc_id in enumerate(ids) if doc_id in self._slot_of]
+            if not known:
+                return
+            known_ids = [ids[i] for i in known]
+
+            if documents is not None or embeddings is not None:
+                current = self._result(
+                    [self._slot_of[doc_id] for doc_id in known_ids], ("documents", "metadatas")
+                )
+                if documents is not None:
+                    current["documents"] = [documents[i] for i in known]
+                if metadatas is not None:
+                    current["metadatas"] = [metadatas[i] for i in known]
+                self.upsert(
+                    ids=known_ids,
+                    documents=current["documents"],
+                    metadatas=current["metadatas"],
+                    embeddings=[embeddings[i] for i in known] if embeddings is not None else None,
+                )
+                return
+
+            if metadatas is None:
+                return
+            rows = []
+            for i, doc_id in zip(known, known_ids):
+                slot = self._slot_of[doc_id]
+                self._metas[slot] = dict(metadatas[i] or {})
+                rows.append((json.dumps(self._metas[slot]), slot))
+            self._db.executemany("UPDATE documents SET metadata = ? WHERE slot = ?", rows)
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Delete documents by id and/or metadata filter.
+
+        Args:
+            ids: Document ids to delete
+            where: Metadata filter selecting documents to delete
+        """
+        with self._lock:
+            slots = self._select_slots(ids, where)
+            if not slots:
+                return
+
+            self._db.executemany("DELETE FROM documents WHERE slot = ?", [(slot,) for slot in slots])
+            for slot in slots:
+                del self._slot_of[self._ids[slot]]
+                self._ids[slot] = None
+                self._metas[slot] = None
+                self._alive[slot] = False
+                self._assign[slot] = -1
+                self._free.append(slot)
+
+    def reset(self) -> None:
+        """Delete every document."""
+        with self._lock:
+            self._db.execute("DELETE FROM documents")
+            self._slot_of.clear()
+            self._ids = []
+            self._metas = []
+            self._free = []
+            self._alive[:] = False
+            self._assign[:] = -1
+            self._centroids = None
+            self._ivf_trained_on = 0
+
+    # ------------------------------------------------------------------- reads
+
+    def count(self) -> int:
+        """Get number of stored documents."""
+        return len(self._slot_of)
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Sequence[str] = ("documents", "metadatas"),
+    ) -> Dict[str, Any]:
+        """
+        Get documents by id and/or metadata filter.
+
+        Returns:
+            Dictionary with "ids" and, as requested, "documents", "metadatas", "embeddings"
+        """
+        with self._lock:
+            slots = self._select_slots(ids, where)
+            slots = slots[offset or 0 :]
+            if limit is not None:
+                slots = slots[:limit]
+            return self._result(slots, include)
+
+    def query(
+        self,
+        query_texts: Optional[List[str]] = None,
+        query_embeddings: Optional[Sequence[Sequence[float]]] = None,
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include: Sequence[str] = ("documents", "metadatas", "distances"),
+    ) -> Dict[str, Any]:
+        """
+        Find the nearest documents for each query (cosine distance).
+
+        Returns:
+            ChromaDB-style nested result lists, one inner list per query
+        """
+        if query_embeddings is None:
+            queries = self.embedder(query_texts or [])
+        else:
+            queries = np.asarray(query_embeddings, dtype=np.float32)
+
+        output: Dict[str, Any] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        with self._lock:
+            high_water = len(self._ids)
+            mask = self._alive[:high_water].copy()
+            if where:
+                mask &= np.fromiter(
+                    (meta is not None and matches_where(meta, where) for meta in self._metas),
+                    dtype=bool,
+                    count=high_water,
+                )
+
+            for query in queries:
+                candidates = self._candidates(query, mask)
+                if candidates.size == 0:
+                    scores = np.zeros(0, dtype=np.float32)
+                elif candidates.size * 2 > high_water:
+                    # Mostly-full scans are cheaper over the contiguous prefix
+                    # than gathering candidate rows
+                    scores = self._scores(slice(0, high_water), query)[candidates]
+                else:
+                    scores = self._scores(candidates, query)
+
+                k = min(n_results, candidates.size)
+                if k:
+                    top = np.argpartition(-scores, k - 1)[:k]
+                    top = top[np.argsort(-scores[top])]
+                else:
+                    top = np.zeros(0, dtype=np.int64)
+
+                result = self._result(candidates[top].tolist(), include)
+                output["ids"].append(result["ids"])
+                output["documents"].append(result.get("documents"))
+                output["metadatas"].append(result.get("metadatas"))
+                output["distances"].append((1.0 - scores[top]).tolist())
+
+        return output
+
+    # ---------------------------------------------------------------- indexing
+
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 10) -> None:
+        """
+        Train k-means centroids and assign every vector to its nearest list.
+
+        Args:
+            nlist: Number of lists (defaults to sqrt of the collection size)
+            iterations: k-means iterations
+        """
+        with self._lock:
+            slots = np.flatnonzero(self._alive[: len(self._ids)])
+            if slots.size < _IVF_MIN_SIZE:
+                self._centroids = None
+                return
+
+            nlist = nlist or max(8, int(math.sqrt(slots.size)))
+            rng = np.random.default_rng(0)
+            sample = slots if slots.size <= 50 * nlist else rng.choice(slots, 50 * nlist, replace=False)
+            data = self._dequantize(np.sort(sample))
+            centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+
+            for _ in range(iterations):
+                labels = np.argmax(data @ centroids.T, axis=1)
+                for c in range(nlist):
+                    members = data[labels == c]
+                    if len(members):
+                        centroid = members.mean(axis=0)
+                        centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+            self._centroids = centroids.astype(np.float32)
+            self._assign[:] = -1
+            for start in range(0, slots.size, 8192):
+                chunk = slots[start : start + 8192]
+                self._assign[chunk] = self._nearest_centroid(self._dequantize(chunk))
+            self._ivf_trained_on = slots.size
+            logger.info(f"Trained IVF index with {nlist} lists on {slots.size} vectors")
+
+    # ---------------------------------------------------------------- internal
+
+    def _check_layout(self) -> None:
+        """Refuse to open files written with a different dimension or quantization."""
+        layout = json.dumps({"dim": self.dim, "int8": self.quantized, "model": self.embedder.model_id})
+        row = self._db.execute("SELECT value FROM info WHERE key = 'layout'").fetchone()
+        if row is None:
+            self._db.execute("INSERT INTO info (key, value) VALUES ('layout', ?)", (layout,))
+        elif row[0] != layout:
+            raise ValueError(f"Vector store at {self._dir} was created with layout {row[0]}")
+
+    def _open_vectors(self, capacity: int) -> None:
+        """Map (and grow if needed) the vector and scale files."""
+        dtype = np.int8 if self.quantized else np.float32
+        for file_name, row_bytes in (
+            ("vectors.bin", self.dim * np.dtype(dtype).itemsize),
+            ("scales.bin", 4),
+        ):
+            file_path = self._dir / file_name
+            with open(file_path, "ab") as f:
+                if f.tell() < capacity * row_bytes:
+                    f.truncate(capacity * row_bytes)
+
+        self._vectors = np.memmap(self._dir / "vectors.bin", dtype=dtype, mode="r+", shape=(capacity, self.dim))
+        self._scales = np.memmap(self._dir / "scales.bin", dtype=np.float32, mode="r+", shape=(capacity,))
+
+        if capacity > self._capacity and self._capacity:
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - self._capacity, dtype=bool)])
+            self._assign = np.concatenate(
+                [self._assign, np.full(capacity - self._capacity, -1, dtype=np.int32)]
+            )
+        self._capacity = capacity
+
+    def _allocate_slot(self) -> int:
+        """Get a free slot, growing the files when full."""
+        if self._free:
+            return self._free.pop()
+        slot = len(self._ids)
+        if slot >= self._capacity:
+            self._vectors.flush()
+            self._scales.flush()
+            self._open_vectors(self._capacity * 2)
+        self._ids.append(None)
+        self._metas.append(None)
+        return slot
+
+    def _write_vectors(self, slots: np.ndarray, vectors: np.ndarray) -> None:
+        """Store (quantizing if configured) vectors in the given slots."""
+        if self.quantized:
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._vectors[slots] = np.round(vectors / scales[:, None]).astype(np.int8)
+            self._scales[slots] = scales
+        else:
+            self._vectors[slots] = vectors
+            self._scales[slots] = 1.0
+        self._vectors.flush()
+        self._scales.flush()
+
+    def _dequantize(self, slots: np.ndarray) -> np.ndarray:
+        """Get float32 vectors for slots."""
+        vectors = np.asarray(self._vectors[slots], dtype=np.float32)
+        if self.quantized:
+            vectors *= np.asarray(self._scales[slots])[:, None]
+        return vectors
+
+    def _scores(self, slots, query: np.ndarray) -> np.ndarray:
+        """Dot-product scores of query against slots (an index array or slice)."""
+        if not self.quantized:
+            return self._vectors[slots] @ query
+        rows = self._vectors[slots]
+        scores = np.empty(len(rows), dtype=np.float32)
+        # Dequantize in cache-sized chunks instead of materializing a float32 copy
+        for start in range(0, len(rows), _SCORE_CHUNK):
+            chunk = rows[start : start + _SCORE_CHUNK]
+            scores[start : start + len(chunk)] = chunk.astype(np.float32) @ query
+        return scores * self._scales[slots]
+
+    def _candidates(self, query: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Get candidate slots: all matching slots, or those in the probed IVF lists."""
+        if self.index == "ivf":
+            alive = int(self._alive.sum())
+            if alive >= _IVF_MIN_SIZE and (
+                self._centroids is None or alive > 2 * self._ivf_trained_on
+            ):
+                self.build_ivf()
+            if self._centroids is not None:
+                probe = np.argsort(-(self._centroids @ query))[: self.nprobe]
+                mask = mask & np.isin(self._assign[: mask.size], probe)
+        return np.flatnonzero(mask)
+
+    def _nearest_centroid(self, vectors: np.ndarray) -> np.ndarray:
+        """Assign vectors to their nearest IVF centroid."""
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _select_slots(self, ids: Optional[List[str]], where: Optional[Dict[str, Any]]) -> List[int]:
+        """Resolve ids and/or a filter to slots, in slot order."""
+        if ids is not None:
+            slots = sorted(self._slot_of[doc_id] for doc_id in ids if doc_id in self._slot_of)
+        else:
+            slots = [slot for slot, doc_id in enumerate(self._ids) if doc_id is not None]
+        if where:
+            slots = [slot for slot in slots if matches_where(self._metas[slot], where)]
+        return slots
+
+    def _result(self, slots: List[int], include: Sequence[str]) -> Dict[str, Any]:
+        """Build a ChromaDB-style flat result for slots."""
+        result: Dict[str, Any] = {"ids": [self._ids[slot] for slot in slots]}
+        if "metadatas" in include:
+            result["metadatas"] = [dict(self._metas[slot]) for slot in slots]
+        if "documents" in include:
+            documents = {}
+            for start in range(0, len(slots), 500):
+                chunk = slots[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                documents.update(
+                    self._db.execute(
+                        f"SELECT slot, document FROM documents WHERE slot IN ({placeholders})", chunk
+                    ).fetchall()
+                )
+            result["documents"] = [documents.get(slot) for slot in slots]
+        if "embeddings" in include:
+            result["embeddings"] = (
+                self._dequantize(np.asarray(slots, dtype=np.int64))
+                if slots
+                else np.zeros((0, self.dim), dtype=np.float32)
+            )
+        return result
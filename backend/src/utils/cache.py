@@ -1,9 +1,14 @@
+import inspect
 import json
+import time
+from collections import OrderedDict
 from typing import Optional, Any
 from functools import wraps
 import hashlib
 from src.config import settings
 from src.utils.logger import get_logger
+from src.utils.metrics import CACHE_EVICTIONS, CACHE_REQUESTS
+from src.utils.tracing import trace_cache
 
 logger = get_logger()
 
@@ -15,11 +20,13 @@ except ImportError:
 
 
 class CacheManager:
-    """Cache manager with Redis backend (falls back to in-memory dict)."""
+    """Cache manager with Redis backend (falls back to a bounded in-memory LRU)."""
 
     def __init__(self):
         self.redis_client = None
-        self.memory_cache = {}
+        # key -> (expires_at, value), least recently used first
+        self.memory_cache: OrderedDict = OrderedDict()
+        self.max_memory_entries = settings.memory_cache_max_entries
 
         if REDIS_AVAILABLE and settings.redis_url:
             try:
@@ -42,13 +49,33 @@ class CacheManager:
         try:
             if self.redis_client:
                 value = self.redis_client.get(key)
+                CACHE_REQUESTS.labels("response", "hit" if value else "miss").inc()
                 return json.loads(value) if value else None
             else:
-                return self.memory_cache.get(key)
+                entry = self.memory_cache.get(key)
+                if entry is None or entry[0] < time.monotonic():
+                    if entry is not None:
+                        self.memory_cache.pop(key, None)
+                    CACHE_REQUESTS.labels("response", "miss").inc()
+                    return None
+                self.memory_cache.move_to_end(key)
+                CACHE_REQUESTS.labels("response", "hit").inc()
+                return entry[1]
         except Exception as e:
             logger.error(f"Cache get error: {e}")
             return None
 
+    def contains(self, key: str) -> bool:
+        """Check whether a key is cached without touching its recency."""
+        try:
+            if self.redis_client:
+                return bool(self.redis_client.exists(key))
+            entry = self.memory_cache.get(key)
+            return entry is not None and entry[0] >= time.monotonic()
+        except Exception as e:
+            logger.error(f"Cache contains error: {e}")
+            return False
+
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in cache with optional TTL."""
         try:
@@ -56,7 +83,11 @@ class CacheManager:
             if self.redis_client:
                 self.redis_client.setex(key, ttl, json.dumps(value))
             else:
-                self.memory_cache[key] = value
+                self.memory_cache[key] = (time.monotonic() + ttl, value)
+                self.memory_cache.move_to_end(key)
+                while len(self.memory_cache) > self.max_memory_entries:
+                    self.memory_cache.popitem(last=False)
+                    CACHE_EVICTIONS.labels("response").inc()
             return True
         except Exception as e:
             logger.error(f"Cache set error: {e}")
@@ -92,13 +123,29 @@ cache_manager = CacheManager()
 
 
 def cached(prefix: str = "default", ttl: Optional[int] = None):
-    """Decorator to cache function results."""
+    """
+    Decorator to cache function results.
+
+    Keys are built from the bound call arguments with defaults applied, so
+    f(1), f(1, n=20) and f(app_id=1) share an entry when n defaults to 20.
+    A leading ``self`` argument is ignored, so all instances share the cache.
+    """
 
     def decorator(func):
+        signature = inspect.signature(func)
+
+        def make_key(args, kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop("self", None)
+            return cache_manager._generate_key(prefix, **arguments)
+
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
-            cache_key = cache_manager._generate_key(prefix, *args, **kwargs)
+            cache_key = make_key(args, kwargs)
             cached_result = cache_manager.get(cache_key)
+            trace_cache("response", prefix, "miss" if cached_result is None else "hit")
 
             if cached_result is not None:
                 logger.debug(f"Cache hit for {func.__name__}")
@@ -110,8 +157,9 @@ def cached(prefix: str = "default", ttl: Optional[int] = None):
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            cache_key = cache_manager._generate_key(prefix, *args, **kwargs)
+            cache_key = make_key(args, kwargs)
             cached_result = cache_manager.get(cache_key)
+            trace_cache("response", prefix, "miss" if cached_result is None else "hit")
 
             if cached_result is not None:
                 logger.debug(f"Cache hit for {func.__name__}")
@@ -121,6 +169,8 @@ def cached(prefix: str = "default", ttl: Optional[int] = None):
             cache_manager.set(cache_key, result, ttl)
             return result
 
-        return async_wrapper if hasattr(func, "__await__") else sync_wrapper
+        wrapper = async_wrapper if inspect.iscoroutinefunction(func) else sync_wrapper
+        wrapper.cache_key = make_key
+        return wrapper
 
     return decorator
@@ -0,0 +1,79 @@
+"""
+Injected latency for replayed upstream responses.
+
+A latency spec is a short string:
+
+    none                   no delay
+    recorded               the latency stored with the response (0 if missing)
+    fixed:MS               constant delay
+    uniform:LO,HI          uniform between LO and HI milliseconds
+    normal:MEAN,STD        normal distribution, clipped at 0
+    lognormal:MEDIAN,SIGMA log-normal with the given median (ms) and shape
+"""
+
+import math
+import random
+from typing import Optional
+
+_DISTRIBUTIONS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+
+
+class LatencyModel:
+    """Draws delays from a latency spec."""
+
+    def __init__(self, spec: str = "none", seed: Optional[int] = None):
+        """
+        Parse a latency spec.
+
+        Args:
+            spec: Latency spec (see module docstring)
+            seed: Random seed for reproducible delays
+
+        Raises:
+            ValueError: If the spec is not valid
+        """
+        self.spec = spec.strip().lower()
+        self.kind, _, raw_params = self.spec.partition(":")
+        self._random = random.Random(seed)
+
+        if self.kind in ("none", "recorded"):
+            self.params = []
+        elif self.kind in _DISTRIBUTIONS:
+            try:
+                self.params = [float(p) for p in raw_params.split(",")]
+            except ValueError:
+                raise ValueError(f"Invalid latency parameters: {spec!r}")
+            if len(self.params) != _DISTRIBUTIONS[self.kind]:
+                raise ValueError(
+                    f"Latency '{self.kind}' takes {_DISTRIBUTIONS[self.kind]} parameter(s): {spec!r}"
+                )
+        else:
+            raise ValueError(f"Unknown latency spec: {spec!r}")
+
+    def delay(self, recorded_ms: Optional[float] = None) -> float:
+        """
+        Draw one delay.
+
+        Args:
+            recorded_ms: Latency recorded with the response, used by "recorded"
+
+        Returns:
+            Delay in seconds
+        """
+        if self.kind == "none":
+            return 0.0
+        if self.kind == "recorded":
+            ms = recorded_ms or 0.0
+        elif self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = self._random.uniform(*self.params)
+        elif self.kind == "normal":
+            ms = self._random.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            ms = self._random.lognormvariate(math.log(median), sigma)
+        return max(0.0, ms) / 1000
+
+    def __repr__(self) -> str:
+        return f"LatencyModel({self.spec!r})"
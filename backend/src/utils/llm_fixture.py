@@ -0,0 +1,208 @@
+"""
+Recorded Claude responses, for running the chatbot offline.
+
+Responses are stored as chat sessions: each turn is a user message and the
+steps the model took to answer it (tool calls, then the final answer), with
+token usage and latency. A response is looked up by the user messages of the
+conversation so far and the step within the current turn, so replay does not
+depend on the system prompt, retrieved knowledge or tool results.
+
+ReplayChatModel serves recorded steps in place of the tool-bound ChatAnthropic
+model; RecordingChatModel wraps the real model and stores its responses.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.utils.latency import LatencyModel
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# Final answer served when a conversation was not recorded
+MISSING_RESPONSE = "(No hay respuesta grabada para esta conversación.)"
+
+
+def _text(content: Any) -> str:
+    """Plain text of a message content (string or list of content blocks)."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content or []
+        if not isinstance(block, dict) or block.get("type") == "text"
+    )
+
+
+def conversation_key(user_messages: List[str]) -> str:
+    """Key of a conversation from its user messages."""
+    joined = "\x1e".join(message.strip() for message in user_messages)
+    return hashlib.blake2b(joined.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _position(messages: List[Any]) -> Tuple[List[str], int]:
+    """User messages so far and the number of model steps since the last one."""
+    user_messages: List[str] = []
+    step = 0
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            user_messages.append(_text(message.content))
+            step = 0
+        elif isinstance(message, AIMessage):
+            step += 1
+    return user_messages, step
+
+
+class LLMFixture:
+    """Recorded chat sessions backed by a JSON file."""
+
+    def __init__(self, path: str):
+        """
+        Load a sessions file (missing files start empty).
+
+        Args:
+            path: Sessions JSON path
+        """
+        self.path = path
+        self.description = ""
+        self.sessions: List[Dict[str, Any]] = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.description = data.get("description", "")
+            self.sessions = data.get("sessions", [])
+        self._turns: Dict[str, Dict[str, Any]] = {}
+        for session in self.sessions:
+            self._index(session)
+        self.hits = 0
+        self.misses = 0
+
+    def _index(self, session: Dict[str, Any]) -> None:
+        users = [turn["user"] for turn in session["turns"]]
+        for i, turn in enumerate(session["turns"]):
+            self._turns.setdefault(conversation_key(users[: i + 1]), turn)
+
+    def lookup(self, messages: List[Any]) -> Optional[Dict[str, Any]]:
+        """Get the recorded step answering a message list, if any."""
+        user_messages, step = _position(messages)
+        turn = self._turns.get(conversation_key(user_messages))
+        if turn is None or step >= len(turn["steps"]):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return turn["steps"][step]
+
+    def record(self, messages: List[Any], response: AIMessage, seconds: float) -> None:
+        """Store a live response as the next step of its conversation's turn."""
+        user_messages, step = _position(messages)
+        turn = self._turns.get(conversation_key(user_messages))
+        if turn is None:
+            session = {
+                "name": user_messages[0][:60] if user_messages else "",
+                "turns": [{"user": message, "steps": []} for message in user_messages],
+            }
+            self.sessions.append(session)
+            self._index(session)
+            turn = session["turns"][-1]
+
+        usage = getattr(response, "usage_metadata", None) or {}
+        entry: Dict[str, Any] = {"content": _text(response.content)}
+        if response.tool_calls:
+            entry["tool_calls"] = [
+                {"name": call["name"], "args": call["args"]} for call in response.tool_calls
+            ]
+        entry["usage"] = {
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0),
+        }
+        entry["ms"] = round(seconds * 1000, 1)
+        # Later steps belonged to a different continuation of the conversation
+        turn["steps"][step:] = [entry]
+
+    def save(self) -> None:
+        """Write the sessions file."""
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": 1, "description": self.description, "sessions": self.sessions},
+                f,
+                ensure_ascii=False,
+                indent=1,
+            )
+        os.replace(tmp_path, self.path)
+        logger.info(f"Saved {len(self.sessions)} recorded chat sessions to {self.path}")
+
+
+class ReplayChatModel:
+    """Stand-in for the tool-bound ChatAnthropic model serving recorded responses."""
+
+    def __init__(self, fixture: LLMFixture, latency: Optional[LatencyModel] = None):
+        """
+        Initialize replay model.
+
+        Args:
+            fixture: Recorded sessions
+            latency: Delay per response ("recorded" replays the recorded latency)
+        """
+        self.fixture = fixture
+        self.latency = latency or LatencyModel("none")
+
+    async def ainvoke(self, messages: List[Any], **kwargs) -> AIMessage:
+        """Return the recorded response for the conversation (a placeholder if unknown)."""
+        entry = self.fixture.lookup(messages)
+        if entry is None:
+            logger.bind(throttle="llm_replay_miss").warning(
+                "No recorded LLM response for this conversation, answering with a placeholder"
+            )
+            entry = {"content": MISSING_RESPONSE, "usage": {}}
+
+        delay = self.latency.delay(entry.get("ms"))
+        if delay:
+            await asyncio.sleep(delay)
+
+        _, step = _position(messages)
+        usage = entry.get("usage") or {}
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        return AIMessage(
+            content=entry.get("content", ""),
+            tool_calls=[
+                {"name": call["name"], "args": call["args"], "id": f"toolu_replay_{step}_{i}"}
+                for i, call in enumerate(entry.get("tool_calls", []))
+            ],
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+
+class RecordingChatModel:
+    """Wraps the real model and records every response in a fixture."""
+
+    def __init__(self, llm: Any, fixture: LLMFixture):
+        """
+        Initialize recording wrapper.
+
+        Args:
+            llm: Tool-bound chat model
+            fixture: Sessions file the responses are added to
+        """
+        self.llm = llm
+        self.fixture = fixture
+
+    async def ainvoke(self, messages: List[Any], **kwargs) -> AIMessage:
+        """Call the real model and record its response."""
+        start = time.perf_counter()
+        response = await self.llm.ainvoke(messages, **kwargs)
+        self.fixture.record(messages, response, time.perf_counter() - start)
+        return response
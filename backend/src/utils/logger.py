@@ -1,31 +1,184 @@
+"""
+Application logging (loguru), configured once per process.
+
+Sinks are enqueued: callers only format the record and put it on a queue,
+and a background thread writes it, so logging never blocks the event loop on
+stderr or disk. Output is colorized text in development and one JSON
+object per line in production (LOG_FORMAT). Fields bound with
+``logger.bind(...)`` are kept as structured data.
+
+Per-module levels come from LOG_LEVELS, e.g.
+"src.services.steam_service=DEBUG,src.utils.cache=WARNING".
+
+High-frequency messages can be throttled per key: at most one record per
+LOG_THROTTLE_INTERVAL seconds is written, with the number suppressed since:
+    logger.bind(throttle="rag_search").info("...")
+"""
+
+import json
 import sys
+import threading
+import time
+import traceback
+from typing import Dict, Any
+
 from loguru import logger
 from src.config import settings
 
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
+# Extra keys used for log control, not written as fields
+_CONTROL_KEYS = {"throttle"}
+
+_configured = False
+_setup_lock = threading.Lock()
+
+
+def _parse_levels(spec: str) -> Dict[str, int]:
+    """Parse "module=LEVEL,..." into level numbers, with "" as the default."""
+    levels = {"": logger.level(settings.log_level.upper()).no}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        module, _, level = item.partition("=")
+        levels[module.strip()] = logger.level(level.strip().upper()).no
+    return levels
+
+
+class _LogFilter:
+    """Per-module levels and per-key throttling (runs in the caller, before enqueueing)."""
+
+    def __init__(self, levels: Dict[str, int], throttle_interval: float):
+        self.levels = levels
+        self.throttle_interval = throttle_interval
+        self._resolved: Dict[str, int] = {}
+        self._last: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def level_for(self, name: str) -> int:
+        """Most specific configured level for a module (cached)."""
+        level = self._resolved.get(name)
+        if level is None:
+            module = name
+            while module not in self.levels:
+                module = module.rpartition(".")[0]
+            level = self._resolved[name] = self.levels[module]
+        return level
+
+    def __call__(self, record) -> bool:
+        if record["level"].no < self.level_for(record["name"] or ""):
+            return False
+
+        key = record["extra"].get("throttle")
+        if key is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last.get(key, -self.throttle_interval) < self.throttle_interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            record["extra"]["suppressed"] = suppressed
+        return True
+
 
-def setup_logger():
-    """Configure application logger."""
-    logger.remove()
-    logger.add(
-        sys.stderr,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        level=settings.log_level,
-        colorize=True,
-    )
+def _fields(record) -> Dict[str, Any]:
+    """Bound fields, without control keys and rendered output of other sinks."""
+    return {
+        k: v for k, v in record["extra"].items() if k not in _CONTROL_KEYS and k[0] != "_"
+    }
 
-    # Add file logging in production
-    if settings.env == "production":
+
+def _text_format(record) -> str:
+    """Text format with bound fields appended as JSON."""
+    fields = _fields(record)
+    if fields:
+        record["extra"]["_fields"] = json.dumps(fields, default=str, ensure_ascii=False)
+        return TEXT_FORMAT + " | {extra[_fields]}\n{exception}"
+    return TEXT_FORMAT + "\n{exception}"
+
+
+def _json_format(record) -> str:
+    """One JSON object per line (time, level, logger, location, message, fields)."""
+    payload = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+        **_fields(record),
+    }
+    if record["exception"] is not None:
+        exc_type, exc_value, exc_tb = record["exception"]
+        payload["exception"] = f"{getattr(exc_type, '__name__', exc_type)}: {exc_value}"
+        payload["traceback"] = "".join(traceback.format_exception(exc_type, exc_value, exc_tb))
+    record["extra"]["_json"] = json.dumps(payload, default=str, ensure_ascii=False)
+    return "{extra[_json]}\n"
+
+
+def _use_json() -> bool:
+    fmt = settings.log_format.lower()
+    return fmt == "json" or (fmt == "auto" and settings.env == "production")
+
+
+def setup_logger(force: bool = False):
+    """
+    Configure the application logger once per process.
+
+    Args:
+        force: Reconfigure even if already configured (e.g. after changing settings)
+
+    Returns:
+        The loguru logger
+    """
+    global _configured
+    with _setup_lock:
+        if _configured and not force:
+            return logger
+
+        levels = _parse_levels(settings.log_levels)
+        as_json = _use_json()
+        min_level = min(levels.values())
+
+        logger.remove()
         logger.add(
-            "logs/app_{time:YYYY-MM-DD}.log",
-            rotation="1 day",
-            retention="30 days",
-            level="INFO",
-            format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+            sys.stderr,
+            format=_json_format if as_json else _text_format,
+            level=min_level,
+            filter=_LogFilter(levels, settings.log_throttle_interval),
+            colorize=not as_json,
+            enqueue=True,
         )
 
-    return logger
+        # Add file logging in production
+        if settings.env == "production":
+            logger.add(
+                "logs/app_{time:YYYY-MM-DD}.log",
+                rotation="1 day",
+                retention="30 days",
+                level=min_level,
+                filter=_LogFilter(levels, settings.log_throttle_interval),
+                format=_json_format if as_json else _text_format,
+                colorize=False,
+                enqueue=True,
+            )
+
+        _configured = True
+        return logger
 
 
 def get_logger():
     """Get configured logger instance."""
-    return setup_logger()
+    if not _configured:
+        setup_logger()
+    return logger
+
+
+async def flush_logs() -> None:
+    """Wait until enqueued log records are written (call at shutdown)."""
+    await logger.complete()
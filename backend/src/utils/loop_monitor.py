@@ -0,0 +1,180 @@
+"""
+Event loop lag monitor and blocking-call detector.
+
+A heartbeat coroutine sleeps for a fixed interval and measures how late it
+wakes up (event loop lag). A watchdog thread checks the heartbeat: when the
+loop has not come back for longer than the blocking threshold, it captures
+the event loop thread's stack while the blocking call is still running, so
+the offending code location (sync Redis, ChromaDB, a large json.dumps...)
+is known, not guessed.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from src.utils.logger import get_logger
+from src.utils.metrics import LOOP_BLOCKS, LOOP_LAG
+
+logger = get_logger()
+
+# Application code lives under backend/src; frames there identify the culprit
+_APP_ROOT = str(Path(__file__).resolve().parents[1])
+
+# Pass-through wrappers that are never the culprit themselves
+_WRAPPERS = ("loop_monitor.py", "api/metrics.py", "api/profiling.py")
+
+
+def _location(frame: traceback.FrameSummary) -> str:
+    """Format a frame as path:line in function, relative to the app root when possible."""
+    filename = frame.filename
+    if filename.startswith(_APP_ROOT):
+        filename = "src" + filename[len(_APP_ROOT):]
+    return f"{filename}:{frame.lineno} in {frame.name}"
+
+
+class LoopMonitor:
+    """Measures event loop lag and captures stacks of blocking callbacks."""
+
+    def __init__(
+        self, interval: float = 0.1, block_threshold: float = 0.1, window: int = 3000
+    ):
+        """
+        Initialize monitor.
+
+        Args:
+            interval: Seconds between heartbeats
+            block_threshold: Loop stall (seconds) that triggers a stack capture
+            window: Recent lag samples kept for percentiles
+        """
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self._lags: deque = deque(maxlen=window)
+        self._blocks: deque = deque(maxlen=50)
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread: Optional[int] = None
+        self._expected = 0.0  # When the next heartbeat is due
+        self._open_block: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        """Start the heartbeat on the running loop and the watchdog thread."""
+        if self._task and not self._task.done() and not self._stop.is_set():
+            return
+        self._loop_thread = threading.get_ident()
+        self._expected = time.perf_counter() + self.interval
+        # Each watchdog gets its own stop event, so a restart never revives an old one
+        self._stop = threading.Event()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._watch, args=(self._stop,), name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+        logger.info(
+            f"Event loop monitor started (interval {self.interval * 1000:.0f} ms, "
+            f"blocking threshold {self.block_threshold * 1000:.0f} ms)"
+        )
+
+    def stop(self) -> None:
+        """Stop the heartbeat and the watchdog (waits for the watchdog to exit)."""
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+        if self._watchdog and self._watchdog is not threading.current_thread():
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        """Sleep for the interval and record how late the loop woke up."""
+        while True:
+            self._expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - self._expected)
+            self._lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag)
+
+            with self._lock:
+                block, self._open_block = self._open_block, None
+            if block is not None:
+                block["duration_ms"] = round(lag * 1000, 1)
+                logger.warning(
+                    f"Event loop blocked for {block['duration_ms']:.0f} ms at {block['location']}"
+                )
+
+    def _watch(self, stop: threading.Event) -> None:
+        """Capture the loop thread's stack once per stall longer than the threshold."""
+        check_every = min(self.block_threshold / 2, 0.05)
+        while not stop.wait(check_every):
+            stalled = time.perf_counter() - self._expected
+            if stalled < self.block_threshold:
+                continue
+            with self._lock:
+                if self._open_block is not None:
+                    continue  # Already captured this stall
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is None:
+                    continue
+                stack = traceback.extract_stack(frame)
+                block = {
+                    "at": time.time(),
+                    "duration_ms": None,  # Filled in when the loop comes back
+                    "location": self._culprit(stack),
+                    "stack": [_location(f) for f in stack[-15:]],
+                }
+                self._open_block = block
+                self._blocks.append(block)
+            LOOP_BLOCKS.labels(block["location"]).inc()
+
+    @staticmethod
+    def _culprit(stack: List[traceback.FrameSummary]) -> str:
+        """Innermost application frame (falls back to the innermost frame)."""
+        for frame in reversed(stack):
+            if frame.filename.startswith(_APP_ROOT) and not frame.filename.endswith(_WRAPPERS):
+                return _location(frame)
+        return _location(stack[-1]) if stack else "unknown"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get lag percentiles and recent blocking events.
+
+        Returns:
+            Dictionary with lag p50/p95/p99/max in milliseconds, the number of
+            samples, and the last blocking events (location and stack)
+        """
+        lags = np.array(self._lags) * 1000 if self._lags else np.zeros(1)
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "interval_ms": self.interval * 1000,
+            "block_threshold_ms": self.block_threshold * 1000,
+            "samples": len(self._lags),
+            "lag_p50_ms": round(float(np.percentile(lags, 50)), 2),
+            "lag_p95_ms": round(float(np.percentile(lags, 95)), 2),
+            "lag_p99_ms": round(float(np.percentile(lags, 99)), 2),
+            "lag_max_ms": round(self.max_lag * 1000, 2),
+            "blocks": list(self._blocks)[::-1],
+        }
+
+
+# Global monitor instance (started from the application lifespan)
+loop_monitor: Optional[LoopMonitor] = None
+
+
+def start_loop_monitor(interval: float, block_threshold: float) -> LoopMonitor:
+    """Create and start the global monitor on the running loop."""
+    global loop_monitor
+    if loop_monitor is None:
+        loop_monitor = LoopMonitor(interval, block_threshold)
+    loop_monitor.start()
+    return loop_monitor
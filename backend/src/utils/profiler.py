@@ -0,0 +1,292 @@
+"""
+Sampling profiler for the coroutine tree of a single request.
+
+While a request is profiled, a background thread samples every few
+milliseconds:
+
+- the event loop thread's Python stack, when one of the request's tasks is
+  running (CPU time: JSON encoding, parsing, ranking...);
+- the await chain of each of the request's suspended tasks (wall time spent
+  waiting on Claude, Steam or the RAG executor).
+
+The request's tasks are the task it runs in plus every task created below
+it; they are tracked with a task factory that is only installed while a
+profile is active, so nothing runs when profiling is off. Results are
+written in the speedscope format (https://www.speedscope.app), one profile
+per task.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+_profile_id: ContextVar[Optional[str]] = ContextVar("profile_id", default=None)
+
+# Active profiles by id, shared with the sampler thread
+_active: Dict[str, "RequestProfile"] = {}
+_active_lock = threading.Lock()
+_sampler: Optional[threading.Thread] = None
+_previous_factory: Dict[asyncio.AbstractEventLoop, Any] = {}
+
+
+def _frame_key(frame) -> Tuple[str, str, int]:
+    code = frame.f_code
+    return (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+
+
+def _await_chain(coro) -> Tuple[List[Any], str]:
+    """Frames of a suspended coroutine chain (outermost first) and what it waits on."""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    if isinstance(coro, asyncio.Task):
+        waiting = f"(waiting: task {coro.get_name()})"
+    elif type(coro).__name__ == "FutureIter":
+        waiting = "(waiting: future)"  # I/O, sleep, gather or executor result
+    elif coro is not None:
+        waiting = f"(waiting: {type(coro).__name__})"
+    else:
+        waiting = "(scheduled)"  # Ready to run, waiting for the event loop
+    return frames, waiting
+
+
+class RequestProfile:
+    """Samples collected for one request."""
+
+    def __init__(self, profile_id: str, name: str, loop, thread_id: int, root_task):
+        self.id = profile_id
+        self.name = name
+        self.loop = loop
+        self.thread_id = thread_id
+        self.started = time.perf_counter()
+        self.ended: Optional[float] = None
+        self.last_sample = self.started
+        self.lock = threading.Lock()
+        self.tasks: List[asyncio.Task] = [root_task]
+        self.frames: Dict[Tuple[str, str, int], int] = {}
+        self.samples: Dict[str, List[Tuple[List[int], float]]] = {}
+        self._token = None
+
+    def _index(self, key: Tuple[str, str, int]) -> int:
+        index = self.frames.get(key)
+        if index is None:
+            index = self.frames[key] = len(self.frames)
+        return index
+
+    def sample(self, now: float) -> None:
+        """Record one sample of every live task (called from the sampler thread)."""
+        with self.lock:
+            if self.ended is not None:
+                return
+            weight = (now - self.last_sample) * 1000
+            self.last_sample = now
+            running = asyncio.current_task(self.loop)
+            for task in [task for task in self.tasks if not task.done()]:
+                self._sample_task(task, task is running, weight)
+
+    def _sample_task(self, task: asyncio.Task, running: bool, weight: float) -> None:
+        """Record the stack of one task (caller holds the lock)."""
+        try:
+            root = task.get_coro()
+            if running:
+                frame = sys._current_frames().get(self.thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(frame)
+                    frame = frame.f_back
+                stack.reverse()
+                # Drop event loop frames below the task's own coroutine
+                root_code = getattr(root, "cr_code", None)
+                start = next(
+                    (i for i, f in enumerate(stack) if f.f_code is root_code), 0
+                )
+                keys = [_frame_key(f) for f in stack[start:]]
+            else:
+                frames, waiting = _await_chain(root)
+                keys = [_frame_key(f) for f in frames] + [(waiting, "", 0)]
+        except Exception:
+            return  # The task moved on while being inspected
+        if keys:
+            stack_ids = [self._index(key) for key in keys]
+            self.samples.setdefault(task.get_name(), []).append((stack_ids, weight))
+
+    def to_speedscope(self) -> Dict[str, Any]:
+        """Export samples in the speedscope file format (one profile per task)."""
+        with self.lock:
+            return self._export()
+
+    def _export(self) -> Dict[str, Any]:
+        end_ms = ((self.ended or time.perf_counter()) - self.started) * 1000
+        frames = [None] * len(self.frames)
+        for (name, file, line), index in self.frames.items():
+            frames[index] = {"name": name, "file": file, "line": line} if file else {"name": name}
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "videogames-chatbot profiler",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": task_name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(end_ms, 3),
+                    "samples": [stack for stack, _ in samples],
+                    "weights": [round(weight, 3) for _, weight in samples],
+                }
+                for task_name, samples in self.samples.items()
+            ],
+        }
+
+
+def _task_factory(loop, coro, **kwargs):
+    """Create tasks as usual, registering those created inside a profiled request."""
+    previous = _previous_factory.get(loop)
+    task = previous(loop, coro, **kwargs) if previous else asyncio.Task(coro, loop=loop, **kwargs)
+    profile = _active.get(_profile_id.get()) if _profile_id.get() else None
+    if profile is not None:
+        with profile.lock:
+            profile.tasks.append(task)
+    return task
+
+
+def _run_sampler(interval: float) -> None:
+    """Sample active profiles until none is left."""
+    global _sampler
+    while True:
+        time.sleep(interval)
+        with _active_lock:
+            profiles = list(_active.values())
+            if not profiles:
+                _sampler = None
+                return
+        now = time.perf_counter()
+        for profile in profiles:
+            try:
+                profile.sample(now)
+            except Exception as e:
+                logger.debug(f"Profiler sample failed: {e}")
+
+
+def start_profile(profile_id: str, name: str, interval: float = 0.005) -> RequestProfile:
+    """
+    Start profiling the current task and the tasks it creates.
+
+    Must be called from the task to profile (e.g. the request's middleware).
+
+    Args:
+        profile_id: Identifier, also used as file name
+        name: Human readable name (e.g. "POST /api/v1/chat")
+        interval: Seconds between samples
+
+    Returns:
+        The profile (pass it to stop_profile)
+    """
+    global _sampler
+    loop = asyncio.get_running_loop()
+    profile = RequestProfile(
+        profile_id, name, loop, threading.get_ident(), asyncio.current_task()
+    )
+    profile._token = _profile_id.set(profile_id)
+
+    with _active_lock:
+        if loop.get_task_factory() is not _task_factory:
+            _previous_factory[loop] = loop.get_task_factory()
+            loop.set_task_factory(_task_factory)
+        _active[profile_id] = profile
+        if _sampler is None:
+            _sampler = threading.Thread(
+                target=_run_sampler, args=(interval,), name="request-profiler", daemon=True
+            )
+            _sampler.start()
+    return profile
+
+
+def stop_profile(profile: RequestProfile) -> RequestProfile:
+    """Stop sampling a profile (the task factory is removed when none is left)."""
+    profile.ended = time.perf_counter()
+    if profile._token is not None:
+        _profile_id.reset(profile._token)
+    with _active_lock:
+        _active.pop(profile.id, None)
+        if not any(p.loop is profile.loop for p in _active.values()):
+            if profile.loop.get_task_factory() is _task_factory:
+                profile.loop.set_task_factory(_previous_factory.pop(profile.loop, None))
+    return profile
+
+
+class ProfileStore:
+    """Directory of speedscope files, keeping only the most recent ones."""
+
+    def __init__(self, directory: str, max_files: int = 50):
+        """
+        Initialize store.
+
+        Args:
+            directory: Directory holding the profiles
+            max_files: Older profiles beyond this count are deleted
+        """
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def path(self, profile_id: str) -> Path:
+        """Get the file path of a profile."""
+        return self.directory / f"{profile_id}.speedscope.json"
+
+    def save(self, profile: RequestProfile) -> Optional[Path]:
+        """
+        Write a profile and prune old ones.
+
+        Returns:
+            File path, or None on error
+        """
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.path(profile.id)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(profile.to_speedscope(), f, separators=(",", ":"))
+
+            files = sorted(
+                self.directory.glob("*.speedscope.json"), key=lambda p: p.stat().st_mtime
+            )
+            for old in files[: max(0, len(files) - self.max_files)]:
+                old.unlink(missing_ok=True)
+            return path
+        except Exception as e:
+            logger.error(f"Error saving profile {profile.id}: {e}")
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """List stored profiles, newest first."""
+        if not self.directory.exists():
+            return []
+        files = sorted(
+            self.directory.glob("*.speedscope.json"), key=lambda p: p.stat().st_mtime, reverse=True
+        )
+        return [
+            {
+                "id": p.name[: -len(".speedscope.json")],
+                "bytes": p.stat().st_size,
+                "created_at": p.stat().st_mtime,
+            }
+            for p in files
+        ]
+
+    def exists(self, profile_id: str) -> bool:
+        """Check that a profile id is safe and stored."""
+        return profile_id.replace("-", "").isalnum() and os.path.exists(self.path(profile_id))
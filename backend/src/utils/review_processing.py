@@ -0,0 +1,208 @@
+"""
+Review preparation for the knowledge base.
+
+Reviews are normalised (BBCode, invisible characters, letter spam, whitespace),
+near-duplicates are dropped with MinHash signatures and LSH banding, and long
+reviews are split into bounded, sentence-aligned chunks that keep a reference
+to their parent review.
+"""
+
+import re
+import unicodedata
+import zlib
+from typing import Dict, Any, List, Set
+
+import numpy as np
+
+_BBCODE_RE = re.compile(r"\[/?[a-z0-9*]+(?:=[^\]]*)?\]", re.IGNORECASE)
+_INVISIBLE_RE = re.compile("[\u200b-\u200f\u2060\ufeff]")
+_REPEAT_RE = re.compile(r"(.)\1{3,}")
+_SPACE_RE = re.compile(r"\s+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_WORD_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Mersenne prime for the MinHash permutations (a*x + b mod p); with a, x < p
+# every product stays below 2^62, so uint64 arithmetic never overflows
+_PRIME = (1 << 31) - 1
+
+
+def normalize_review(text: str) -> str:
+    """
+    Clean a review for storage and embedding.
+
+    Args:
+        text: Raw review text
+
+    Returns:
+        Text with BBCode and invisible characters removed, runs of 4+ identical
+        characters shortened to 3 and whitespace collapsed
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    text = _BBCODE_RE.sub(" ", text)
+    text = _INVISIBLE_RE.sub("", text)
+    text = _REPEAT_RE.sub(lambda m: m.group(1) * 3, text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def chunk_text(text: str, max_chars: int = 800, overlap: int = 120) -> List[str]:
+    """
+    Split text into sentence-aligned chunks of at most max_chars.
+
+    The last sentence of a chunk is repeated at the start of the next one when
+    it fits within overlap characters, so context is not cut mid-thought.
+
+    Args:
+        text: Text to split
+        max_chars: Maximum chunk length
+        overlap: Maximum characters carried over between chunks
+
+    Returns:
+        List of chunks (a single element when the text already fits)
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    sentences: List[str] = []
+    for sentence in _SENTENCE_RE.split(text):
+        # Hard-split sentences that alone exceed the limit, at word boundaries
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            sentences.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            sentences.append(sentence)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    length = 0
+    for sentence in sentences:
+        if current and length + 1 + len(sentence) > max_chars:
+            chunks.append(" ".join(current))
+            carry = current[-1] if len(current[-1]) <= overlap else None
+            current = [carry] if carry and len(carry) + 1 + len(sentence) <= max_chars else []
+            length = len(current[0]) if current else 0
+        current.append(sentence)
+        length += len(sentence) + (1 if length else 0)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+class MinHashDeduplicator:
+    """Near-duplicate detection with MinHash signatures and LSH banding."""
+
+    def __init__(
+        self, num_perm: int = 64, bands: int = 16, threshold: float = 0.7, shingle_size: int = 3
+    ):
+        """
+        Initialize deduplicator.
+
+        Args:
+            num_perm: Hash permutations per signature (must be divisible by bands)
+            bands: LSH bands; more bands find lower-similarity candidates
+            threshold: Estimated Jaccard similarity at or above which texts are duplicates
+            shingle_size: Words per shingle
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute a MinHash signature over word shingles.
+
+        Args:
+            text: Text to sign
+
+        Returns:
+            uint64 array of num_perm minimum hashes
+        """
+        words = _WORD_RE.findall(text.lower())
+        n = self.shingle_size
+        shingles = {" ".join(words[i : i + n]) for i in range(max(1, len(words) - n + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % np.uint64(_PRIME)
+        return permuted.min(axis=1)
+
+    def dedupe(self, texts: List[str]) -> List[int]:
+        """
+        Find texts to keep, dropping later near-duplicates of earlier ones.
+
+        Args:
+            texts: Texts in priority order
+
+        Returns:
+            Indexes of kept texts, in input order
+        """
+        signatures = [self.signature(text) for text in texts]
+        buckets: Dict[tuple, List[int]] = {}
+        kept: List[int] = []
+
+        for idx, sig in enumerate(signatures):
+            keys = [
+                (band, sig[band * self.rows : (band + 1) * self.rows].tobytes())
+                for band in range(self.bands)
+            ]
+            candidates: Set[int] = set()
+            for key in keys:
+                candidates.update(buckets.get(key, ()))
+
+            if any(np.mean(signatures[other] == sig) >= self.threshold for other in candidates):
+                continue
+
+            kept.append(idx)
+            for key in keys:
+                buckets.setdefault(key, []).append(idx)
+        return kept
+
+
+def prepare_reviews(
+    reviews: List[str],
+    deduplicator: MinHashDeduplicator,
+    min_chars: int = 50,
+    max_chars: int = 800,
+    overlap: int = 120,
+) -> Dict[str, Any]:
+    """
+    Normalise, deduplicate and chunk a game's reviews.
+
+    Args:
+        reviews: Raw review texts in priority order
+        deduplicator: Near-duplicate detector
+        min_chars: Minimum normalised length of a meaningful review
+        max_chars: Maximum chunk length
+        overlap: Maximum characters carried over between chunks
+
+    Returns:
+        Dictionary with "reviews" (list of {"index", "text", "chunks"}) and
+        counts of "short" and "duplicates" dropped
+    """
+    normalized = [(idx, normalize_review(review)) for idx, review in enumerate(reviews)]
+    meaningful = [(idx, text) for idx, text in normalized if len(text) > min_chars]
+    kept = deduplicator.dedupe([text for _, text in meaningful])
+
+    return {
+        "reviews": [
+            {
+                "index": meaningful[k][0],
+                "text": meaningful[k][1],
+                "chunks": chunk_text(meaningful[k][1], max_chars, overlap),
+            }
+            for k in kept
+        ],
+        "short": len(normalized) - len(meaningful),
+        "duplicates": len(meaningful) - len(kept),
+    }
@@ -0,0 +1,168 @@
+"""
+Recorded Steam HTTP fixtures.
+
+Responses are stored in a JSON file keyed by request URL (with sorted query
+parameters, lowercased search terms and the API key removed), so SteamService
+can run fully offline by replaying them through an httpx mock transport,
+optionally with injected latency. Live responses are recorded together with
+their latency.
+"""
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+from src.utils.latency import LatencyModel
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# Query parameters that never take part in fixture keys
+_IGNORED_PARAMS = {"key"}
+
+# Query parameters Steam matches case-insensitively (search terms)
+_CASE_INSENSITIVE_PARAMS = {"term"}
+
+# Page-size parameters: a recorded page of another size is served when no exact match exists
+_PAGE_SIZE_PARAMS = {"num_per_page"}
+
+
+def request_key(request: httpx.Request) -> str:
+    """
+    Get the fixture key for a request.
+
+    Args:
+        request: Outgoing HTTP request
+
+    Returns:
+        "METHOD scheme://host/path?sorted-query" without the API key
+    """
+    params = sorted(
+        (k, v.lower() if k in _CASE_INSENSITIVE_PARAMS else v)
+        for k, v in request.url.params.multi_items()
+        if k not in _IGNORED_PARAMS
+    )
+    base = f"{request.url.scheme}://{request.url.host}{request.url.path}"
+    return f"{request.method} {base}?{urlencode(params)}" if params else f"{request.method} {base}"
+
+
+def _unpaged_key(key: str) -> str:
+    """Fixture key without page-size parameters."""
+    base, _, query = key.partition("?")
+    params = [(k, v) for k, v in parse_qsl(query) if k not in _PAGE_SIZE_PARAMS]
+    return f"{base}?{urlencode(params)}" if params else base
+
+
+class SteamFixture:
+    """A set of recorded Steam responses backed by a JSON file."""
+
+    def __init__(self, path: str):
+        """
+        Load a fixture file (missing files start empty).
+
+        Args:
+            path: Fixture JSON path
+        """
+        self.path = path
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.responses = json.load(f).get("responses", {})
+        self._unpaged = {_unpaged_key(key): entry for key, entry in self.responses.items()}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, request: httpx.Request) -> Optional[Dict[str, Any]]:
+        """Get the recorded response for a request, if any."""
+        key = request_key(request)
+        entry = self.responses.get(key) or self._unpaged.get(_unpaged_key(key))
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def record(
+        self, request: httpx.Request, response: httpx.Response, seconds: Optional[float] = None
+    ) -> None:
+        """Store a live response (and how long it took, if known)."""
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        entry = {"status": response.status_code, "body": body}
+        if seconds is not None:
+            entry["ms"] = round(seconds * 1000, 1)
+        key = request_key(request)
+        self.responses[key] = entry
+        self._unpaged.setdefault(_unpaged_key(key), entry)
+
+    def save(self) -> None:
+        """Write the fixture file."""
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "responses": self.responses}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Saved {len(self.responses)} recorded Steam responses to {self.path}")
+
+    def replay_transport(self, latency: Optional[LatencyModel] = None) -> httpx.MockTransport:
+        """
+        Get a transport that serves recorded responses (404 for unknown requests).
+
+        Args:
+            latency: Optional delay added to every response
+        """
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            entry = self.lookup(request)
+            if latency is not None:
+                delay = latency.delay(entry.get("ms") if entry else None)
+                if delay:
+                    await asyncio.sleep(delay)
+            if entry is None:
+                logger.debug(f"No recorded response for {request_key(request)}")
+                return httpx.Response(404, json={"success": False}, request=request)
+            body = entry["body"]
+            if isinstance(body, str):
+                return httpx.Response(entry["status"], text=body, request=request)
+            return httpx.Response(entry["status"], json=body, request=request)
+
+        return httpx.MockTransport(handler)
+
+    def recording_transport(self) -> httpx.AsyncBaseTransport:
+        """Get a transport that performs live requests and records their responses."""
+        fixture = self
+
+        class RecordingTransport(httpx.AsyncHTTPTransport):
+            async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+                start = time.perf_counter()
+                response = await super().handle_async_request(request)
+                await response.aread()
+                fixture.record(request, response, time.perf_counter() - start)
+                return response
+
+        return RecordingTransport()
+
+    def client(self, mode: str, latency: Optional[LatencyModel] = None) -> httpx.AsyncClient:
+        """
+        Get an HTTP client that replays or records this fixture.
+
+        Args:
+            mode: "replay" (offline) or "record" (live requests, stored on save)
+            latency: Delay injected into replayed responses
+
+        Returns:
+            httpx.AsyncClient for SteamService
+        """
+        if mode == "replay":
+            return httpx.AsyncClient(transport=self.replay_transport(latency))
+        if mode == "record":
+            return httpx.AsyncClient(transport=self.recording_transport(), timeout=30.0)
+        raise ValueError(f"Unknown fixture mode: {mode!r}")
@@ -0,0 +1,167 @@
+"""
+Per-chat timing traces.
+
+A ChatTrace is bound to the current context while a chat runs. The LLM
+loop records one entry per iteration and one span per tool call; Steam
+requests and cache lookups made anywhere below a tool (including tasks it
+spawns) are attached to that tool's span through context variables; those
+made outside any tool (e.g. knowledge-first retrieval) go to the trace's own
+"steam" and "cache" lists. Work that finishes after its tool returned (e.g.
+prefetches) is reported under "background".
+
+Recording functions are no-ops outside a traced chat.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+
+_current_trace: ContextVar[Optional["ChatTrace"]] = ContextVar("chat_trace", default=None)
+_current_span: ContextVar[Optional[Dict[str, Any]]] = ContextVar("chat_trace_span", default=None)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class ChatTrace:
+    """Timing breakdown of one chat: LLM iterations, tool calls, Steam and cache."""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self.knowledge_ms: Optional[float] = None
+        self.iterations: List[Dict[str, Any]] = []
+        self.tools: List[Dict[str, Any]] = []
+        self.background: List[Dict[str, Any]] = []
+        self.steam: List[Dict[str, Any]] = []  # Steam calls outside any tool
+        self.cache: List[Dict[str, Any]] = []  # Cache lookups outside any tool
+
+    def record_llm(
+        self, seconds: float, usage: Optional[Dict[str, Any]], tool_calls: List[str]
+    ) -> None:
+        """
+        Record one LLM iteration.
+
+        Args:
+            seconds: Wall time of the call
+            usage: LangChain usage_metadata (input/output tokens)
+            tool_calls: Names of the tools the model requested
+        """
+        usage = usage or {}
+        self.iterations.append(
+            {
+                "iteration": len(self.iterations) + 1,
+                "ms": _ms(seconds),
+                "input_tokens": usage.get("input_tokens", 0),
+                "output_tokens": usage.get("output_tokens", 0),
+                "tool_calls": tool_calls,
+            }
+        )
+
+    @contextmanager
+    def tool_span(self, name: str, args: Dict[str, Any]):
+        """
+        Time a tool call; Steam requests and cache lookups inside attach to it.
+
+        Args:
+            name: Tool name
+            args: Tool arguments
+        """
+        span = {
+            "tool": name,
+            "args": args,
+            "iteration": len(self.iterations),
+            "ms": None,
+            "outcome": "error",
+            "steam_calls": [],
+            "cache": [],
+        }
+        self.tools.append(span)
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span["ms"] = _ms(time.perf_counter() - start)
+            _current_span.reset(token)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the trace with a summary of where the time went.
+
+        Returns:
+            Dictionary with "summary", "iterations", "tools", "steam", "cache" and
+            "background"
+        """
+        total_ms = _ms(time.perf_counter() - self._start)
+        llm_ms = sum(it["ms"] for it in self.iterations)
+        tool_ms = sum(span["ms"] or 0.0 for span in self.tools)
+        steam_calls = self.steam + [c for span in self.tools for c in span["steam_calls"]]
+        cache = self.cache + [c for span in self.tools for c in span["cache"]]
+        return {
+            "summary": {
+                "total_ms": total_ms,
+                "knowledge_ms": self.knowledge_ms,
+                "llm_ms": round(llm_ms, 2),
+                "tool_ms": round(tool_ms, 2),
+                "other_ms": round(total_ms - llm_ms - tool_ms - (self.knowledge_ms or 0.0), 2),
+                "llm_iterations": len(self.iterations),
+                "input_tokens": sum(it["input_tokens"] for it in self.iterations),
+                "output_tokens": sum(it["output_tokens"] for it in self.iterations),
+                "steam_calls": len(steam_calls),
+                "steam_ms": round(sum(c["ms"] for c in steam_calls), 2),
+                "cache_hits": sum(1 for c in cache if c["result"] == "hit"),
+                "cache_misses": sum(1 for c in cache if c["result"] == "miss"),
+            },
+            "iterations": self.iterations,
+            "tools": self.tools,
+            "steam": self.steam,
+            "cache": self.cache,
+            "background": self.background,
+        }
+
+
+def start_trace():
+    """
+    Start a trace for the current context.
+
+    Returns:
+        (trace, token) - pass the token to end_trace
+    """
+    trace = ChatTrace()
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token) -> None:
+    """Unbind the trace started with start_trace."""
+    _current_trace.reset(token)
+
+
+def current_trace() -> Optional[ChatTrace]:
+    """Get the trace of the current chat, if any."""
+    return _current_trace.get()
+
+
+def _attach(kind: str, event: Dict[str, Any]) -> None:
+    """Attach an event to the open tool span, the trace, or background work."""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    span = _current_span.get()
+    if span is None:
+        (trace.steam if kind == "steam_calls" else trace.cache).append(event)
+    elif span["ms"] is None:
+        span[kind].append(event)
+    else:
+        trace.background.append({"after_tool": span["tool"], "type": kind, **event})
+
+
+def trace_steam(endpoint: str, status: str, seconds: float) -> None:
+    """Record a Steam request in the current trace."""
+    _attach("steam_calls", {"endpoint": endpoint, "status": status, "ms": _ms(seconds)})
+
+
+def trace_cache(cache: str, key: str, result: str) -> None:
+    """Record a cache lookup ("hit" or "miss") in the current trace."""
+    _attach("cache", {"cache": cache, "key": key, "result": result})
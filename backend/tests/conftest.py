@@ -0,0 +1,15 @@
+"""Shared test setup: offline settings and the backend package on sys.path."""
+
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Settings are read at import time; keep tests offline and away from ./data
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("GAME_STORE_PATH", "")
+os.environ.setdefault("UPSTREAM_MODE", "live")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+sys.path.insert(0, str(BACKEND_DIR))
@@ -0,0 +1,112 @@
+"""Tests for LLM admission control and 429 shedding."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.api import routes
+from src.services.admission_controller import (
+    MAX_RETRY_AFTER,
+    MIN_RETRY_AFTER,
+    AdmissionController,
+    AdmissionRejected,
+)
+
+
+def test_new_chat_is_shed_when_the_queue_is_full():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=5)
+        async with controller.slot():
+            waiter = asyncio.create_task(controller.slot().__aenter__())
+            await asyncio.sleep(0)
+            with pytest.raises(AdmissionRejected) as rejected:
+                controller.check()
+            with pytest.raises(AdmissionRejected):
+                async with controller.slot():
+                    pass
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        return controller, rejected.value
+
+    controller, rejected = asyncio.run(run())
+
+    assert rejected.reason == "queue_full"
+    assert MIN_RETRY_AFTER <= rejected.retry_after <= MAX_RETRY_AFTER
+    assert controller.stats["rejected_queue_full"] == 2
+    assert controller.get_stats()["running"] == 0
+
+
+def test_in_progress_call_may_queue_past_the_limit():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout=5)
+        order = []
+
+        async def in_progress_call():
+            async with controller.slot(in_progress=True):
+                order.append("in_progress")
+
+        async with controller.slot():
+            task = asyncio.create_task(in_progress_call())
+            await asyncio.sleep(0)
+            order.append("first")
+        await task
+        return order
+
+    assert asyncio.run(run()) == ["first", "in_progress"]
+
+
+def test_zero_queue_timeout_fails_fast():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, max_queue=5, queue_timeout=0)
+        async with controller.slot():
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with controller.slot():
+                    pass
+        return controller, rejected.value
+
+    controller, rejected = asyncio.run(run())
+
+    assert controller.queue_timeout == 0
+    assert rejected.reason == "timeout"
+    assert controller.get_stats()["running"] == 0
+
+
+def test_retry_after_grows_with_the_queue_and_is_bounded():
+    controller = AdmissionController(max_concurrency=2, max_queue=10, queue_timeout=5)
+    controller._avg_hold = 4.0
+    assert controller.retry_after() == 2
+
+    controller._waiters.extend([None] * 9)
+    assert controller.retry_after() == 20
+
+    controller._avg_hold = 1000.0
+    assert controller.retry_after() == MAX_RETRY_AFTER
+
+
+def test_chat_endpoint_returns_429_with_retry_after(monkeypatch):
+    controller = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout=5)
+
+    class SheddingChatbot:
+        async def chat(self, message, conversation_history=None, include_trace=False):
+            controller.check()
+            return {"response": "ok", "success": True, "metadata": {}}
+
+    monkeypatch.setattr(routes, "chatbot_service", SheddingChatbot())
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api/v1")
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async with controller.slot():
+                shed = await client.post("/api/v1/chat", json={"message": "hi"})
+            served = await client.post("/api/v1/chat", json={"message": "hi"})
+        return shed, served
+
+    shed, served = asyncio.run(run())
+
+    assert shed.status_code == 429
+    assert MIN_RETRY_AFTER <= int(shed.headers["Retry-After"]) <= MAX_RETRY_AFTER
+    assert served.status_code == 200
@@ -0,0 +1,110 @@
+"""Tests for the write-behind ingestion queue and its spool."""
+
+import asyncio
+import json
+
+from src.config import settings
+from src.services import ingestion_service
+from src.services.ingestion_service import IngestionService
+
+
+class RecordingRAG:
+    """Knowledge base stand-in that records ingested batches."""
+
+    def __init__(self):
+        self.ingested = []
+
+    async def add_games_batch(self, items):
+        self.ingested.extend(game for game, _ in items)
+        return {"written": len(items)}
+
+
+def write_spool(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write((line if isinstance(line, str) else json.dumps(line)) + "\n")
+
+
+def entry(app_id, name):
+    return {"app_id": str(app_id), "game": {"app_id": app_id, "name": name}, "reviews": None}
+
+
+def read_spool(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_restore_then_compact_keeps_pending_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion_service, "SPOOL_COMPACT_MIN_LINES", 0)
+    spool = tmp_path / "spool.jsonl"
+    write_spool(spool, [
+        entry(1, "one"), entry(2, "two"), entry(3, "three"),
+        entry(2, "two v2"), entry(3, "three v2"),
+    ])
+
+    async def run():
+        service = IngestionService(RecordingRAG(), spool_path=str(spool))
+        await service._restore_spool()
+        await service._ingest([service._pending.pop("1")])
+        await service.stop(flush=False)
+        return service
+
+    service = asyncio.run(run())
+
+    assert service.stats["restored"] == 3
+    # Five lines for two pending games: rewritten with their latest payloads
+    assert [(e["app_id"], e["game"]["name"]) for e in read_spool(spool)] == [
+        ("2", "two v2"), ("3", "three v2"),
+    ]
+
+    async def restore_again():
+        restored = IngestionService(RecordingRAG(), spool_path=str(spool))
+        await restored._restore_spool()
+        return restored._pending
+
+    pending = asyncio.run(restore_again())
+    assert {app_id: game["name"] for app_id, (game, _) in pending.items()} == {
+        "2": "two v2", "3": "three v2",
+    }
+
+
+def test_restore_overflowing_queue_ingests_everything(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ingest_flush_interval", 0.0)
+    spool = tmp_path / "spool.jsonl"
+    write_spool(spool, [entry(i, f"game {i}") for i in range(10)] + ["{not json"])
+    rag = RecordingRAG()
+
+    async def run():
+        service = IngestionService(rag, max_size=3, batch_size=2, spool_path=str(spool))
+        service.start()
+        for _ in range(100):
+            if len(rag.ingested) == 10:
+                break
+            await asyncio.sleep(0.01)
+        await service.stop()
+        return service
+
+    service = asyncio.run(run())
+
+    assert sorted(game["app_id"] for game in rag.ingested) == list(range(10))
+    assert service.stats["spool_corrupt_lines"] == 1
+    assert (tmp_path / "spool.jsonl.corrupt").read_text() == "{not json\n"
+    assert read_spool(spool) == []
+
+
+def test_submitted_items_win_over_spooled_ones(tmp_path, monkeypatch):
+    spool = tmp_path / "spool.jsonl"
+    write_spool(spool, [entry(1, "old")])
+
+    async def run():
+        service = IngestionService(RecordingRAG(), spool_path=str(spool))
+        monkeypatch.setattr(service, "start", lambda: None)
+        await service.submit({"app_id": 1, "name": "new"})
+        await service._restore_spool()
+        await service.stop(flush=False)
+        return service
+
+    service = asyncio.run(run())
+
+    assert service._pending["1"][0]["name"] == "new"
+    assert read_spool(spool)[-1]["game"]["name"] == "new"
@@ -0,0 +1,53 @@
+"""Tests for the persisted knowledge base counters."""
+
+import json
+
+from src.config import settings
+from src.services.kb_counters import KnowledgeBaseCounters
+from src.services.rag_service import RAGService
+
+
+def test_counters_survive_reopen(tmp_path):
+    path = str(tmp_path / "counters.json")
+    counters = KnowledgeBaseCounters(path, flush_interval=3600)
+    counters.apply(added=[
+        {"app_id": "1", "type": "game_info"},
+        {"app_id": "1", "type": "review"},
+        {"app_id": "2", "type": "game_info"},
+    ])
+    counters.apply(removed=[{"app_id": "1", "type": "review"}])
+    counters.save(force=True)
+
+    reopened = KnowledgeBaseCounters(path)
+
+    assert reopened.loaded
+    assert reopened.snapshot() == counters.snapshot()
+    assert reopened.snapshot()["games"] == 2
+    assert reopened.game_counts("1") == {"game_info": 1}
+
+
+def test_debounced_counters_are_flushed_on_close(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "chroma_persist_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "kb_counters_flush_interval", 3600.0)
+    games = [
+        ({"app_id": app_id, "name": f"Game {app_id}", "short_description": "A game."}, None)
+        for app_id in range(1, 6)
+    ]
+
+    rag = RAGService(backend="numpy")
+    rag.add_games_batch(games[:2])
+    rag.add_games_batch(games[2:])
+    rag.close()
+
+    # Written by close(), not rebuilt from the store on reopen
+    with open(tmp_path / "numpy_kb_counters.json", encoding="utf-8") as f:
+        assert json.load(f)["by_type"] == {"game_info": 5}
+
+    reopened = RAGService(backend="numpy")
+    try:
+        assert reopened.counters.loaded
+        stats = reopened.get_collection_stats()
+        assert stats["estimated_games"] == 5
+        assert stats["total_documents"] == reopened.games_collection.count() == 5
+    finally:
+        reopened.close()
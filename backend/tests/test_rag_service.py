@@ -0,0 +1,52 @@
+"""Tests for batched knowledge base upserts (NumPy backend)."""
+
+import pytest
+
+from src.config import settings
+from src.services.rag_service import RAGService
+
+
+@pytest.fixture
+def rag(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "chroma_persist_dir", str(tmp_path))
+    service = RAGService(backend="numpy")
+    yield service
+    service.close()
+
+
+def game(app_id, name, description="A game."):
+    return {"app_id": app_id, "name": name, "short_description": description, "genres": ["Action"]}
+
+
+def test_game_listed_twice_in_a_batch_is_written_once(rag):
+    result = rag.add_games_batch([(game(1, "First"), None), (game(1, "Second"), None)])
+
+    assert result["written"] == 1
+    assert rag.games_collection.count() == 1
+    assert rag.get_collection_stats()["documents_by_type"] == {"game_info": 1}
+    assert rag.get_game_documents(1)[0]["metadata"]["name"] == "Second"
+
+
+def test_unchanged_game_is_not_rewritten(rag):
+    reviews = ["Tight controls and a great soundtrack, easily worth the price."]
+    first = rag.add_games_batch([(game(1, "Game"), reviews)])
+    revision = rag.revision
+
+    second = rag.add_games_batch([(game(1, "Game"), reviews)])
+
+    assert first["written"] == 2
+    assert second["written"] == 0
+    assert second["unchanged"] == 2
+    assert rag.revision == revision
+    assert rag.get_collection_stats()["total_documents"] == 2
+
+
+def test_changed_game_replaces_only_changed_documents(rag):
+    reviews = ["Tight controls and a great soundtrack, easily worth the price."]
+    rag.add_games_batch([(game(1, "Game"), reviews)])
+
+    result = rag.add_games_batch([(game(1, "Game", "A new description."), reviews)])
+
+    assert result["written"] == 1
+    assert result["unchanged"] == 1
+    assert rag.get_collection_stats()["documents_by_type"] == {"game_info": 1, "review": 1}
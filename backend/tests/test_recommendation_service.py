@@ -0,0 +1,58 @@
+"""Tests for the similar-games engine (Steam replayed from the sample fixture)."""
+
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+
+from src.config import settings
+from src.services.recommendation_service import RecommendationService
+from src.services.steam_service import SteamService
+from src.utils.cache import cache_manager
+from src.utils.steam_fixture import SteamFixture
+
+HOLLOW_KNIGHT = 367520
+SILKSONG = 1030300
+SAMPLE_GAMES = [HOLLOW_KNIGHT, SILKSONG, 1145360, 1245620, 292030, 1091500, 504230]
+FIXTURE_PATH = Path(__file__).resolve().parent.parent / "fixtures" / "steam_sample.json"
+
+
+@pytest.fixture
+def steam(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "game_store_path", str(tmp_path / "games.db"))
+    # Cached details would skip writing them to this test's empty store
+    cache_manager.clear()
+    fixture = SteamFixture(str(FIXTURE_PATH))
+    return SteamService(client=httpx.AsyncClient(transport=fixture.replay_transport()))
+
+
+def similar(steam, **kwargs):
+    async def run():
+        for app_id in SAMPLE_GAMES:
+            await steam.get_game_details(app_id)
+        try:
+            return await RecommendationService(steam).similar_games(**kwargs)
+        finally:
+            await steam.close()
+
+    return asyncio.run(run())
+
+
+def test_exact_name_wins_over_longer_titles(steam):
+    result = similar(steam, name="Hollow Knight", limit=3)
+
+    assert result["game"]["app_id"] == HOLLOW_KNIGHT
+    assert SILKSONG in [game["app_id"] for game in result["similar_games"]]
+
+
+def test_exact_name_match_ignores_case(steam):
+    result = similar(steam, name="hollow knight: silksong", limit=3)
+
+    assert result["game"]["app_id"] == SILKSONG
+
+
+def test_partial_name_falls_back_to_the_local_store(steam):
+    result = similar(steam, name="silksong", limit=3)
+
+    assert result["game"]["app_id"] == SILKSONG
@@ -0,0 +1,32 @@
+"""Tests for the NumPy vector store."""
+
+from src.services.vector_store import NumpyVectorStore
+
+
+def test_id_repeated_in_one_upsert_is_stored_once(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    store.upsert(
+        ids=["a", "b", "a"],
+        documents=["first a", "only b", "last a"],
+        metadatas=[{"n": 1}, {"n": 2}, {"n": 3}],
+    )
+
+    assert store.count() == 2
+    assert store.get(ids=["a"])["documents"] == ["last a"]
+    result = store.query(query_texts=["a"], n_results=10)
+    assert sorted(result["ids"][0]) == ["a", "b"]
+
+    reopened = NumpyVectorStore(str(tmp_path))
+    assert reopened.count() == 2
+    assert reopened.get(ids=["a"])["metadatas"] == [{"n": 3}]
+    assert sorted(reopened.query(query_texts=["a"], n_results=10)["ids"][0]) == ["a", "b"]
+
+
+def test_upsert_of_existing_id_reuses_its_slot(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    store.upsert(ids=["a"], documents=["old"])
+    store.upsert(ids=["a"], documents=["new"])
+
+    assert store.count() == 1
+    assert store.query(query_texts=["new"], n_results=10)["ids"][0] == ["a"]
+    assert NumpyVectorStore(str(tmp_path)).get()["documents"] == ["new"]